@@ -6,6 +6,31 @@ EVEUNIVERSE_BULK_METHODS_BATCH_SIZE = clean_setting(
 # Technical parameter defining the maximum number of objects processed per run
 # of Django batch methods, e.g. bulk_create and bulk_update
 
+EVEUNIVERSE_ENTITY_NAMES_CACHE_SIZE = clean_setting(
+    "EVEUNIVERSE_ENTITY_NAMES_CACHE_SIZE", 100_000
+)
+"""Max number of Eve entity names kept in memory by each process
+for resolving names without a database query.
+"""
+
+EVEUNIVERSE_ENTITY_NAMES_CACHE_TIMEOUT = clean_setting(
+    "EVEUNIVERSE_ENTITY_NAMES_CACHE_TIMEOUT", 3600
+)
+"""Timeout in seconds for Eve entity names kept in memory."""
+
+EVEUNIVERSE_ESI_MAX_WORKERS = clean_setting("EVEUNIVERSE_ESI_MAX_WORKERS", 10)
+"""Max number of concurrent requests to ESI made by bulk methods,
+e.g. ``bulk_get_or_create_esi()``. Set to 1 to disable concurrent requests.
+
+Also the size of the thread pool for requests to ESI made by async methods.
+"""
+
+EVEUNIVERSE_INVALID_ENTITY_IDS_TIMEOUT = clean_setting(
+    "EVEUNIVERSE_INVALID_ENTITY_IDS_TIMEOUT", 3_600 * 24 * 7
+)
+"""Timeout in seconds for IDs, which ESI failed to resolve to entities.
+Known invalid IDs are skipped when resolving entities until they time out.
+"""
 
 EVEUNIVERSE_LOAD_ASTEROID_BELTS = clean_setting(
     "EVEUNIVERSE_LOAD_ASTEROID_BELTS", False
@@ -41,10 +66,76 @@ EVEUNIVERSE_LOAD_TYPE_MATERIALS = clean_setting(
 )
 """When true will automatically load type materials be with every type."""
 
+EVEUNIVERSE_NEAREST_CELESTIAL_CACHE_GRID_SIZE = clean_setting(
+    "EVEUNIVERSE_NEAREST_CELESTIAL_CACHE_GRID_SIZE", 10_000, min_value=1
+)
+"""Size in meters of the grid cells, which coordinates are snapped to
+when caching nearest celestials fetched from fuzzwork.
+"""
+
+EVEUNIVERSE_NEAREST_CELESTIAL_CACHE_MAX_ERROR = clean_setting(
+    "EVEUNIVERSE_NEAREST_CELESTIAL_CACHE_MAX_ERROR", 0.1, min_value=0
+)
+"""Max distance between a position and a cached position in the same grid cell
+relative to the distance of the cached celestial for the cached celestial
+to be used for that position.
+"""
+
+EVEUNIVERSE_NEAREST_CELESTIAL_INDEX_CACHE_SIZE = clean_setting(
+    "EVEUNIVERSE_NEAREST_CELESTIAL_INDEX_CACHE_SIZE", 500
+)
+"""Max number of solar systems for which the index of celestials
+for finding nearest celestials is kept in memory.
+"""
+
+EVEUNIVERSE_NEAREST_CELESTIAL_INDEX_CACHE_TIMEOUT = clean_setting(
+    "EVEUNIVERSE_NEAREST_CELESTIAL_INDEX_CACHE_TIMEOUT", 3600
+)
+"""Timeout in seconds after which the index of celestials for a solar system
+is rebuilt from the database.
+"""
+
+EVEUNIVERSE_SINGLE_FLIGHT_LOCK_TIMEOUT = clean_setting(
+    "EVEUNIVERSE_SINGLE_FLIGHT_LOCK_TIMEOUT", 30
+)
+"""Max seconds a thread or process waits for another one to fetch the same object
+from ESI when coalescing requests. Will fetch the object itself after the timeout.
+"""
+
+EVEUNIVERSE_SINGLE_FLIGHT_USE_CACHE_LOCK = clean_setting(
+    "EVEUNIVERSE_SINGLE_FLIGHT_USE_CACHE_LOCK", False
+)
+"""When true will also coalesce concurrent requests to ESI for the same object
+across processes by using a lock in the Django cache.
+Requests are always coalesced within a process.
+"""
+
+EVEUNIVERSE_SYNC_EVE_ENTITIES = clean_setting("EVEUNIVERSE_SYNC_EVE_ENTITIES", False)
+"""When true will automatically update or create EveEntity objects for Eve objects
+with a corresponding entity category, e.g. solar systems or types,
+whenever they are updated or created from ESI.
+"""
+
+EVEUNIVERSE_TASKS_CHUNK_SIZE = clean_setting("EVEUNIVERSE_TASKS_CHUNK_SIZE", 100)
+"""Max number of objects updated or created by one task
+when loading child objects or all objects of a model asynchronously.
+"""
+
 EVEUNIVERSE_TASKS_TIME_LIMIT = clean_setting("EVEUNIVERSE_TASKS_TIME_LIMIT", 7200)
 """Global timeout for tasks in seconds to reduce task accumulation during outages."""
 
+EVEUNIVERSE_USE_ESI_ETAGS = clean_setting("EVEUNIVERSE_USE_ESI_ETAGS", False)
+"""When true will store the ETag of ESI responses for every object and
+make conditional requests when updating objects from ESI.
+Objects that have not changed on ESI will only get their last updated time renewed.
+"""
+
 EVEUNIVERSE_USE_EVESKINSERVER = clean_setting("EVEUNIVERSE_USE_EVESKINSERVER", True)
 """When True a call to EveType.icon_url for a SKIN type will return a eveskinserver URL
 else it will return a generic SKIN icon.
 """
+
+EVEUNIVERSE_WRITE_CHANGES_ONLY = clean_setting("EVEUNIVERSE_WRITE_CHANGES_ONLY", False)
+"""When true will only write fields to the database that have changed on ESI.
+Objects that have not changed at all only get their ``last_updated`` renewed.
+"""
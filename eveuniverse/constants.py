@@ -9,3 +9,25 @@ EVE_GROUP_ID_MOON = 8
 EVE_GROUP_ID_ASTEROID_BELT = 9
 EVE_GROUP_ID_STARGATE = 10
 EVE_GROUP_ID_STATION = 15
+
+EVE_TYPE_ID_MOON = 14
+EVE_TYPE_ID_ASTEROID_BELT = 15
+
+EVE_SOLAR_SYSTEM_ID_W_SPACE_MIN = 31_000_000
+EVE_SOLAR_SYSTEM_ID_W_SPACE_MAX = 32_000_000
+
+# EVE ID ranges by category, incl. min and excl. max
+EVE_FACTION_ID_MIN = 500_000
+EVE_FACTION_ID_MAX = 1_000_000
+EVE_NPC_CORPORATION_ID_MIN = 1_000_000
+EVE_NPC_CORPORATION_ID_MAX = 2_000_000
+EVE_NPC_CHARACTER_ID_MIN = 3_000_000
+EVE_NPC_CHARACTER_ID_MAX = 4_000_000
+EVE_REGION_ID_MIN = 10_000_000
+EVE_REGION_ID_MAX = 13_000_000
+EVE_CONSTELLATION_ID_MIN = 20_000_000
+EVE_CONSTELLATION_ID_MAX = 23_000_000
+EVE_SOLAR_SYSTEM_ID_MIN = 30_000_000
+EVE_SOLAR_SYSTEM_ID_MAX = 33_000_000
+EVE_STATION_ID_MIN = 60_000_000
+EVE_STATION_ID_MAX = 64_000_000
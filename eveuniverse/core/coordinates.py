@@ -0,0 +1,193 @@
+"""Index of coordinates in space for fast distance queries"""
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Point = Tuple[float, float, float]
+
+
+class CoordinateIndex:
+    """Index of points in space for fast distance queries.
+
+    Calculations are vectorized with numpy when it is installed,
+    else a pure Python implementation is used.
+
+    Args:
+        points: Coordinates for each ID as tuple of x, y, z in meters
+    """
+
+    def __init__(self, points: Dict[int, Point]) -> None:
+        self._ids = list(points.keys())
+        self._index = {id: index for index, id in enumerate(self._ids)}
+        if np is not None:
+            self._positions = np.array(list(points.values()), dtype=float).reshape(
+                -1, 3
+            )
+        else:
+            self._positions = [tuple(map(float, point)) for point in points.values()]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._index
+
+    def position(self, id: int) -> Point:
+        """returns the position for an ID"""
+        return tuple(float(value) for value in self._positions[self._index[id]])
+
+    def within(self, point: Point, radius: float) -> List[Tuple[int, float]]:
+        """Finds all IDs within a radius around a point.
+
+        Returns:
+            Pairs of ID and distance in meters, ordered by distance
+        """
+        distances = self._distances(point)
+        if np is not None:
+            indexes = np.nonzero(distances <= radius)[0]
+            indexes = indexes[np.argsort(distances[indexes], kind="stable")]
+        else:
+            indexes = sorted(
+                (index for index, value in enumerate(distances) if value <= radius),
+                key=lambda index: distances[index],
+            )
+
+        return [(self._ids[index], float(distances[index])) for index in indexes]
+
+    def nearest(self, point: Point, count: int = 1) -> List[Tuple[int, float]]:
+        """Finds the IDs nearest to a point.
+
+        Returns:
+            Pairs of ID and distance in meters, ordered by distance
+        """
+        count = min(count, len(self._ids))
+        if count <= 0:
+            return list()
+
+        distances = self._distances(point)
+        if np is not None:
+            indexes = np.argpartition(distances, count - 1)[:count]
+            indexes = indexes[np.argsort(distances[indexes], kind="stable")]
+        else:
+            indexes = sorted(range(len(distances)), key=lambda index: distances[index])[
+                :count
+            ]
+
+        return [(self._ids[index], float(distances[index])) for index in indexes]
+
+    def distance_matrix(
+        self, ids_a: Iterable[int], ids_b: Iterable[int]
+    ) -> Dict[int, Dict[int, float]]:
+        """Calculates the distances in meters between two sets of IDs.
+        IDs, which are not in the index are ignored.
+
+        Returns:
+            Distances by ID from the first set and ID from the second set
+        """
+        ids_a = [id for id in ids_a if id in self._index]
+        ids_b = [id for id in ids_b if id in self._index]
+        if np is not None:
+            positions_a = self._positions[[self._index[id] for id in ids_a]]
+            positions_b = self._positions[[self._index[id] for id in ids_b]]
+            matrix = np.sqrt(
+                ((positions_a[:, np.newaxis, :] - positions_b[np.newaxis, :, :]) ** 2)
+                .sum(axis=2)
+                .reshape(len(ids_a), len(ids_b))
+            ).tolist()
+        else:
+            matrix = [
+                [
+                    _distance(
+                        self._positions[self._index[id_a]],
+                        self._positions[self._index[id_b]],
+                    )
+                    for id_b in ids_b
+                ]
+                for id_a in ids_a
+            ]
+
+        return {
+            id_a: dict(zip(ids_b, distances)) for id_a, distances in zip(ids_a, matrix)
+        }
+
+    def _distances(self, point: Point):
+        """returns the distances of all positions to a point"""
+        if np is not None:
+            return np.sqrt(
+                ((self._positions - np.array(point, dtype=float)) ** 2).sum(1)
+            )
+
+        return [_distance(position, point) for position in self._positions]
+
+
+class KDTree:
+    """KD-tree for finding the nearest point to a given point in space.
+
+    Args:
+        points: Coordinates for each key as tuple of x, y, z
+    """
+
+    def __init__(self, points: Dict[Any, Point]) -> None:
+        items = [(key, tuple(map(float, point))) for key, point in points.items()]
+        self._size = len(items)
+        self._root = self._build(items, 0)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def _build(cls, items: list, depth: int) -> Optional[tuple]:
+        if not items:
+            return None
+
+        axis = depth % 3
+        items.sort(key=lambda item: item[1][axis])
+        median = len(items) // 2
+        return (
+            items[median],
+            axis,
+            cls._build(items[:median], depth + 1),
+            cls._build(items[median + 1 :], depth + 1),
+        )
+
+    def nearest(self, point: Point) -> Optional[Tuple[Any, float]]:
+        """Finds the nearest point.
+
+        Returns:
+            Pair of key and distance of the nearest point or None if the tree is empty
+        """
+        point = tuple(map(float, point))
+        best_key = None
+        best_distance_2 = math.inf
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, min_distance_2 = stack.pop()
+            if node is None or min_distance_2 >= best_distance_2:
+                continue
+
+            (key, position), axis, left, right = node
+            distance_2 = (
+                (position[0] - point[0]) ** 2
+                + (position[1] - point[1]) ** 2
+                + (position[2] - point[2]) ** 2
+            )
+            if distance_2 < best_distance_2:
+                best_key, best_distance_2 = key, distance_2
+
+            delta = point[axis] - position[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            stack.append((far, delta**2))
+            stack.append((near, 0.0))
+
+        if best_key is None:
+            return None
+
+        return best_key, math.sqrt(best_distance_2)
+
+
+def _distance(a: Point, b: Point) -> float:
+    return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
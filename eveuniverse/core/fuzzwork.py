@@ -1,25 +1,168 @@
 """Wrapper to access fuzzwork API"""
-from collections import namedtuple
-from typing import Optional
+import math
+from collections import defaultdict, namedtuple
+from typing import Callable, Iterable, List, Optional, Tuple
 from urllib.parse import urlencode
 
 import requests
 
 from django.core.cache import cache
 
+from ..app_settings import (
+    EVEUNIVERSE_NEAREST_CELESTIAL_CACHE_GRID_SIZE,
+    EVEUNIVERSE_NEAREST_CELESTIAL_CACHE_MAX_ERROR,
+)
+
 _CACHE_TIMEOUT = 3_600 * 12
+_MAX_ENTRIES_PER_CELL = 10
 
 EveItem = namedtuple("EveItem", ["id", "name", "type_id", "distance"])
+Position = Tuple[float, float, float]
 
 
 def nearest_celestial(
-    x: int, y: int, z: int, solar_system_id: int
+    x: int,
+    y: int,
+    z: int,
+    solar_system_id: int,
+    celestial_position: Callable[[EveItem], Optional[Position]] = None,
 ) -> Optional[EveItem]:
     """Fetch nearest celestial to given coordinates from API and return it
 
     Results are cached. Returns None if nothing found nearby.
+    See ``nearest_celestials()`` for ``celestial_position``.
+    """
+    return nearest_celestials(
+        [(x, y, z, solar_system_id)], celestial_position=celestial_position
+    )[0]
+
+
+def nearest_celestials(
+    points: Iterable[Tuple[int, int, int, int]],
+    celestial_position: Callable[[EveItem], Optional[Position]] = None,
+) -> List[Optional[EveItem]]:
+    """Fetch nearest celestials for many coordinates from API and return them
+
+    Each point is a tuple of x, y, z and solar system ID.
+    Cached results are fetched at once. Remaining points in the same cache grid cell
+    are requested once from the API for their center and only points,
+    for which that result is not accurate enough, are requested individually.
+
+    The API does not return the coordinates of a celestial, so a cached celestial
+    can only be used for other coordinates in the same grid cell when
+    ``celestial_position`` is given. It is called with each fetched celestial
+    and shall return its coordinates, which are then cached to calculate
+    the distance for every point. Without it cached celestials are only used
+    for the exact same coordinates.
+
+    Returns the nearest celestial or None for each point in the same order.
+    """
+    points = [
+        (float(x), float(y), float(z), int(solar_system_id))
+        for x, y, z, solar_system_id in points
+    ]
+    cache_keys = [_cache_key(*point) for point in points]
+    cells = cache.get_many(set(cache_keys)) if cache_keys else dict()
+    indexes_by_cache_key = defaultdict(list)
+    for index, cache_key in enumerate(cache_keys):
+        indexes_by_cache_key[cache_key].append(index)
+
+    results = [None] * len(points)
+    for cache_key, indexes in indexes_by_cache_key.items():
+        entries = list(cells.get(cache_key, []))
+        missing_indexes = list()
+        for index in indexes:
+            entry = _find_entry(entries, points[index])
+            if entry:
+                results[index] = _item_for_point(entry, points[index])
+            else:
+                missing_indexes.append(index)
+
+        if not missing_indexes:
+            continue
+
+        solar_system_id = points[missing_indexes[0]][3]
+        x, y, z = _center([points[index] for index in missing_indexes])
+        entries.append(_fetch_entry(x, y, z, solar_system_id, celestial_position))
+        for index in missing_indexes:
+            entry = _find_entry(entries, points[index])
+            if not entry:
+                x, y, z, _ = points[index]
+                entry = _fetch_entry(x, y, z, solar_system_id, celestial_position)
+                entries.append(entry)
+            results[index] = _item_for_point(entry, points[index])
+
+        cache.set(
+            key=cache_key,
+            value=entries[-_MAX_ENTRIES_PER_CELL:],
+            timeout=_CACHE_TIMEOUT,
+        )
+
+    return results
+
+
+def _center(points: List[Tuple[float, float, float, int]]) -> Position:
+    """returns the center of the given points"""
+    return tuple(sum(point[i] for point in points) / len(points) for i in range(3))
+
+
+def _distance(a: Iterable[float], b: Iterable[float]) -> float:
+    """returns the distance between two coordinates"""
+    return math.sqrt(sum((i - j) ** 2 for i, j in zip(a, b)))
+
+
+def _cache_key(x: float, y: float, z: float, solar_system_id: int) -> str:
+    """returns the cache key for the grid cell containing the given coordinates"""
+    grid_size = EVEUNIVERSE_NEAREST_CELESTIAL_CACHE_GRID_SIZE
+    cell = "_".join(str(math.floor(value / grid_size)) for value in (x, y, z))
+    return f"EVEUNIVERSE_NEAREST_CELESTIALS_{solar_system_id}_{grid_size}_{cell}"
+
+
+def _find_entry(entries: List[dict], point: tuple) -> Optional[dict]:
+    """returns the valid entry closest to the given point or None if there is none"""
+    valid_entries = [entry for entry in entries if _is_valid_entry(entry, *point[:3])]
+    if not valid_entries:
+        return None
+
+    return min(
+        valid_entries,
+        key=lambda entry: _distance((entry["x"], entry["y"], entry["z"]), point[:3]),
+    )
+
+
+def _is_valid_entry(entry: dict, x: float, y: float, z: float) -> bool:
+    """returns True if the cached celestial can be used for the given coordinates
+
+    The cached celestial is used when the given coordinates are close enough
+    to the originally requested coordinates compared to the distance
+    of the celestial and the distance can be recalculated
+    from the coordinates of the celestial.
+    Entries for not found celestials are always valid.
     """
-    cache_key_base = "EVEUNIVERSE_NEAREST_CELESTIAL"
+    if not entry["data"]:
+        return True
+
+    delta = _distance((entry["x"], entry["y"], entry["z"]), (x, y, z))
+    if not delta:
+        return True
+
+    if not entry["position"]:
+        return False
+
+    max_delta = (
+        float(entry["data"]["distance"]) * EVEUNIVERSE_NEAREST_CELESTIAL_CACHE_MAX_ERROR
+    )
+    return delta <= max_delta
+
+
+def _fetch_entry(
+    x: float,
+    y: float,
+    z: float,
+    solar_system_id: int,
+    celestial_position: Callable[[EveItem], Optional[Position]] = None,
+) -> dict:
+    """fetch nearest celestial from API and return it as cache entry"""
     query = urlencode(
         {
             "x": int(x),
@@ -28,19 +171,34 @@ def nearest_celestial(
             "solarsystemid": int(solar_system_id),
         }
     )
-    cache_key = f"{cache_key_base}_{query}"
-    data = cache.get(key=cache_key)
+    r = requests.get(f"https://www.fuzzwork.co.uk/api/nearestCelestial.php?{query}")
+    r.raise_for_status()
+    data = r.json()
+    if not data.get("itemName"):
+        data = None
+    position = None
+    if data and celestial_position:
+        position = celestial_position(_item_from_data(data))
+        if position:
+            position = tuple(float(value) for value in position)
+    return {"x": x, "y": y, "z": z, "data": data, "position": position}
+
+
+def _item_for_point(entry: dict, point: tuple) -> Optional[EveItem]:
+    """returns the item of an entry with the distance to the given point"""
+    item = _item_from_data(entry["data"])
+    if item and entry["position"]:
+        item = item._replace(distance=_distance(entry["position"], point[:3]))
+    return item
+
+
+def _item_from_data(data: Optional[dict]) -> Optional[EveItem]:
     if not data:
-        r = requests.get(f"https://www.fuzzwork.co.uk/api/nearestCelestial.php?{query}")
-        r.raise_for_status()
-        data = r.json()
-    if not data["itemName"]:
         return None
-    cache.set(key=cache_key, value=data, timeout=_CACHE_TIMEOUT)
-    result = EveItem(
+
+    return EveItem(
         id=int(data["itemid"]),
         name=str(data["itemName"]),
         type_id=int(data["typeid"]),
         distance=float(data["distance"]),
     )
-    return result
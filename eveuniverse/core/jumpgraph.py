@@ -0,0 +1,225 @@
+"""Graph of solar systems connected by stargates for calculating routes locally"""
+import heapq
+from array import array
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ROUTE_FLAG_SHORTEST = "shortest"
+ROUTE_FLAG_SECURE = "secure"
+ROUTE_FLAG_INSECURE = "insecure"
+ROUTE_FLAGS = (ROUTE_FLAG_SHORTEST, ROUTE_FLAG_SECURE, ROUTE_FLAG_INSECURE)
+
+
+class JumpGraph:
+    """Graph of solar systems connected by stargates.
+
+    Solar systems are mapped to consecutive indexes and the adjacency
+    of the graph is stored as one tuple of neighbor indexes per system.
+
+    Args:
+        edges: Pairs of solar system IDs, one for each stargate and its destination.
+            Destination can be None if unknown
+        security_statuses: Security status for each solar system ID
+    """
+
+    def __init__(
+        self,
+        edges: Iterable[Tuple[int, int]],
+        security_statuses: Dict[int, float] = None,
+    ) -> None:
+        adjacency = defaultdict(set)
+        destination_ids = set()
+        has_unknown_destinations = False
+        for origin_id, destination_id in edges:
+            if destination_id is None:
+                has_unknown_destinations = True
+            elif origin_id != destination_id:
+                adjacency[origin_id].add(destination_id)
+                destination_ids.add(destination_id)
+
+        self._ids = array("q", sorted(set(adjacency.keys()) | destination_ids))
+        self._index = {id: index for index, id in enumerate(self._ids)}
+        self._adjacency = tuple(
+            tuple(sorted(self._index[other_id] for other_id in adjacency.get(id, [])))
+            for id in self._ids
+        )
+
+        security_statuses = security_statuses or dict()
+        self._is_high_sec = array(
+            "b",
+            [round(security_statuses.get(id, 0.0), 1) >= 0.5 for id in self._ids],
+        )
+        self._is_complete = not has_unknown_destinations and destination_ids.issubset(
+            adjacency.keys()
+        )
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, solar_system_id: int) -> bool:
+        return solar_system_id in self._index
+
+    @property
+    def is_complete(self) -> bool:
+        """True if the stargates of all systems in this graph are known,
+        so that calculated routes are guaranteed to be the correct ones.
+        """
+        return self._is_complete
+
+    def route(
+        self,
+        origin_id: int,
+        destination_id: int,
+        flag: str = ROUTE_FLAG_SHORTEST,
+    ) -> Optional[List[int]]:
+        """Calculates a route between two solar systems.
+
+        Args:
+            origin_id: ID of the solar system to start from
+            destination_id: ID of the solar system to go to
+            flag: route preference, i.e. one of "shortest", "secure" or "insecure"
+
+        Returns:
+            List of solar system IDs incl. origin and destination or None if no route can be found
+        """
+        if flag not in ROUTE_FLAGS:
+            raise ValueError(f"Invalid flag: {flag}")
+        if origin_id not in self._index or destination_id not in self._index:
+            return None
+
+        origin = self._index[origin_id]
+        destination = self._index[destination_id]
+        if flag == ROUTE_FLAG_SHORTEST:
+            predecessors = self._bfs(origin, destination)
+        else:
+            predecessors = self._dijkstra(
+                origin, destination, avoid_high_sec=flag == ROUTE_FLAG_INSECURE
+            )
+
+        if destination not in predecessors:
+            return None
+
+        path = [destination]
+        while path[-1] != origin:
+            path.append(predecessors[path[-1]])
+        return [self._ids[index] for index in reversed(path)]
+
+    def jumps(
+        self,
+        origin_id: int,
+        destination_id: int,
+        flag: str = ROUTE_FLAG_SHORTEST,
+    ) -> Optional[int]:
+        """Calculates the number of jumps between two solar systems.
+
+        Returns:
+            Number of jumps or None if no route can be found
+        """
+        path = self.route(origin_id, destination_id, flag)
+        return len(path) - 1 if path is not None else None
+
+    def jumps_from(
+        self,
+        origin_id: int,
+        max_jumps: int = None,
+        destination_ids: Iterable[int] = None,
+    ) -> Dict[int, int]:
+        """Calculates the number of jumps from one solar system to all others.
+
+        Args:
+            origin_id: ID of the solar system to start from
+            max_jumps: when given will only include systems within that many jumps
+            destination_ids: when given will stop once all of these systems are reached
+
+        Returns:
+            Number of jumps for each reachable solar system ID incl. the origin
+        """
+        if origin_id not in self._index:
+            return dict()
+
+        if destination_ids is not None:
+            remaining = {self._index[id] for id in destination_ids if id in self._index}
+        else:
+            remaining = None
+        adjacency = self._adjacency
+        origin = self._index[origin_id]
+        jumps = [-1] * len(adjacency)
+        jumps[origin] = 0
+        visited = [origin]
+        frontier = [origin]
+        level = 0
+        while frontier and (max_jumps is None or level < max_jumps):
+            if remaining is not None:
+                remaining.difference_update(frontier)
+                if not remaining:
+                    break
+            level += 1
+            next_frontier = list()
+            for node in frontier:
+                for neighbor in adjacency[node]:
+                    if jumps[neighbor] < 0:
+                        jumps[neighbor] = level
+                        next_frontier.append(neighbor)
+            visited += next_frontier
+            frontier = next_frontier
+
+        return {self._ids[node]: jumps[node] for node in visited}
+
+    def jumps_matrix(
+        self, origin_ids: Iterable[int], destination_ids: Iterable[int]
+    ) -> Dict[int, Dict[int, Optional[int]]]:
+        """Calculates the number of jumps between many origins and destinations.
+
+        Returns:
+            Number of jumps by origin ID and destination ID.
+            The number is None if no route exists.
+        """
+        destination_ids = list(destination_ids)
+        matrix = dict()
+        for origin_id in origin_ids:
+            jumps = self.jumps_from(origin_id, destination_ids=destination_ids)
+            matrix[origin_id] = {id: jumps.get(id) for id in destination_ids}
+
+        return matrix
+
+    def _bfs(self, origin: int, destination: int) -> Dict[int, int]:
+        """returns predecessors of all nodes visited by a breadth first search"""
+        predecessors = {origin: origin}
+        queue = deque([origin])
+        while queue:
+            node = queue.popleft()
+            if node == destination:
+                break
+            for neighbor in self._adjacency[node]:
+                if neighbor not in predecessors:
+                    predecessors[neighbor] = node
+                    queue.append(neighbor)
+
+        return predecessors
+
+    def _dijkstra(
+        self, origin: int, destination: int, avoid_high_sec: bool
+    ) -> Dict[int, int]:
+        """returns predecessors of all nodes visited by a search, which minimizes
+        the number of systems to avoid first and the number of jumps second.
+        """
+        predecessors = {origin: origin}
+        costs = {origin: (0, 0)}
+        heap = [(0, 0, origin)]
+        done = set()
+        while heap:
+            avoided, jumps, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            if node == destination:
+                break
+            for neighbor in self._adjacency[node]:
+                is_avoided = bool(self._is_high_sec[neighbor]) == avoid_high_sec
+                cost = (avoided + is_avoided, jumps + 1)
+                if neighbor not in costs or cost < costs[neighbor]:
+                    costs[neighbor] = cost
+                    predecessors[neighbor] = node
+                    heapq.heappush(heap, (cost[0], cost[1], neighbor))
+
+        return predecessors
@@ -1,11 +1,23 @@
-from typing import Dict, Optional
+import re
+import secrets
+from typing import Callable, Dict, Optional
+
+from asgiref.local import Local
 
 from django.db import models
+from django.utils.html import escape
+
+_METERS_PER_LY = 9_460_730_472_580_800
 
 
 def meters_to_ly(value: float) -> float:
     """converts meters into lightyears"""
-    return float(value) / 9_460_730_472_580_800 if value is not None else None
+    return float(value) / _METERS_PER_LY if value is not None else None
+
+
+def ly_to_meters(value: float) -> float:
+    """converts lightyears into meters"""
+    return float(value) * _METERS_PER_LY if value is not None else None
 
 
 def meters_to_au(value: float) -> float:
@@ -51,3 +63,83 @@ class EveEntityNameResolver:
             name = ""
 
         return name
+
+
+class EveEntityNameCollector:
+    """Collects Eve entity IDs while rendering and resolves their names at once.
+
+    While a collector is active, the template tag ``eve_entity_name``
+    renders placeholders instead of names. All placeholders are then
+    replaced with names resolved by a single call to
+    :meth:`~eveuniverse.managers.EveEntityManager.bulk_resolve_names`.
+
+    Usage:
+
+    .. code-block:: python
+
+        with EveEntityNameCollector() as collector:
+            content = render_to_string("my_template.html", context)
+        content = collector.resolve(content)
+
+    For requests this is done by ``eveuniverse.middleware.EveEntityNamesMiddleware``.
+    """
+
+    _local = Local()
+
+    def __init__(self) -> None:
+        self._ids = set()
+        self._token = secrets.token_hex(8)
+        self._pattern = re.compile(rf"__eveentity_{self._token}_(\d+)__")
+        self._previous = None
+
+    def __enter__(self) -> "EveEntityNameCollector":
+        self._previous = self.current()
+        self._local.collector = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._local.collector = self._previous
+        self._previous = None
+
+    @classmethod
+    def current(cls) -> Optional["EveEntityNameCollector"]:
+        """returns the active collector of the current thread or task, if any"""
+        return getattr(cls._local, "collector", None)
+
+    @property
+    def ids(self) -> set:
+        """IDs collected so far"""
+        return set(self._ids)
+
+    def placeholder(self, id: int) -> str:
+        """collects an ID and returns the placeholder for its name"""
+        id = int(id)
+        self._ids.add(id)
+        return f"__eveentity_{self._token}_{id}__"
+
+    def resolve(
+        self,
+        content: str,
+        autoescape: bool = True,
+        escape_function: Callable[[str], str] = None,
+    ) -> str:
+        """replaces all placeholders in content with the names of their entities
+
+        Args:
+            content: rendered content with placeholders
+            autoescape: when True names are escaped for HTML
+            escape_function: function for escaping names, overrides autoescape
+        """
+        if not self._ids:
+            return content
+
+        from .models import EveEntity
+
+        resolver = EveEntity.objects.bulk_resolve_names(self._ids)
+        if escape_function is None:
+            escape_function = escape if autoescape else str
+
+        def _replace(match) -> str:
+            return escape_function(resolver.to_name(int(match.group(1))))
+
+        return self._pattern.sub(_replace, content)
@@ -4,7 +4,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from ... import __title__
-from ...models import EveUniverseBaseModel
+from ...models import EsiEtag, EveEntityInvalidId, EveUniverseBaseModel
 from ...utils import LoggerAddTag
 from . import get_input
 
@@ -30,6 +30,9 @@ class Command(BaseCommand):
                 )
                 MyModel.objects.all().delete()
 
+            EsiEtag.objects.all().delete()
+            EveEntityInvalidId.objects.all().delete()
+
     def handle(self, *args, **options):
         self.stdout.write(
             "This command will delete all app related data in the database. "
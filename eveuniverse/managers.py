@@ -1,22 +1,55 @@
+import asyncio
+import copy
 import datetime as dt
+import functools
 import logging
-from collections import namedtuple
-from typing import Iterable, List, Optional, Set, Tuple
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
 from urllib.parse import urljoin
 
 import requests
-from bravado.exception import HTTPNotFound
+from asgiref.sync import sync_to_async
+from bravado.exception import HTTPNotFound, HTTPNotModified
 
 from django.core.cache import cache
 from django.db import models, transaction
-from django.db.utils import IntegrityError
+from django.db.models import Count, Max
 from django.utils.timezone import now
 
 from . import __title__
-from .app_settings import EVEUNIVERSE_BULK_METHODS_BATCH_SIZE
-from .helpers import EveEntityNameResolver, get_or_create_esi_or_none
+from .app_settings import (
+    EVEUNIVERSE_BULK_METHODS_BATCH_SIZE,
+    EVEUNIVERSE_ENTITY_NAMES_CACHE_SIZE,
+    EVEUNIVERSE_ENTITY_NAMES_CACHE_TIMEOUT,
+    EVEUNIVERSE_ESI_MAX_WORKERS,
+    EVEUNIVERSE_INVALID_ENTITY_IDS_TIMEOUT,
+    EVEUNIVERSE_NEAREST_CELESTIAL_INDEX_CACHE_SIZE,
+    EVEUNIVERSE_NEAREST_CELESTIAL_INDEX_CACHE_TIMEOUT,
+    EVEUNIVERSE_SINGLE_FLIGHT_LOCK_TIMEOUT,
+    EVEUNIVERSE_SINGLE_FLIGHT_USE_CACHE_LOCK,
+    EVEUNIVERSE_SYNC_EVE_ENTITIES,
+    EVEUNIVERSE_TASKS_CHUNK_SIZE,
+    EVEUNIVERSE_USE_ESI_ETAGS,
+    EVEUNIVERSE_WRITE_CHANGES_ONLY,
+)
+from .constants import (
+    EVE_SOLAR_SYSTEM_ID_W_SPACE_MAX,
+    EVE_SOLAR_SYSTEM_ID_W_SPACE_MIN,
+    EVE_TYPE_ID_ASTEROID_BELT,
+    EVE_TYPE_ID_MOON,
+)
+from .core.coordinates import CoordinateIndex, KDTree
+from .core.jumpgraph import JumpGraph
+from .helpers import (
+    EveEntityNameResolver,
+    ly_to_meters,
+    meters_to_ly,
+)
 from .providers import esi
-from .utils import LoggerAddTag, chunks, make_logger_prefix
+from .utils import LoggerAddTag, LRUCache, SingleFlight, chunks, make_logger_prefix
 
 logger = LoggerAddTag(logging.getLogger(__name__), __title__)
 
@@ -24,60 +57,341 @@ FakeResponse = namedtuple("FakeResponse", ["status_code"])
 
 SDE_ZZEVE_URL = "https://sde.zzeve.com"
 
+_esi_single_flight = SingleFlight()
+_esi_executor = ThreadPoolExecutor(
+    max_workers=max(EVEUNIVERSE_ESI_MAX_WORKERS, 1),
+    thread_name_prefix="eveuniverse_esi",
+)
+_local_indexes = dict()
+_local_indexes_lock = threading.Lock()
+_NO_CELESTIAL_INDEX = object()  # for solar systems without all celestials stored
+_celestial_indexes = LRUCache(
+    maxsize=EVEUNIVERSE_NEAREST_CELESTIAL_INDEX_CACHE_SIZE,
+    timeout=EVEUNIVERSE_NEAREST_CELESTIAL_INDEX_CACHE_TIMEOUT,
+)
+
+
+async def _run_esi_request(
+    func: Callable, *args, key: Hashable = None, **kwargs
+) -> Any:
+    """runs a blocking request to ESI in the dedicated thread pool for ESI requests
+    and returns its result.
+
+    Concurrent requests with the same key are coalesced,
+    so that only one of them is sent to ESI.
+    """
+    func = functools.partial(func, *args, **kwargs)
+    if key is not None:
+        request = func
+
+        def func():
+            result, is_shared = _esi_single_flight.do(
+                key, request, timeout=EVEUNIVERSE_SINGLE_FLIGHT_LOCK_TIMEOUT
+            )
+            # results are not shared between threads
+            return copy.deepcopy(result) if is_shared else result
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(_esi_executor, func)
+
+
+def _bulk_upsert(
+    manager: models.Manager,
+    objs: List[models.Model],
+    update_fields: List[str],
+    only_changed: bool = False,
+) -> List[models.Model]:
+    """creates or updates the given objects in bulk, matched by primary key.
+
+    Fetches existing objects and only updates the ones that have changed.
+    Auto-now fields are always updated along with the given fields.
+    For unchanged objects only the auto-now fields are updated in one batch.
+
+    Args:
+        manager: manager of the model for the objects
+        objs: objects to create or update
+        update_fields: names of fields to update for existing objects
+        only_changed: when True will only write fields that have changed
+
+    Returns:
+        existing objects, which have been changed, as they were before the change
+    """
+    if not objs:
+        return []
+
+    Model = manager.model
+    auto_now_fields = [
+        field
+        for field in Model._meta.concrete_fields
+        if getattr(field, "auto_now", False) and field.name not in update_fields
+    ]
+    update_fields = list(update_fields) + [field.name for field in auto_now_fields]
+    fields = [Model._meta.get_field(field_name) for field_name in update_fields]
+    compared_fields = [field for field in fields if field not in auto_now_fields]
+    existing_objs = manager.in_bulk([obj.pk for obj in objs])
+    new_objs = list()
+    changed_objs = defaultdict(list)
+    unchanged_pks = list()
+    for obj in objs:
+        existing_obj = existing_objs.get(obj.pk)
+        if not existing_obj:
+            new_objs.append(obj)
+        else:
+            changed_fields = tuple(
+                field.name
+                for field in compared_fields
+                if getattr(obj, field.attname) != getattr(existing_obj, field.attname)
+            )
+            if changed_fields:
+                changed_objs[changed_fields if only_changed else None].append(obj)
+            else:
+                unchanged_pks.append(obj.pk)
+
+    if new_objs:
+        manager.bulk_create(new_objs, batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE)
+
+    timestamp = now()
+    for changed_fields, objs_group in changed_objs.items():
+        for obj in objs_group:
+            for field in auto_now_fields:
+                setattr(obj, field.attname, timestamp)
+
+        if changed_fields:
+            fields_to_update = list(changed_fields) + [
+                field.name for field in auto_now_fields
+            ]
+        else:
+            fields_to_update = update_fields
+        manager.bulk_update(
+            objs_group,
+            fields=fields_to_update,
+            batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE,
+        )
+
+    if auto_now_fields and unchanged_pks:
+        _touch_auto_now_fields(manager, unchanged_pks, auto_now_fields, timestamp)
+
+    return [
+        existing_objs[obj.pk]
+        for objs_group in changed_objs.values()
+        for obj in objs_group
+    ]
+
+
+def _touch_auto_now_fields(
+    manager: models.Manager,
+    pks: List[int],
+    auto_now_fields: list = None,
+    timestamp: dt.datetime = None,
+) -> None:
+    """sets the auto-now fields of the objects with the given primary keys"""
+    if auto_now_fields is None:
+        auto_now_fields = [
+            field
+            for field in manager.model._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        ]
+    if not auto_now_fields:
+        return
+
+    if timestamp is None:
+        timestamp = now()
+
+    values = {field.attname: timestamp for field in auto_now_fields}
+    for chunk_pks in chunks(pks, EVEUNIVERSE_BULK_METHODS_BATCH_SIZE):
+        manager.filter(pk__in=chunk_pks).update(**values)
+
+
+def _set_changed_fields(obj: models.Model, values: dict) -> List[str]:
+    """sets the given values on an object and returns the names of changed fields"""
+    changed_fields = list()
+    for field_name, value in values.items():
+        field = obj._meta.get_field(field_name)
+        new_value = value.pk if field.is_relation and value is not None else value
+        if getattr(obj, field.attname) != new_value:
+            setattr(obj, field_name, value)
+            changed_fields.append(field_name)
+
+    return changed_fields
+
+
+def _get_or_build_local_index(name: str, signature: tuple, build: Callable):
+    """returns an in-process cached index, which is rebuilt when its signature changes"""
+    with _local_indexes_lock:
+        cached = _local_indexes.get(name)
+        if not cached or cached[0] != signature:
+            cached = (signature, build())
+            _local_indexes[name] = cached
+
+        return cached[1]
+
+
+def _to_pk(obj) -> int:
+    """returns the primary key of an object or the object itself, if it is an ID"""
+    return obj.pk if isinstance(obj, models.Model) else int(obj)
+
+
+def _update_or_create_changes_only(
+    manager: models.Manager, id: int, defaults: dict
+) -> Tuple[models.Model, bool]:
+    """updates or creates an object like update_or_create(),
+    but only writes fields that have changed.
+
+    For unchanged objects only the auto-now fields are updated.
+    """
+    obj, created = manager.get_or_create(id=id, defaults=defaults)
+    if created:
+        return obj, True
+
+    changed_fields = _set_changed_fields(obj, defaults)
+    auto_now_fields = [
+        field
+        for field in manager.model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+    ]
+    if changed_fields:
+        obj.save(
+            update_fields=changed_fields + [field.name for field in auto_now_fields]
+        )
+    elif auto_now_fields:
+        timestamp = now()
+        _touch_auto_now_fields(manager, [obj.pk], auto_now_fields, timestamp)
+        for field in auto_now_fields:
+            setattr(obj, field.attname, timestamp)
+
+    return obj, False
+
+
+class EsiEtagManager(models.Manager):
+    def etags_for(self, model: type, ids: Iterable[int]) -> Dict[int, str]:
+        """returns the stored ETags for the given objects by ID"""
+        return {
+            object_id: etag
+            for object_id, etag in self.filter(
+                model_name=model.__name__, object_id__in=ids
+            ).values_list("object_id", "etag")
+        }
+
+    def bulk_store(self, model: type, etags: Dict[int, str]) -> None:
+        """stores ETags for the given objects, replacing existing ETags"""
+        if not etags:
+            return
+
+        with transaction.atomic():
+            self.filter(model_name=model.__name__, object_id__in=etags.keys()).delete()
+            self.bulk_create(
+                [
+                    self.model(model_name=model.__name__, object_id=id, etag=etag)
+                    for id, etag in etags.items()
+                ],
+                batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE,
+            )
+
+
+class EveEntityInvalidIdManager(models.Manager):
+    def filter_invalid_ids(self, ids: Iterable[int]) -> Set[int]:
+        """returns the given IDs, which are known to be invalid and not timed out"""
+        min_updated_at = now() - dt.timedelta(
+            seconds=EVEUNIVERSE_INVALID_ENTITY_IDS_TIMEOUT
+        )
+        invalid_ids = set()
+        for chunk_ids in chunks(list(ids), EVEUNIVERSE_BULK_METHODS_BATCH_SIZE):
+            invalid_ids.update(
+                self.filter(
+                    id__in=chunk_ids, updated_at__gt=min_updated_at
+                ).values_list("id", flat=True)
+            )
+
+        return invalid_ids
+
+    def bulk_store(self, ids: Iterable[int]) -> None:
+        """stores the given IDs as invalid, resetting their timeout"""
+        ids = set(ids)
+        if not ids:
+            return
+
+        with transaction.atomic():
+            self.filter(id__in=ids).delete()
+            self.bulk_create(
+                [self.model(id=id) for id in ids],
+                batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE,
+            )
+
 
 class EveUniverseBaseModelManager(models.Manager):
     def _defaults_from_esi_obj(
         self, eve_data_obj: dict, enabled_sections: Set[str] = None
     ) -> dict:
         """compiles defaults from an esi data object for update/creating the model"""
-        defaults = dict()
-        for field_name, mapping in self.model._esi_mapping(enabled_sections).items():
-            if not mapping.is_pk:
-                if not isinstance(mapping.esi_name, tuple):
-                    if mapping.esi_name in eve_data_obj:
-                        esi_value = eve_data_obj[mapping.esi_name]
-                    else:
-                        esi_value = None
+        return self._bulk_defaults_from_esi_objs([eve_data_obj], enabled_sections)[0]
+
+    def _bulk_defaults_from_esi_objs(
+        self, eve_data_objs: List[dict], enabled_sections: Set[str] = None
+    ) -> List[dict]:
+        """compiles defaults from a list of esi data objects
+        for update/creating the model.
+
+        Related objects are fetched with one query per related model
+        and missing related objects are created in one batch per related model.
+
+        Returns:
+            list of defaults in the same order as the given esi data objects
+        """
+        esi_mapping = self.model._esi_mapping(enabled_sections)
+        extractor = self.model._esi_extractor(enabled_sections)
+        values_list = [extractor(eve_data_obj) for eve_data_obj in eve_data_objs]
+        fk_mappings = {
+            field_name: mapping
+            for field_name, mapping in esi_mapping.items()
+            if mapping.is_fk and not mapping.is_pk
+        }
+        related_ids = defaultdict(set)
+        creatable_ids = defaultdict(set)
+        for values in values_list:
+            for field_name, mapping in fk_mappings.items():
+                if field_name in values:
+                    related_ids[mapping.related_model].add(values[field_name])
+                    if mapping.create_related:
+                        creatable_ids[mapping.related_model].add(values[field_name])
+
+        related_objs = dict()
+        for ParentClass, ids in related_ids.items():
+            objs = ParentClass.objects.in_bulk(ids)
+            missing_ids = creatable_ids[ParentClass].difference(objs.keys())
+            if missing_ids:
+                objs.update(self._bulk_create_related_esi(ParentClass, missing_ids))
+            related_objs[ParentClass] = objs
+
+        defaults_list = list()
+        for values in values_list:
+            defaults = dict()
+            for field_name, esi_value in values.items():
+                if field_name in fk_mappings:
+                    ParentClass = fk_mappings[field_name].related_model
+                    defaults[field_name] = related_objs[ParentClass].get(esi_value)
                 else:
-                    if (
-                        mapping.esi_name[0] in eve_data_obj
-                        and mapping.esi_name[1] in eve_data_obj[mapping.esi_name[0]]
-                    ):
-                        esi_value = eve_data_obj[mapping.esi_name[0]][
-                            mapping.esi_name[1]
-                        ]
-                    else:
-                        esi_value = None
-
-                if esi_value is not None:
-                    if mapping.is_fk:
-                        ParentClass = mapping.related_model
-                        try:
-                            value = ParentClass.objects.get(id=esi_value)
-                        except ParentClass.DoesNotExist:
-                            value = None
-                            if mapping.create_related:
-                                try:
-                                    value, _ = ParentClass.objects.update_or_create_esi(
-                                        id=esi_value,
-                                        include_children=False,
-                                        wait_for_children=True,
-                                    )
-                                except AttributeError:
-                                    pass
+                    defaults[field_name] = esi_value
 
-                    else:
-                        if mapping.is_charfield and esi_value is None:
-                            value = ""
-                        else:
-                            value = esi_value
+            defaults_list.append(defaults)
 
-                    defaults[field_name] = value
+        return defaults_list
+
+    @staticmethod
+    def _bulk_create_related_esi(ParentClass: type, ids: Set[int]) -> dict:
+        """creates missing related objects from ESI and returns them by ID.
+        Returns an empty dict if the related model can not be loaded from ESI.
+        """
+        if not hasattr(ParentClass.objects, "bulk_get_or_create_esi"):
+            return dict()
 
-        return defaults
+        return ParentClass.objects.bulk_get_or_create_esi(
+            ids=ids, include_children=False, wait_for_children=True
+        ).in_bulk()
 
 
 class EveUniverseEntityModelManager(EveUniverseBaseModelManager):
+    _supports_etags = True
+
     def get_or_create_esi(
         self,
         *,
@@ -114,6 +428,55 @@ class EveUniverseEntityModelManager(EveUniverseBaseModelManager):
                 enabled_sections=enabled_sections,
             )
 
+    async def aget_or_create_esi(
+        self,
+        *,
+        id: int,
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+    ) -> Tuple[models.Model, bool]:
+        """gets or creates an eve universe object. Async version of
+        :meth:`get_or_create_esi`.
+
+        Requests to ESI are made in a dedicated thread pool, so they neither block
+        the event loop nor the thread for database access.
+
+        Args:
+            id: Eve Online ID of object
+            include_children: if child objects should be updated/created as well (only when a new object is created)
+            wait_for_children: when true child objects will be updated/created blocking (if any), else async (only when a new object is created)
+            enabled_sections: Sections to load regardless of current settings
+
+        Returns:
+            A tuple consisting of the requested object and a created flag
+        """
+        id = int(id)
+        enabled_sections = self.model._enabled_sections_union(enabled_sections)
+        enabled_sections_filter = self._enabled_sections_filter(enabled_sections)
+        obj = await sync_to_async(
+            self.filter(**enabled_sections_filter).filter(id=id).first,
+            thread_sensitive=True,
+        )()
+        if obj:
+            return obj, False
+
+        return await self.aupdate_or_create_esi(
+            id=id,
+            include_children=include_children,
+            wait_for_children=wait_for_children,
+            enabled_sections=enabled_sections,
+        )
+
+    def filter_stale(self, older_than: dt.timedelta) -> models.QuerySet:
+        """returns all objects, which have not been updated from ESI
+        since the given time.
+
+        Args:
+            older_than: Max time since last update for objects to be current
+        """
+        return self.filter(last_updated__lt=now() - older_than)
+
     def _enabled_sections_filter(self, enabled_sections: Iterable[str]) -> dict:
         return {
             "enabled_sections": getattr(self.model.enabled_sections, section)
@@ -138,49 +501,154 @@ class EveUniverseEntityModelManager(EveUniverseBaseModelManager):
             wait_for_children: when true child objects will be updated/created blocking (if any), else async
             enabled_sections: Sections to load regardless of current settings, e.g. `[EveType.Section.DOGMAS]` will always load dogmas for EveTypes
 
+        Concurrent calls for the same object are coalesced,
+        so that each object is only fetched once from ESI.
+
         Returns:
             A tuple consisting of the requested object and a created flag
         """
         id = int(id)
-        add_prefix = make_logger_prefix("%s(id=%s)" % (self.model.__name__, id))
         enabled_sections = self.model._enabled_sections_union(enabled_sections)
+        key = "%s_%d_%s_%d_%d" % (
+            self.model._meta.label,
+            id,
+            ",".join(sorted(str(section) for section in enabled_sections)),
+            bool(include_children),
+            bool(wait_for_children),
+        )
+
+        def _update_or_create_esi_with_lock():
+            return self._update_or_create_esi_with_lock(
+                key=key,
+                id=id,
+                include_children=include_children,
+                wait_for_children=wait_for_children,
+                enabled_sections=enabled_sections,
+            )
+
+        (obj, created), is_shared = _esi_single_flight.do(
+            key,
+            _update_or_create_esi_with_lock,
+            timeout=EVEUNIVERSE_SINGLE_FLIGHT_LOCK_TIMEOUT,
+        )
+        if is_shared:
+            # objects are not shared between threads
+            try:
+                return self.get(id=id), False
+            except self.model.DoesNotExist:
+                # the write of the other thread is not yet visible to us
+                return _update_or_create_esi_with_lock()
+
+        return obj, created
+
+    def _update_or_create_esi_with_lock(
+        self, *, key: str, id: int, **kwargs
+    ) -> Tuple[models.Model, bool]:
+        """updates or creates an Eve universe object from ESI
+        while holding a cache lock for it (if enabled).
+
+        When another process holds the lock, will wait for it to finish
+        and return the object created by that process.
+        """
+        if not EVEUNIVERSE_SINGLE_FLIGHT_USE_CACHE_LOCK:
+            return self._update_or_create_esi(id=id, **kwargs)
+
+        lock_key = f"EVEUNIVERSE_UPDATE_OR_CREATE_ESI_LOCK_{key}"
+        timeout = EVEUNIVERSE_SINGLE_FLIGHT_LOCK_TIMEOUT
+        if not cache.add(lock_key, True, timeout=timeout):
+            deadline = time.monotonic() + timeout
+            while cache.get(lock_key) and time.monotonic() < deadline:
+                time.sleep(0.1)
+
+            enabled_sections_filter = self._enabled_sections_filter(
+                kwargs["enabled_sections"]
+            )
+            try:
+                return self.filter(**enabled_sections_filter).get(id=id), False
+            except self.model.DoesNotExist:
+                # other process failed, so we try ourselves
+                if not cache.add(lock_key, True, timeout=timeout):
+                    return self._update_or_create_esi(id=id, **kwargs)
+
         try:
-            eve_data_obj = self._transform_esi_response_for_list_endpoints(
-                id, self._fetch_from_esi(id=id, enabled_sections=enabled_sections)
-            )
-            if eve_data_obj:
-                defaults = self._defaults_from_esi_obj(eve_data_obj, enabled_sections)
-                obj, created = self.update_or_create(id=id, defaults=defaults)
-                if enabled_sections and hasattr(obj, "enabled_sections"):
-                    updated_sections = False
-                    for section in enabled_sections:
-                        if str(section) in self.model.Section.values():
-                            setattr(obj.enabled_sections, section, True)
-                            updated_sections = True
-                    if updated_sections:
-                        obj.save()
-                inline_objects = self.model._inline_objects(enabled_sections)
-                if inline_objects:
-                    self._update_or_create_inline_objects(
-                        parent_eve_data_obj=eve_data_obj,
-                        parent_obj=obj,
-                        inline_objects=inline_objects,
-                        wait_for_children=wait_for_children,
-                        enabled_sections=enabled_sections,
-                    )
-                if include_children:
-                    self._update_or_create_children(
-                        parent_eve_data_obj=eve_data_obj,
-                        include_children=include_children,
-                        wait_for_children=wait_for_children,
-                        enabled_sections=enabled_sections,
-                    )
-            else:
-                raise HTTPNotFound(
-                    FakeResponse(status_code=404),
-                    message=f"{self.model.__name__} object with id {id} not found",
-                )
+            return self._update_or_create_esi(id=id, **kwargs)
+        finally:
+            cache.delete(lock_key)
 
+    def _update_or_create_esi(
+        self,
+        *,
+        id: int,
+        include_children: bool,
+        wait_for_children: bool,
+        enabled_sections: Iterable[str],
+    ) -> Tuple[models.Model, bool]:
+        add_prefix = make_logger_prefix("%s(id=%s)" % (self.model.__name__, id))
+        try:
+            etag = self._stored_etags([id], enabled_sections).get(id)
+            eve_data_obj, etag = self._fetch_eve_data_obj_with_etag(
+                id=id, enabled_sections=enabled_sections, etag=etag
+            )
+            obj, created = self._update_or_create_from_esi_response(
+                id=id,
+                eve_data_obj=eve_data_obj,
+                etag=etag,
+                include_children=include_children,
+                wait_for_children=wait_for_children,
+                enabled_sections=enabled_sections,
+            )
+        except Exception as ex:
+            logger.warn(
+                add_prefix("Failed to update or create: %s" % ex),
+                exc_info=True,
+            )
+            raise ex
+
+        return obj, created
+
+    async def aupdate_or_create_esi(
+        self,
+        *,
+        id: int,
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+    ) -> Tuple[models.Model, bool]:
+        """updates or creates an Eve universe object by fetching it from ESI.
+        Async version of :meth:`update_or_create_esi`.
+
+        Requests to ESI are made in a dedicated thread pool, so they neither block
+        the event loop nor the thread for database access.
+
+        Args:
+            id: Eve Online ID of object
+            include_children: if child objects should be updated/created as well (if any)
+            wait_for_children: when true child objects will be updated/created blocking (if any), else async
+            enabled_sections: Sections to load regardless of current settings
+
+        Returns:
+            A tuple consisting of the requested object and a created flag
+        """
+        id = int(id)
+        add_prefix = make_logger_prefix("%s(id=%s)" % (self.model.__name__, id))
+        enabled_sections = self.model._enabled_sections_union(enabled_sections)
+        try:
+            etags = await sync_to_async(self._stored_etags, thread_sensitive=True)(
+                [id], enabled_sections
+            )
+            eve_data_obj, etag = await self._afetch_eve_data_obj_with_etag(
+                id=id, enabled_sections=enabled_sections, etag=etags.get(id)
+            )
+            obj, created = await sync_to_async(
+                self._update_or_create_from_esi_response, thread_sensitive=True
+            )(
+                id=id,
+                eve_data_obj=eve_data_obj,
+                etag=etag,
+                include_children=include_children,
+                wait_for_children=wait_for_children,
+                enabled_sections=enabled_sections,
+            )
         except Exception as ex:
             logger.warn(
                 add_prefix("Failed to update or create: %s" % ex),
@@ -190,6 +658,356 @@ class EveUniverseEntityModelManager(EveUniverseBaseModelManager):
 
         return obj, created
 
+    def _fetch_eve_data_obj(
+        self, id: int, enabled_sections: Iterable[str] = None
+    ) -> dict:
+        """fetches the esi data object for an Eve universe object from ESI.
+
+        Raises HTTPNotFound if the object does not exist.
+        """
+        eve_data_obj = self._transform_esi_response_for_list_endpoints(
+            id, self._fetch_from_esi(id=id, enabled_sections=enabled_sections)
+        )
+        if not eve_data_obj:
+            raise HTTPNotFound(
+                FakeResponse(status_code=404),
+                message=f"{self.model.__name__} object with id {id} not found",
+            )
+
+        return eve_data_obj
+
+    def _uses_etags(self) -> bool:
+        """returns True if conditional requests with ETags are used for this model"""
+        return (
+            EVEUNIVERSE_USE_ESI_ETAGS
+            and self._supports_etags
+            and not self.model._is_list_only_endpoint()
+        )
+
+    def _stored_etags(
+        self, ids: Iterable[int], enabled_sections: Iterable[str]
+    ) -> Dict[int, str]:
+        """returns stored ETags by ID for the given objects.
+
+        ETags are only returned for objects, which exist
+        and have all requested sections loaded.
+        """
+        from .models import EsiEtag
+
+        if not self._uses_etags():
+            return dict()
+
+        existing_ids = self.filter(id__in=ids).filter(
+            **self._enabled_sections_filter(enabled_sections)
+        )
+        return EsiEtag.objects.etags_for(
+            self.model, existing_ids.values_list("id", flat=True)
+        )
+
+    def _store_etags(self, etags: Dict[int, Optional[str]]) -> None:
+        from .models import EsiEtag
+
+        if self._uses_etags():
+            EsiEtag.objects.bulk_store(
+                self.model, {id: etag for id, etag in etags.items() if etag}
+            )
+
+    def _fetch_eve_data_obj_with_etag(
+        self, id: int, enabled_sections: Iterable[str] = None, etag: str = None
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """fetches the esi data object for an Eve universe object from ESI
+        with a conditional request if an ETag is given.
+
+        Returns:
+            A tuple consisting of the esi data object and its ETag.
+            The esi data object is None if it has not changed since the given ETag.
+        """
+        if not self._uses_etags():
+            return (
+                self._fetch_eve_data_obj(id=id, enabled_sections=enabled_sections),
+                None,
+            )
+
+        args = {self.model._esi_pk(): id}
+        if etag:
+            args["_request_options"] = {"headers": {"If-None-Match": etag}}
+        category, method = self.model._esi_path_object()
+        operation = getattr(getattr(esi.client, category), method)(**args)
+        operation.request_config.also_return_response = True
+        try:
+            eve_data_obj, response = operation.results()
+        except HTTPNotModified:
+            return None, etag
+
+        new_etag = response.headers.get("ETag")
+        if etag and new_etag == etag:
+            return None, etag  # response was served from cache
+
+        if not eve_data_obj:
+            raise HTTPNotFound(
+                FakeResponse(status_code=404),
+                message=f"{self.model.__name__} object with id {id} not found",
+            )
+
+        return eve_data_obj, new_etag
+
+    def _fetch_eve_data_objs(
+        self,
+        ids: Iterable[int],
+        enabled_sections: Iterable[str] = None,
+        max_workers: int = None,
+        etags: Dict[int, str] = None,
+    ) -> Tuple[Dict[int, dict], Dict[int, str]]:
+        """fetches esi data objects for many Eve universe objects from ESI.
+
+        Requests are made concurrently by a pool of threads.
+        Raises the exception of the first failed request, if any.
+
+        Args:
+            etags: ETags by ID, for making conditional requests
+
+        Returns:
+            esi data objects by ID and their ETags by ID.
+            Objects which have not changed since their ETag are omitted.
+        """
+        ids = sorted(ids)
+        etags = etags or dict()
+        if max_workers is None:
+            max_workers = EVEUNIVERSE_ESI_MAX_WORKERS
+
+        if self.model._is_list_only_endpoint():
+            return self._fetch_eve_data_objs_from_list(ids, enabled_sections), dict()
+
+        if max_workers <= 1 or len(ids) <= 1:
+            responses = {
+                id: self._fetch_eve_data_obj_with_etag(
+                    id=id, enabled_sections=enabled_sections, etag=etags.get(id)
+                )
+                for id in ids
+            }
+        else:
+            esi.client  # make sure the client is initialized before threads access it
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(ids))) as executor:
+                futures = {
+                    id: executor.submit(
+                        self._fetch_eve_data_obj_with_etag,
+                        id=id,
+                        enabled_sections=enabled_sections,
+                        etag=etags.get(id),
+                    )
+                    for id in ids
+                }
+            responses = {id: future.result() for id, future in futures.items()}
+
+        return self._split_esi_responses(responses)
+
+    def _fetch_eve_data_objs_from_list(
+        self, ids: Iterable[int], enabled_sections: Iterable[str] = None
+    ) -> Dict[int, dict]:
+        """fetches esi data objects for many Eve universe objects
+        with a single request to their list endpoint.
+        """
+        esi_data = self._fetch_from_esi(enabled_sections=enabled_sections)
+        return {
+            id: self._transform_esi_response_for_list_endpoints(id, esi_data)
+            for id in ids
+        }
+
+    @staticmethod
+    def _split_esi_responses(
+        responses: Dict[int, Tuple[Optional[dict], Optional[str]]]
+    ) -> Tuple[Dict[int, dict], Dict[int, str]]:
+        eve_data_objs = {
+            id: eve_data_obj
+            for id, (eve_data_obj, _) in responses.items()
+            if eve_data_obj is not None
+        }
+        etags = {id: etag for id, (_, etag) in responses.items() if etag}
+        return eve_data_objs, etags
+
+    async def _afetch_eve_data_objs(
+        self,
+        ids: Iterable[int],
+        enabled_sections: Iterable[str] = None,
+        max_workers: int = None,
+        etags: Dict[int, str] = None,
+    ) -> Tuple[Dict[int, dict], Dict[int, str]]:
+        """fetches esi data objects for many Eve universe objects from ESI.
+        Async version of :meth:`_fetch_eve_data_objs`.
+        """
+        ids = sorted(ids)
+        etags = etags or dict()
+        if max_workers is None:
+            max_workers = EVEUNIVERSE_ESI_MAX_WORKERS
+
+        if self.model._is_list_only_endpoint():
+            eve_data_objs = await _run_esi_request(
+                self._fetch_eve_data_objs_from_list, ids, enabled_sections
+            )
+            return eve_data_objs, dict()
+
+        # make sure the client is initialized before concurrent requests access it
+        await _run_esi_request(getattr, esi, "client")
+        semaphore = asyncio.Semaphore(max(max_workers, 1))
+
+        async def _fetch(id: int) -> Tuple[Optional[dict], Optional[str]]:
+            async with semaphore:
+                return await self._afetch_eve_data_obj_with_etag(
+                    id=id, enabled_sections=enabled_sections, etag=etags.get(id)
+                )
+
+        responses = await asyncio.gather(*[_fetch(id) for id in ids])
+        return self._split_esi_responses(dict(zip(ids, responses)))
+
+    async def _afetch_eve_data_obj_with_etag(
+        self, *, id: int, enabled_sections: Iterable[str], etag: Optional[str]
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """fetches the esi data object for an Eve universe object from ESI.
+        Async version of :meth:`_fetch_eve_data_obj_with_etag`.
+
+        Concurrent requests for the same object are coalesced.
+        """
+        key = "%s_%d_%s_%s_fetch" % (
+            self.model._meta.label,
+            id,
+            ",".join(sorted(str(section) for section in enabled_sections or [])),
+            etag,
+        )
+        return await _run_esi_request(
+            self._fetch_eve_data_obj_with_etag,
+            key=key,
+            id=id,
+            enabled_sections=enabled_sections,
+            etag=etag,
+        )
+
+    def _update_or_create_from_esi_response(
+        self,
+        *,
+        id: int,
+        eve_data_obj: Optional[dict],
+        etag: Optional[str],
+        include_children: bool,
+        wait_for_children: bool,
+        enabled_sections: Iterable[str],
+    ) -> Tuple[models.Model, bool]:
+        """updates or creates an Eve universe object from an ESI response
+        and stores its ETag.
+
+        When the object has not changed only its last updated timestamp is renewed.
+        """
+        if eve_data_obj is None:
+            self.filter(id=id).update(last_updated=now())
+            return self.get(id=id), False
+
+        obj, created = self._update_or_create_from_eve_data_obj(
+            id=id,
+            eve_data_obj=eve_data_obj,
+            include_children=include_children,
+            wait_for_children=wait_for_children,
+            enabled_sections=enabled_sections,
+        )
+        self._store_etags({id: etag})
+        return obj, created
+
+    def _update_or_create_from_eve_data_obj(
+        self,
+        *,
+        id: int,
+        eve_data_obj: dict,
+        include_children: bool,
+        wait_for_children: bool,
+        enabled_sections: Iterable[str],
+        defaults: dict = None,
+    ) -> Tuple[models.Model, bool]:
+        """updates or creates an Eve universe object from an esi data object
+        incl. it's inline objects and children.
+
+        Args:
+            defaults: precompiled defaults for this object, will be compiled if missing
+        """
+        if defaults is None:
+            defaults = self._defaults_from_esi_obj(eve_data_obj, enabled_sections)
+        if EVEUNIVERSE_WRITE_CHANGES_ONLY:
+            obj, created = _update_or_create_changes_only(self, id, defaults)
+        else:
+            obj, created = self.update_or_create(id=id, defaults=defaults)
+        if self._set_enabled_sections(obj, enabled_sections):
+            obj.save(update_fields=["enabled_sections", "last_updated"])
+        self._update_or_create_related_objects(
+            obj=obj,
+            eve_data_obj=eve_data_obj,
+            include_children=include_children,
+            wait_for_children=wait_for_children,
+            enabled_sections=enabled_sections,
+        )
+        self._clear_celestial_indexes([obj])
+        self._sync_eve_entities([obj])
+
+        return obj, created
+
+    def _set_enabled_sections(
+        self, obj: models.Model, enabled_sections: Iterable[str]
+    ) -> bool:
+        """enables the given sections on an object without saving it.
+
+        Returns:
+            True if any section was enabled, else False
+        """
+        if not enabled_sections or not hasattr(obj, "enabled_sections"):
+            return False
+
+        updated_sections = False
+        for section in enabled_sections:
+            if str(section) in self.model.Section.values() and not getattr(
+                obj.enabled_sections, str(section)
+            ):
+                setattr(obj.enabled_sections, section, True)
+                updated_sections = True
+
+        return updated_sections
+
+    def _update_or_create_related_objects(
+        self,
+        *,
+        obj: models.Model,
+        eve_data_obj: dict,
+        include_children: bool,
+        wait_for_children: bool,
+        enabled_sections: Iterable[str],
+    ) -> None:
+        """updates or creates the inline objects and children
+        of an object after it has been written.
+        """
+        inline_objects = self.model._inline_objects(enabled_sections)
+        if inline_objects:
+            self._update_or_create_inline_objects(
+                parent_eve_data_obj=eve_data_obj,
+                parent_obj=obj,
+                inline_objects=inline_objects,
+                wait_for_children=wait_for_children,
+                enabled_sections=enabled_sections,
+            )
+        if include_children:
+            self._update_or_create_children(
+                parent_eve_data_obj=eve_data_obj,
+                include_children=include_children,
+                wait_for_children=wait_for_children,
+                enabled_sections=enabled_sections,
+            )
+
+    def _clear_celestial_indexes(self, objs: Iterable[models.Model]) -> None:
+        """clears the cached celestial indexes of the solar systems
+        the given objects belong to, if they are celestials
+        """
+
+    def _sync_eve_entities(self, objs: Iterable[models.Model]) -> None:
+        """updates or creates EveEntity objects for the given objects if enabled"""
+        if EVEUNIVERSE_SYNC_EVE_ENTITIES and self.model.eve_entity_category():
+            from .models import EveEntity
+
+            EveEntity.objects.sync_from_universe_objs(objs)
+
     def _fetch_from_esi(
         self, id: int = None, enabled_sections: Iterable[str] = None
     ) -> dict:
@@ -238,7 +1056,7 @@ class EveUniverseEntityModelManager(EveUniverseBaseModelManager):
         for the parent eve objects as defined for this parent model (if any)
         """
         from .tasks import (
-            update_or_create_inline_object as task_update_or_create_inline_object,
+            update_or_create_inline_objects as task_update_or_create_inline_objects,
         )
 
         if not parent_eve_data_obj or not parent_obj:
@@ -248,61 +1066,151 @@ class EveUniverseEntityModelManager(EveUniverseBaseModelManager):
             )
 
         for inline_field, model_name in inline_objects.items():
+            InlineModel = self.model.get_model_class(model_name)
+            esi_mapping = InlineModel._esi_mapping()
+            parent_fk = None
+            other_pk = None
+            ParentClass2 = None
+            for field_name, mapping in esi_mapping.items():
+                if mapping.is_pk:
+                    if mapping.is_parent_fk:
+                        parent_fk = field_name
+                    else:
+                        other_pk = (field_name, mapping)
+                        ParentClass2 = mapping.related_model
+
+            if not parent_fk or not other_pk:
+                raise ValueError(
+                    "ESI Mapping for %s not valid: %s, %s"
+                    % (
+                        model_name,
+                        parent_fk,
+                        other_pk,
+                    )
+                )
+
+            parent2_model_name = ParentClass2.__name__ if ParentClass2 else None
+            other_pk_info = {
+                "name": other_pk[0],
+                "esi_name": other_pk[1].esi_name,
+                "is_fk": other_pk[1].is_fk,
+            }
+            eve_data_objs = parent_eve_data_obj.get(inline_field) or []
             if (
-                inline_field in parent_eve_data_obj
-                and parent_eve_data_obj[inline_field]
+                not eve_data_objs
+                and not InlineModel.objects.filter(
+                    **{f"{parent_fk}_id": parent_obj.id}
+                ).exists()
             ):
-                InlineModel = self.model.get_model_class(model_name)
-                esi_mapping = InlineModel._esi_mapping()
-                parent_fk = None
-                other_pk = None
-                ParentClass2 = None
-                for field_name, mapping in esi_mapping.items():
-                    if mapping.is_pk:
-                        if mapping.is_parent_fk:
-                            parent_fk = field_name
-                        else:
-                            other_pk = (field_name, mapping)
-                            ParentClass2 = mapping.related_model
-
-                if not parent_fk or not other_pk:
-                    raise ValueError(
-                        "ESI Mapping for %s not valid: %s, %s"
-                        % (
-                            model_name,
-                            parent_fk,
-                            other_pk,
-                        )
+                continue  # nothing to create or delete
+
+            if wait_for_children:
+                self._sync_inline_objects(
+                    parent_obj_id=parent_obj.id,
+                    parent_fk=parent_fk,
+                    eve_data_objs=eve_data_objs,
+                    other_pk_info=other_pk_info,
+                    parent2_model_name=parent2_model_name,
+                    inline_model_name=model_name,
+                )
+            else:
+                task_update_or_create_inline_objects.delay(
+                    parent_obj_id=parent_obj.id,
+                    parent_fk=parent_fk,
+                    eve_data_objs=eve_data_objs,
+                    other_pk_info=other_pk_info,
+                    parent2_model_name=parent2_model_name,
+                    inline_model_name=model_name,
+                    parent_model_name=type(parent_obj).__name__,
+                )
+
+    def _sync_inline_objects(
+        self,
+        *,
+        parent_obj_id: int,
+        parent_fk: str,
+        eve_data_objs: List[dict],
+        other_pk_info: dict,
+        parent2_model_name: str,
+        inline_model_name: str,
+    ) -> None:
+        """Synchronizes all inline objects of one model for a parent object in bulk.
+
+        Creates new, updates changed and deletes obsolete inline objects,
+        so that they match the given list of eve data objects.
+        Will automatically create additional parent objects as needed
+        """
+        InlineModel = self.model.get_model_class(inline_model_name)
+        parent_fk_attname = f"{parent_fk}_id"
+        if not eve_data_objs:
+            InlineModel.objects.filter(**{parent_fk_attname: parent_obj_id}).delete()
+            return
+
+        eve_data_objs_by_key = {
+            eve_data_obj.get(other_pk_info["esi_name"]): eve_data_obj
+            for eve_data_obj in eve_data_objs
+        }
+        if other_pk_info["is_fk"]:
+            other_pk_attname = f"{other_pk_info['name']}_id"
+            ParentClass2 = self.model.get_model_class(parent2_model_name)
+            parent2_ids = set(
+                ParentClass2.objects.filter(
+                    id__in=eve_data_objs_by_key.keys()
+                ).values_list("id", flat=True)
+            )
+            missing_ids = set(eve_data_objs_by_key.keys()).difference(parent2_ids)
+            if missing_ids:
+                parent2_ids.update(
+                    self._bulk_create_related_esi(ParentClass2, missing_ids).keys()
+                )
+            eve_data_objs_by_key = {
+                key: eve_data_obj
+                for key, eve_data_obj in eve_data_objs_by_key.items()
+                if key in parent2_ids
+            }
+        else:
+            other_pk_attname = other_pk_info["name"]
+
+        defaults_list = InlineModel.objects._bulk_defaults_from_esi_objs(
+            list(eve_data_objs_by_key.values())
+        )
+        existing_objs = {
+            getattr(obj, other_pk_attname): obj
+            for obj in InlineModel.objects.filter(**{parent_fk_attname: parent_obj_id})
+        }
+        new_objs = list()
+        changed_objs = list()
+        changed_fields = set()
+        for key, defaults in zip(eve_data_objs_by_key.keys(), defaults_list):
+            obj = existing_objs.pop(key, None)
+            if obj is None:
+                new_objs.append(
+                    InlineModel(
+                        **{parent_fk_attname: parent_obj_id, other_pk_attname: key},
+                        **defaults,
                     )
+                )
+            else:
+                obj_changed_fields = _set_changed_fields(obj, defaults)
+                if obj_changed_fields:
+                    changed_objs.append(obj)
+                    changed_fields.update(obj_changed_fields)
 
-                parent2_model_name = ParentClass2.__name__ if ParentClass2 else None
-                other_pk_info = {
-                    "name": other_pk[0],
-                    "esi_name": other_pk[1].esi_name,
-                    "is_fk": other_pk[1].is_fk,
-                }
-                for eve_data_obj in parent_eve_data_obj[inline_field]:
-                    if wait_for_children:
-                        self._update_or_create_inline_object(
-                            parent_obj_id=parent_obj.id,
-                            parent_fk=parent_fk,
-                            eve_data_obj=eve_data_obj,
-                            other_pk_info=other_pk_info,
-                            parent2_model_name=parent2_model_name,
-                            inline_model_name=model_name,
-                            enabled_sections=enabled_sections,
-                        )
-                    else:
-                        task_update_or_create_inline_object(
-                            parent_obj_id=parent_obj.id,
-                            parent_fk=parent_fk,
-                            eve_data_obj=eve_data_obj,
-                            other_pk_info=other_pk_info,
-                            parent2_model_name=parent2_model_name,
-                            inline_model_name=model_name,
-                            parent_model_name=type(parent_obj).__name__,
-                            enabled_sections=list(enabled_sections),
-                        )
+        with transaction.atomic():
+            if existing_objs:
+                InlineModel.objects.filter(
+                    pk__in=[obj.pk for obj in existing_objs.values()]
+                ).delete()
+            if new_objs:
+                InlineModel.objects.bulk_create(
+                    new_objs, batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE
+                )
+            if changed_objs:
+                InlineModel.objects.bulk_update(
+                    changed_objs,
+                    fields=sorted(changed_fields),
+                    batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE,
+                )
 
     def _update_or_create_inline_object(
         self,
@@ -349,7 +1257,7 @@ class EveUniverseEntityModelManager(EveUniverseBaseModelManager):
     ) -> None:
         """updates or creates child objects as defined for this parent model (if any)"""
         from .tasks import (
-            update_or_create_eve_object as task_update_or_create_eve_object,
+            update_or_create_eve_objects as task_update_or_create_eve_objects,
         )
 
         if not parent_eve_data_obj:
@@ -360,133 +1268,394 @@ class EveUniverseEntityModelManager(EveUniverseBaseModelManager):
 
         for key, child_class in self.model._children(enabled_sections).items():
             if key in parent_eve_data_obj and parent_eve_data_obj[key]:
-                for obj in parent_eve_data_obj[key]:
-                    # TODO: Refactor this hack
-                    id = obj["planet_id"] if key == "planets" else obj
+                # TODO: Refactor this hack
+                ids = [
+                    obj["planet_id"] if key == "planets" else obj
+                    for obj in parent_eve_data_obj[key]
+                ]
+                if wait_for_children:
+                    ChildClass = self.model.get_model_class(child_class)
+                    ChildClass.objects.bulk_update_or_create_esi(
+                        ids=ids,
+                        include_children=include_children,
+                        wait_for_children=wait_for_children,
+                        enabled_sections=enabled_sections,
+                    )
+                else:
+                    for chunk_ids in chunks(ids, EVEUNIVERSE_TASKS_CHUNK_SIZE):
+                        task_update_or_create_eve_objects.delay(
+                            child_class,
+                            chunk_ids,
+                            include_children=include_children,
+                            wait_for_children=wait_for_children,
+                            enabled_sections=list(enabled_sections),
+                        )
+
+    def update_or_create_all_esi(
+        self,
+        *,
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+    ) -> None:
+        """updates or creates all objects of this class from ESI.
+
+        Loading all objects can take a long time. Use with care!
+
+        Args:
+            include_children: if child objects should be updated/created as well (if any)
+            wait_for_children: when false all objects will be loaded async, else blocking
+            enabled_sections: Sections to load regardless of current settings
+        """
+        from .tasks import update_or_create_eve_objects
+
+        add_prefix = make_logger_prefix(f"{self.model.__name__}")
+        enabled_sections = self.model._enabled_sections_union(enabled_sections)
+        if self.model._is_list_only_endpoint():
+            try:
+                self._bulk_update_or_create_from_esi_objs(
+                    eve_data_objs=self._fetch_from_esi(),
+                    enabled_sections=enabled_sections,
+                )
+
+            except Exception as ex:
+                logger.warn(
+                    add_prefix("Failed to update or create: %s" % ex),
+                    exc_info=True,
+                )
+                raise ex
+        else:
+            if self.model._has_esi_path_list():
+                category, method = self.model._esi_path_list()
+                ids = getattr(
+                    getattr(esi.client, category),
+                    method,
+                )().results()
+                for chunk_ids in chunks(ids, EVEUNIVERSE_TASKS_CHUNK_SIZE):
                     if wait_for_children:
-                        ChildClass = self.model.get_model_class(child_class)
-                        ChildClass.objects.update_or_create_esi(
-                            id=id,
+                        self.bulk_update_or_create_esi(
+                            ids=chunk_ids,
                             include_children=include_children,
                             wait_for_children=wait_for_children,
                             enabled_sections=enabled_sections,
                         )
+                    else:
+                        update_or_create_eve_objects.delay(
+                            model_name=self.model.__name__,
+                            ids=chunk_ids,
+                            include_children=include_children,
+                            wait_for_children=wait_for_children,
+                            enabled_sections=list(enabled_sections),
+                        )
+            else:
+                raise TypeError(
+                    f"ESI does not provide a list endpoint for {self.model.__name__}"
+                )
+
+    def _bulk_update_or_create_from_esi_objs(
+        self, eve_data_objs: List[dict], enabled_sections: Iterable[str] = None
+    ) -> None:
+        """updates or creates objects of this model from esi data objects in bulk.
+
+        Only updates the fields of the objects. Does not update or create
+        inline objects or children.
+        """
+        esi_pk = self.model._esi_pk()
+        defaults_list = self._bulk_defaults_from_esi_objs(
+            eve_data_objs=eve_data_objs, enabled_sections=enabled_sections
+        )
+        objs = self._bulk_upsert_from_defaults(
+            ids=[eve_data_obj[esi_pk] for eve_data_obj in eve_data_objs],
+            defaults_list=defaults_list,
+            enabled_sections=enabled_sections,
+        )
+        self._sync_eve_entities(objs)
+
+    def _bulk_upsert_from_defaults(
+        self,
+        *,
+        ids: List[int],
+        defaults_list: List[dict],
+        enabled_sections: Iterable[str] = None,
+    ) -> List[models.Model]:
+        """creates or updates objects of this model from precompiled defaults
+        in bulk and returns the unsaved model instances.
+        """
+        esi_mapping = self.model._esi_mapping(enabled_sections)
+        objs = [
+            self.model(id=id, **defaults) for id, defaults in zip(ids, defaults_list)
+        ]
+        update_fields = [
+            field_name
+            for field_name, mapping in esi_mapping.items()
+            if not mapping.is_pk
+        ]
+        _bulk_upsert(
+            self, objs, update_fields, only_changed=EVEUNIVERSE_WRITE_CHANGES_ONLY
+        )
+        return objs
+
+    def bulk_get_or_create_esi(
+        self,
+        *,
+        ids: List[int],
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+        max_workers: int = None,
+    ) -> models.QuerySet:
+        """Gets or creates objects in bulk.
+
+        Nonexisting objects will be fetched from ESI (blocking).
+        Will always get/create parent objects.
+
+        Args:
+            ids: List of valid IDs of Eve objects
+            include_children: when needed to updated/created if child objects should be updated/created as well (if any)
+            wait_for_children: when true child objects will be updated/created blocking (if any), else async
+            enabled_sections: Sections to load regardless of current settings
+            max_workers: Max number of concurrent requests to ESI. Will use default from settings if not specified.
+
+        Returns:
+            Queryset with all requested eve objects
+        """
+        ids = set(map(int, ids))
+        enabled_sections = self.model._enabled_sections_union(enabled_sections)
+        enabled_sections_filter = self._enabled_sections_filter(enabled_sections)
+        existing_ids = set(
+            self.filter(id__in=ids)
+            .filter(**enabled_sections_filter)
+            .values_list("id", flat=True)
+        )
+        missing_ids = ids.difference(existing_ids)
+        if missing_ids:
+            self.bulk_update_or_create_esi(
+                ids=missing_ids,
+                include_children=include_children,
+                wait_for_children=wait_for_children,
+                enabled_sections=enabled_sections,
+                max_workers=max_workers,
+            )
+
+        return self.filter(id__in=ids)
+
+    def bulk_update_or_create_esi(
+        self,
+        *,
+        ids: List[int],
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+        max_workers: int = None,
+    ) -> models.QuerySet:
+        """Updates or creates objects in bulk by fetching them from ESI (blocking).
+
+        Objects are fetched concurrently from ESI and then written to the database
+        in one consolidated step. Will always get/create parent objects.
+
+        Args:
+            ids: List of valid IDs of Eve objects
+            include_children: if child objects should be updated/created as well (if any)
+            wait_for_children: when true child objects will be updated/created blocking (if any), else async
+            enabled_sections: Sections to load regardless of current settings
+            max_workers: Max number of concurrent requests to ESI. Will use default from settings if not specified.
+
+        Returns:
+            Queryset with all requested eve objects
+        """
+        ids = set(map(int, ids))
+        add_prefix = make_logger_prefix(f"{self.model.__name__}")
+        enabled_sections = self.model._enabled_sections_union(enabled_sections)
+        try:
+            eve_data_objs, etags = self._fetch_eve_data_objs(
+                ids=ids,
+                enabled_sections=enabled_sections,
+                max_workers=max_workers,
+                etags=self._stored_etags(ids, enabled_sections),
+            )
+            self._bulk_update_or_create_from_eve_data_objs(
+                eve_data_objs=eve_data_objs,
+                etags=etags,
+                unchanged_ids=ids.difference(eve_data_objs.keys()),
+                include_children=include_children,
+                wait_for_children=wait_for_children,
+                enabled_sections=enabled_sections,
+            )
+        except Exception as ex:
+            logger.warn(
+                add_prefix("Failed to update or create in bulk: %s" % ex),
+                exc_info=True,
+            )
+            raise ex
 
-                    else:
-                        task_update_or_create_eve_object.delay(
-                            child_class,
-                            id,
-                            include_children=include_children,
-                            wait_for_children=wait_for_children,
-                            enabled_sections=list(enabled_sections),
-                        )
+        return self.filter(id__in=ids)
 
-    def update_or_create_all_esi(
+    async def abulk_get_or_create_esi(
         self,
         *,
+        ids: List[int],
         include_children: bool = False,
         wait_for_children: bool = True,
         enabled_sections: Iterable[str] = None,
-    ) -> None:
-        """updates or creates all objects of this class from ESI.
+        max_workers: int = None,
+    ) -> List[models.Model]:
+        """Gets or creates objects in bulk. Async version of
+        :meth:`bulk_get_or_create_esi`.
 
-        Loading all objects can take a long time. Use with care!
+        Nonexisting objects will be fetched concurrently from ESI
+        in a dedicated thread pool.
 
         Args:
-            include_children: if child objects should be updated/created as well (if any)
-            wait_for_children: when false all objects will be loaded async, else blocking
+            ids: List of valid IDs of Eve objects
+            include_children: when needed to updated/created if child objects should be updated/created as well (if any)
+            wait_for_children: when true child objects will be updated/created blocking (if any), else async
             enabled_sections: Sections to load regardless of current settings
-        """
-        from .tasks import update_or_create_eve_object
+            max_workers: Max number of concurrent requests to ESI. Will use default from settings if not specified.
 
-        add_prefix = make_logger_prefix(f"{self.model.__name__}")
+        Returns:
+            List with all requested eve objects
+        """
+        ids = set(map(int, ids))
         enabled_sections = self.model._enabled_sections_union(enabled_sections)
-        if self.model._is_list_only_endpoint():
-            try:
-                esi_pk = self.model._esi_pk()
-                for eve_data_obj in self._fetch_from_esi():
-                    args = {"id": eve_data_obj[esi_pk]}
-                    args["defaults"] = self._defaults_from_esi_obj(
-                        eve_data_obj=eve_data_obj, enabled_sections=enabled_sections
-                    )
-                    self.update_or_create(**args)
+        enabled_sections_filter = self._enabled_sections_filter(enabled_sections)
+        existing_ids = await sync_to_async(set, thread_sensitive=True)(
+            self.filter(id__in=ids)
+            .filter(**enabled_sections_filter)
+            .values_list("id", flat=True)
+        )
+        missing_ids = ids.difference(existing_ids)
+        if missing_ids:
+            await self.abulk_update_or_create_esi(
+                ids=missing_ids,
+                include_children=include_children,
+                wait_for_children=wait_for_children,
+                enabled_sections=enabled_sections,
+                max_workers=max_workers,
+            )
 
-            except Exception as ex:
-                logger.warn(
-                    add_prefix("Failed to update or create: %s" % ex),
-                    exc_info=True,
-                )
-                raise ex
-        else:
-            if self.model._has_esi_path_list():
-                category, method = self.model._esi_path_list()
-                ids = getattr(
-                    getattr(esi.client, category),
-                    method,
-                )().results()
-                for id in ids:
-                    if wait_for_children:
-                        self.update_or_create_esi(
-                            id=id,
-                            include_children=include_children,
-                            wait_for_children=wait_for_children,
-                            enabled_sections=enabled_sections,
-                        )
-                    else:
-                        update_or_create_eve_object.delay(
-                            model_name=self.model.__name__,
-                            entity_id=id,
-                            include_children=include_children,
-                            wait_for_children=wait_for_children,
-                            enabled_sections=list(enabled_sections),
-                        )
-            else:
-                raise TypeError(
-                    f"ESI does not provide a list endpoint for {self.model.__name__}"
-                )
+        return await sync_to_async(list, thread_sensitive=True)(self.filter(id__in=ids))
 
-    def bulk_get_or_create_esi(
+    async def abulk_update_or_create_esi(
         self,
         *,
         ids: List[int],
         include_children: bool = False,
         wait_for_children: bool = True,
         enabled_sections: Iterable[str] = None,
-    ) -> models.QuerySet:
-        """Gets or creates objects in bulk.
+        max_workers: int = None,
+    ) -> List[models.Model]:
+        """Updates or creates objects in bulk by fetching them from ESI.
+        Async version of :meth:`bulk_update_or_create_esi`.
 
-        Nonexisting objects will be fetched from ESI (blocking).
-        Will always get/create parent objects.
+        Objects are fetched concurrently from ESI in a dedicated thread pool.
 
         Args:
             ids: List of valid IDs of Eve objects
-            include_children: when needed to updated/created if child objects should be updated/created as well (if any)
+            include_children: if child objects should be updated/created as well (if any)
             wait_for_children: when true child objects will be updated/created blocking (if any), else async
             enabled_sections: Sections to load regardless of current settings
+            max_workers: Max number of concurrent requests to ESI. Will use default from settings if not specified.
 
         Returns:
-            Queryset with all requested eve objects
+            List with all requested eve objects
         """
         ids = set(map(int, ids))
+        add_prefix = make_logger_prefix(f"{self.model.__name__}")
         enabled_sections = self.model._enabled_sections_union(enabled_sections)
-        enabled_sections_filter = self._enabled_sections_filter(enabled_sections)
-        existing_ids = set(
-            self.filter(id__in=ids)
-            .filter(**enabled_sections_filter)
-            .values_list("id", flat=True)
-        )
-        for id in ids.difference(existing_ids):
-            self.update_or_create_esi(
-                id=int(id),
+        try:
+            stored_etags = await sync_to_async(
+                self._stored_etags, thread_sensitive=True
+            )(ids, enabled_sections)
+            eve_data_objs, etags = await self._afetch_eve_data_objs(
+                ids=ids,
+                enabled_sections=enabled_sections,
+                max_workers=max_workers,
+                etags=stored_etags,
+            )
+            await sync_to_async(
+                self._bulk_update_or_create_from_eve_data_objs, thread_sensitive=True
+            )(
+                eve_data_objs=eve_data_objs,
+                etags=etags,
+                unchanged_ids=ids.difference(eve_data_objs.keys()),
                 include_children=include_children,
                 wait_for_children=wait_for_children,
                 enabled_sections=enabled_sections,
             )
+        except Exception as ex:
+            logger.warn(
+                add_prefix("Failed to update or create in bulk: %s" % ex),
+                exc_info=True,
+            )
+            raise ex
 
-        return self.filter(id__in=ids)
+        return await sync_to_async(list, thread_sensitive=True)(self.filter(id__in=ids))
+
+    def _bulk_update_or_create_from_eve_data_objs(
+        self,
+        *,
+        eve_data_objs: Dict[int, dict],
+        include_children: bool,
+        wait_for_children: bool,
+        enabled_sections: Iterable[str],
+        etags: Dict[int, str] = None,
+        unchanged_ids: Iterable[int] = None,
+    ) -> None:
+        """updates or creates Eve universe objects from esi data objects
+        with their foreign keys resolved and their fields written in bulk.
+
+        Inline objects and children are updated or created per object.
+
+        Args:
+            etags: ETags of the esi data objects by ID to be stored
+            unchanged_ids: IDs of objects, which have not changed on ESI
+        """
+        if unchanged_ids:
+            self.filter(id__in=unchanged_ids).update(last_updated=now())
+
+        if eve_data_objs:
+            defaults_list = self._bulk_defaults_from_esi_objs(
+                eve_data_objs=list(eve_data_objs.values()),
+                enabled_sections=enabled_sections,
+            )
+            self._bulk_upsert_from_defaults(
+                ids=list(eve_data_objs.keys()),
+                defaults_list=defaults_list,
+                enabled_sections=enabled_sections,
+            )
+            objs = self.in_bulk(eve_data_objs.keys())
+            objs_with_new_sections = [
+                obj
+                for obj in objs.values()
+                if self._set_enabled_sections(obj, enabled_sections)
+            ]
+            if objs_with_new_sections:
+                self.bulk_update(
+                    objs_with_new_sections,
+                    ["enabled_sections"],
+                    batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE,
+                )
+            for id, eve_data_obj in eve_data_objs.items():
+                self._update_or_create_related_objects(
+                    obj=objs[id],
+                    eve_data_obj=eve_data_obj,
+                    include_children=include_children,
+                    wait_for_children=wait_for_children,
+                    enabled_sections=enabled_sections,
+                )
+            self._clear_celestial_indexes(objs.values())
+            self._sync_eve_entities(objs.values())
+
+        self._store_etags(etags or dict())
 
 
 class EvePlanetManager(EveUniverseEntityModelManager):
+    _supports_etags = False  # response is enriched with data from other endpoints
+
+    def _clear_celestial_indexes(self, objs: Iterable[models.Model]) -> None:
+        for obj in objs:
+            _celestial_indexes.delete(obj.eve_solar_system_id)
+
     def _fetch_from_esi(self, id: int, enabled_sections: Iterable[str] = None) -> dict:
         from .models import EveSolarSystem
 
@@ -520,10 +1689,23 @@ class EvePlanetManager(EveUniverseEntityModelManager):
 
 
 class EvePlanetChildrenManager(EveUniverseEntityModelManager):
+    _supports_etags = False  # response is enriched with data from other endpoints
+
     def __init__(self) -> None:
         super().__init__()
         self._my_property_name = None
 
+    def _clear_celestial_indexes(self, objs: Iterable[models.Model]) -> None:
+        from .models import EvePlanet
+
+        solar_system_ids = (
+            EvePlanet.objects.filter(id__in={obj.eve_planet_id for obj in objs})
+            .values_list("eve_solar_system_id", flat=True)
+            .distinct()
+        )
+        for solar_system_id in solar_system_ids:
+            _celestial_indexes.delete(solar_system_id)
+
     def _fetch_from_esi(self, id: int, enabled_sections: Iterable[str] = None) -> dict:
         from .models import EveSolarSystem
 
@@ -566,49 +1748,399 @@ class EveMoonManager(EvePlanetChildrenManager):
         self._my_property_name = "moons"
 
 
-class EveStargateManager(EveUniverseEntityModelManager):
-    """For special handling of relations"""
+class EveSolarSystemManager(EveUniverseEntityModelManager):
+    """Custom manager for EveSolarSystem"""
 
-    def update_or_create_esi(
+    def _clear_celestial_indexes(self, objs: Iterable[models.Model]) -> None:
+        for obj in objs:
+            _celestial_indexes.delete(obj.id)
+
+    def jump_graph(self) -> JumpGraph:
+        """returns the graph of all solar systems connected by stored stargates.
+
+        The graph is cached in-process and is rebuilt automatically
+        when stargates or solar systems have changed.
+        """
+        from .models import EveStargate
+
+        signature = (
+            tuple(
+                EveStargate.objects.aggregate(
+                    count=Count("id"), last_updated=Max("last_updated")
+                ).values()
+            ),
+            tuple(
+                self.aggregate(
+                    count=Count("id"), last_updated=Max("last_updated")
+                ).values()
+            ),
+        )
+
+        def build() -> JumpGraph:
+            edges = EveStargate.objects.values_list(
+                "eve_solar_system_id", "destination_eve_solar_system_id"
+            )
+            security_statuses = dict(self.values_list("id", "security_status"))
+            return JumpGraph(edges, security_statuses)
+
+        return _get_or_build_local_index("jump_graph", signature, build)
+
+    def coordinate_index(self) -> CoordinateIndex:
+        """returns an index of the positions of all solar systems in known space.
+
+        The index is cached in-process and is rebuilt automatically
+        when solar systems have changed.
+        """
+        solar_systems = self.exclude(
+            id__gte=EVE_SOLAR_SYSTEM_ID_W_SPACE_MIN,
+            id__lt=EVE_SOLAR_SYSTEM_ID_W_SPACE_MAX,
+        ).filter(
+            position_x__isnull=False,
+            position_y__isnull=False,
+            position_z__isnull=False,
+        )
+        signature = tuple(
+            solar_systems.aggregate(
+                count=Count("id"), last_updated=Max("last_updated")
+            ).values()
+        )
+
+        def build() -> CoordinateIndex:
+            return CoordinateIndex(
+                {
+                    id: (x, y, z)
+                    for id, x, y, z in solar_systems.values_list(
+                        "id", "position_x", "position_y", "position_z"
+                    )
+                }
+            )
+
+        return _get_or_build_local_index("coordinate_index", signature, build)
+
+    def celestial_index(self, solar_system_id: int) -> Optional[KDTree]:
+        """returns an index of all stored celestials of a solar system
+        for finding nearest celestials.
+
+        Keys of the index are tuples of model name, ID and type ID of each celestial.
+        Indexes are cached in-process for the most recently used solar systems,
+        incl. the solar systems without all celestials stored. They are cleared
+        when celestials of a solar system are updated or created.
+
+        Returns:
+            The index or None if not all celestials are stored for this solar system
+        """
+        celestial_index = _celestial_indexes.get(solar_system_id)
+        if celestial_index is None:
+            celestial_index = self._build_celestial_index(solar_system_id)
+            if celestial_index is None:
+                celestial_index = _NO_CELESTIAL_INDEX
+            _celestial_indexes.set(solar_system_id, celestial_index)
+
+        if celestial_index is _NO_CELESTIAL_INDEX:
+            return None
+
+        return celestial_index
+
+    @staticmethod
+    def _has_all_celestials(solar_system_id: int) -> bool:
+        """returns True if all kinds of celestials have been loaded
+        for a solar system, else False.
+        """
+        from .models import EvePlanet, EveSolarSystem
+
+        solar_systems = EveSolarSystem.objects.filter(id=solar_system_id)
+        for section in [
+            EveSolarSystem.Section.PLANETS,
+            EveSolarSystem.Section.STARGATES,
+            EveSolarSystem.Section.STATIONS,
+        ]:
+            solar_systems = solar_systems.filter(
+                enabled_sections=getattr(EveSolarSystem.enabled_sections, section)
+            )
+        if not solar_systems.exists():
+            return False
+
+        planets = EvePlanet.objects.filter(eve_solar_system_id=solar_system_id)
+        if not planets.exists():
+            return False
+
+        for section in [EvePlanet.Section.ASTEROID_BELTS, EvePlanet.Section.MOONS]:
+            if planets.exclude(
+                enabled_sections=getattr(EvePlanet.enabled_sections, section)
+            ).exists():
+                return False
+
+        return True
+
+    @classmethod
+    def _build_celestial_index(cls, solar_system_id: int) -> Optional[KDTree]:
+        from .models import (
+            EveAsteroidBelt,
+            EveMoon,
+            EvePlanet,
+            EveStargate,
+            EveStation,
+        )
+
+        if not cls._has_all_celestials(solar_system_id):
+            return None
+
+        celestial_queries = [
+            (
+                EvePlanet,
+                {"eve_solar_system_id": solar_system_id},
+                models.F("eve_type_id"),
+            ),
+            (
+                EveMoon,
+                {"eve_planet__eve_solar_system_id": solar_system_id},
+                models.Value(EVE_TYPE_ID_MOON, output_field=models.IntegerField()),
+            ),
+            (
+                EveAsteroidBelt,
+                {"eve_planet__eve_solar_system_id": solar_system_id},
+                models.Value(
+                    EVE_TYPE_ID_ASTEROID_BELT, output_field=models.IntegerField()
+                ),
+            ),
+            (
+                EveStargate,
+                {"eve_solar_system_id": solar_system_id},
+                models.F("eve_type_id"),
+            ),
+            (
+                EveStation,
+                {"eve_solar_system_id": solar_system_id},
+                models.F("eve_type_id"),
+            ),
+        ]
+        points = dict()
+        for MyClass, params, type_id in celestial_queries:
+            rows = (
+                MyClass.objects.filter(
+                    position_x__isnull=False,
+                    position_y__isnull=False,
+                    position_z__isnull=False,
+                    **params,
+                )
+                .annotate(celestial_type_id=type_id)
+                .values_list(
+                    "id",
+                    "celestial_type_id",
+                    "position_x",
+                    "position_y",
+                    "position_z",
+                )
+            )
+            for id, celestial_type_id, x, y, z in rows:
+                points[(MyClass.__name__, id, celestial_type_id)] = (x, y, z)
+
+        return KDTree(points)
+
+    def within_light_years(
+        self, origin: models.Model, light_years: float
+    ) -> Dict[int, float]:
+        """Finds all solar systems within the given distance of a solar system.
+
+        Solar systems in wormhole space are not included.
+
+        Args:
+            origin: Solar system or its ID to measure from
+            light_years: Max distance in light years
+
+        Returns:
+            Distance in light years by solar system ID incl. the origin,
+            ordered by distance
+        """
+        coordinate_index = self.coordinate_index()
+        origin_id = _to_pk(origin)
+        if origin_id not in coordinate_index:
+            return dict()
+
+        return {
+            id: meters_to_ly(distance)
+            for id, distance in coordinate_index.within(
+                coordinate_index.position(origin_id), ly_to_meters(light_years)
+            )
+        }
+
+    def nearest_by_light_years(
+        self, origin: models.Model, count: int = 1
+    ) -> Dict[int, float]:
+        """Finds the solar systems nearest to a solar system.
+
+        Solar systems in wormhole space are not included.
+
+        Args:
+            origin: Solar system or its ID to measure from
+            count: Number of solar systems to find
+
+        Returns:
+            Distance in light years by solar system ID excl. the origin,
+            ordered by distance
+        """
+        coordinate_index = self.coordinate_index()
+        origin_id = _to_pk(origin)
+        if origin_id not in coordinate_index:
+            return dict()
+
+        return {
+            id: meters_to_ly(distance)
+            for id, distance in coordinate_index.nearest(
+                coordinate_index.position(origin_id), count + 1
+            )
+            if id != origin_id
+        }
+
+    def light_years_matrix(
         self,
-        *,
-        id: int,
-        include_children: bool = False,
-        wait_for_children: bool = True,
-        enabled_sections: Iterable[str] = None,
-    ) -> Tuple[models.Model, bool]:
-        """updates or creates an EveStargate object by fetching it from ESI (blocking).
-        Will always get/create parent objects
+        origins: Iterable[models.Model],
+        destinations: Iterable[models.Model] = None,
+    ) -> Dict[int, Dict[int, Optional[float]]]:
+        """Calculates the distances between many solar systems.
 
         Args:
-            id: Eve Online ID of object
-            include_children: (no effect)
-            wait_for_children: (no effect)
+            origins: Solar systems or their IDs to measure from
+            destinations: Solar systems or their IDs to measure to. Will use the origins if not specified
 
         Returns:
-            A tuple consisting of the requested object and a created flag
+            Distance in light years by origin ID and destination ID.
+            The distance is None for solar systems in wormhole space.
+        """
+        origin_ids = [_to_pk(obj) for obj in origins]
+        destination_ids = (
+            [_to_pk(obj) for obj in destinations]
+            if destinations is not None
+            else origin_ids
+        )
+        matrix = self.coordinate_index().distance_matrix(origin_ids, destination_ids)
+        return {
+            origin_id: {
+                destination_id: meters_to_ly(
+                    matrix.get(origin_id, dict()).get(destination_id)
+                )
+                for destination_id in destination_ids
+            }
+            for origin_id in origin_ids
+        }
+
+    def jumps_matrix(
+        self,
+        origins: Iterable[models.Model],
+        destinations: Iterable[models.Model] = None,
+    ) -> Dict[int, Dict[int, Optional[int]]]:
+        """Calculates the number of jumps between many solar systems
+        from the stored stargates.
+
+        When the stored stargates are incomplete the jumps are calculated by ESI
+        for each pair of solar systems instead.
+
+        Args:
+            origins: Solar systems or their IDs to start from
+            destinations: Solar systems or their IDs to go to. Will use the origins if not specified
+
+        Returns:
+            Number of jumps by origin ID and destination ID.
+            The number is None if no route can be found.
+        """
+        origin_ids = [_to_pk(obj) for obj in origins]
+        destination_ids = (
+            [_to_pk(obj) for obj in destinations]
+            if destinations is not None
+            else origin_ids
+        )
+        jump_graph = self.jump_graph()
+        if jump_graph.is_complete:
+            return jump_graph.jumps_matrix(origin_ids, destination_ids)
+
+        logger.info("Stored stargates are incomplete. Calculating jumps with ESI.")
+        matrix = dict()
+        for origin_id in origin_ids:
+            matrix[origin_id] = dict()
+            for destination_id in destination_ids:
+                if origin_id == destination_id:
+                    matrix[origin_id][destination_id] = 0
+                else:
+                    path_ids = self.model._calc_route_esi(origin_id, destination_id)
+                    matrix[origin_id][destination_id] = (
+                        len(path_ids) - 1 if path_ids is not None else None
+                    )
+
+        return matrix
+
+    def systems_within_jumps(self, origin: models.Model, jumps: int) -> Dict[int, int]:
+        """Finds all solar systems within the given number of jumps
+        from the stored stargates.
+
+        Requires the stargates of all solar systems to be loaded.
+
+        Args:
+            origin: Solar system or its ID to start from
+            jumps: Max number of jumps
+
+        Returns:
+            Number of jumps by solar system ID, incl. the origin
+
+        Exceptions:
+            Raises ValueError when the stored stargates are incomplete
         """
-        obj, created = super().update_or_create_esi(
-            id=int(id),
+        jump_graph = self.jump_graph()
+        if not jump_graph.is_complete:
+            raise ValueError(
+                "Can not find systems within jumps, because stored stargates "
+                "are incomplete. Please load all stargates first."
+            )
+
+        return jump_graph.jumps_from(_to_pk(origin), max_jumps=jumps)
+
+
+class EveStargateManager(EveUniverseEntityModelManager):
+    """For special handling of relations"""
+
+    def _clear_celestial_indexes(self, objs: Iterable[models.Model]) -> None:
+        for obj in objs:
+            _celestial_indexes.delete(obj.eve_solar_system_id)
+
+    def _update_or_create_related_objects(
+        self,
+        *,
+        obj: models.Model,
+        eve_data_obj: dict,
+        include_children: bool,
+        wait_for_children: bool,
+        enabled_sections: Iterable[str],
+    ) -> None:
+        super()._update_or_create_related_objects(
+            obj=obj,
+            eve_data_obj=eve_data_obj,
             include_children=include_children,
             wait_for_children=wait_for_children,
+            enabled_sections=enabled_sections,
         )
-        if obj:
+        # the destination stargate might have been created in the same batch
+        # after the defaults of this stargate were compiled
+        destination_id = (eve_data_obj.get("destination") or dict()).get("stargate_id")
+        if obj.destination_eve_stargate is None and destination_id:
+            obj.destination_eve_stargate = self.filter(id=destination_id).first()
             if obj.destination_eve_stargate is not None:
-                obj.destination_eve_stargate.destination_eve_stargate = obj
+                obj.save(update_fields=["destination_eve_stargate", "last_updated"])
 
-                if obj.eve_solar_system is not None:
-                    obj.destination_eve_stargate.destination_eve_solar_system = (
-                        obj.eve_solar_system
-                    )
-                obj.destination_eve_stargate.save()
-
-        return obj, created
+        if obj.destination_eve_stargate is not None:
+            obj.destination_eve_stargate.destination_eve_stargate = obj
+            if obj.eve_solar_system is not None:
+                obj.destination_eve_stargate.destination_eve_solar_system = (
+                    obj.eve_solar_system
+                )
+            obj.destination_eve_stargate.save()
 
 
 class EveStationManager(EveUniverseEntityModelManager):
     """For special handling of station services"""
 
+    def _clear_celestial_indexes(self, objs: Iterable[models.Model]) -> None:
+        for obj in objs:
+            _celestial_indexes.delete(obj.eve_solar_system_id)
+
     def _update_or_create_inline_objects(
         self,
         *,
@@ -632,16 +2164,18 @@ class EveStationManager(EveUniverseEntityModelManager):
 
 
 class EveTypeManager(EveUniverseEntityModelManager):
-    def update_or_create_esi(
+    def _update_or_create_related_objects(
         self,
         *,
-        id: int,
-        include_children: bool = False,
-        wait_for_children: bool = True,
-        enabled_sections: Iterable[str] = None,
-    ) -> Tuple[models.Model, bool]:
-        obj, created = super().update_or_create_esi(
-            id=id,
+        obj: models.Model,
+        eve_data_obj: dict,
+        include_children: bool,
+        wait_for_children: bool,
+        enabled_sections: Iterable[str],
+    ) -> None:
+        super()._update_or_create_related_objects(
+            obj=obj,
+            eve_data_obj=eve_data_obj,
             include_children=include_children,
             wait_for_children=wait_for_children,
             enabled_sections=enabled_sections,
@@ -650,62 +2184,314 @@ class EveTypeManager(EveUniverseEntityModelManager):
         if enabled_sections and self.model.Section.TYPE_MATERIALS in enabled_sections:
             from .models import EveTypeMaterial
 
-            EveTypeMaterial.objects.update_or_create_api(eve_type=obj)
+            EveTypeMaterial.objects.update_or_create_api(eve_type=obj)
+
+
+class _EveEntityNameCache:
+    """Process-local cache of names and categories of Eve entities by ID.
+
+    Entries of renamed entities are invalidated across processes
+    through a generation counter in the Django cache, which is bumped
+    with every invalidation. The invalidated IDs of each generation are stored
+    in the Django cache too, so other processes can evict just those IDs.
+    When they are no longer available all entries are evicted instead.
+    The generation is checked at most once per ``GENERATION_CHECK_INTERVAL`` seconds.
+
+    Only writes through ``EveEntity.save()`` and the manager methods
+    invalidate entries. Renaming entities with ``QuerySet.update()``
+    or ``bulk_update()`` will not be noticed until entries expire.
+    """
+
+    GENERATION_KEY = "EVEUNIVERSE_ENTITY_NAMES_GENERATION"
+    GENERATION_CHECK_INTERVAL = 1
+    INVALIDATED_IDS_KEY = "EVEUNIVERSE_ENTITY_NAMES_INVALIDATED_IDS"
+    INVALIDATED_IDS_TIMEOUT = 3_600
+    MAX_GENERATIONS_BEHIND = 100
+
+    def __init__(self, maxsize: int, timeout: float = None) -> None:
+        self._items = LRUCache(maxsize=maxsize, timeout=timeout)
+        self._lock = threading.Lock()
+        self._generation = None
+        self._generation_checked_at = None
+
+    def get_many(self, ids: Iterable[int]) -> Dict[int, Tuple[str, Optional[str]]]:
+        """returns name and category of all given IDs, which are in the cache"""
+        self._check_generation()
+        result = dict()
+        for id in ids:
+            value = self._items.get(id)
+            if value is not None:
+                result[id] = value
+
+        return result
+
+    def set_many(self, values: Dict[int, Tuple[str, Optional[str]]]) -> None:
+        """adds name and category for the given IDs"""
+        for id, value in values.items():
+            self._items.set(id, value)
+
+    def invalidate(self, ids: Iterable[int]) -> None:
+        """invalidates the given IDs in all processes"""
+        ids = list(ids)
+        if not ids:
+            return
+
+        cache.add(self.GENERATION_KEY, 0, timeout=None)
+        generation = cache.incr(self.GENERATION_KEY)
+        cache.set(
+            self._invalidated_ids_key(generation),
+            ids,
+            timeout=self.INVALIDATED_IDS_TIMEOUT,
+        )
+        for id in ids:
+            self._items.delete(id)
+
+    def clear(self) -> None:
+        """removes all entries from the cache of this process"""
+        with self._lock:
+            self._items.clear()
+            self._generation = None
+            self._generation_checked_at = None
+
+    def _check_generation(self) -> None:
+        """evicts the IDs invalidated by other processes since the last check"""
+        now_monotonic = time.monotonic()
+        checked_at = self._generation_checked_at
+        if (
+            checked_at is not None
+            and now_monotonic - checked_at < self.GENERATION_CHECK_INTERVAL
+        ):
+            return
+
+        generation = cache.get(self.GENERATION_KEY, 0)
+        known_generation = self._generation
+        invalidated_ids = None
+        if (
+            known_generation is not None
+            and 0 < generation - known_generation <= self.MAX_GENERATIONS_BEHIND
+        ):
+            keys = [
+                self._invalidated_ids_key(number)
+                for number in range(known_generation + 1, generation + 1)
+            ]
+            values = cache.get_many(keys)
+            if len(values) == len(keys):
+                invalidated_ids = {id for ids in values.values() for id in ids}
+
+        with self._lock:
+            if generation != self._generation:
+                if invalidated_ids is None or self._generation != known_generation:
+                    self._items.clear()
+                else:
+                    for id in invalidated_ids:
+                        self._items.delete(id)
+                self._generation = generation
+            self._generation_checked_at = now_monotonic
+
+    def _invalidated_ids_key(self, generation: int) -> str:
+        return f"{self.INVALIDATED_IDS_KEY}_{generation}"
+
+
+_entity_names_cache = _EveEntityNameCache(
+    maxsize=EVEUNIVERSE_ENTITY_NAMES_CACHE_SIZE,
+    timeout=EVEUNIVERSE_ENTITY_NAMES_CACHE_TIMEOUT,
+)
+
 
-        return obj, created
+def _invalidate_entity_names(changed_objs: Iterable[models.Model]) -> None:
+    """invalidates the cached names of changed entities.
+    Entities without name are never cached and therefore skipped.
+    """
+    _entity_names_cache.invalidate([obj.id for obj in changed_objs if obj.name])
 
 
 class EveEntityQuerySet(models.QuerySet):
     """Custom queryset for EveEntity"""
 
-    MAX_DEPTH = 5
+    ESI_CHUNK_SIZE = 1000
+
+    def update_from_esi(self, max_workers: int = None) -> int:
+        """Updates all Eve entity objects in this queryset from ESI.
+
+        Chunks of IDs are resolved concurrently by a pool of threads
+        and the entities of each chunk are written in bulk as soon as they arrive.
 
-    def update_from_esi(self) -> int:
-        """Updates all Eve entity objects in this queryset from ESI"""
+        Args:
+            max_workers: max number of concurrent requests to ESI,
+                defaults to ``EVEUNIVERSE_ESI_MAX_WORKERS``
+
+        Returns:
+            number of resolved entities
+        """
         ids = list(self.values_list("id", flat=True))
         if not ids:
             return 0
-        else:
-            logger.info("Updating %d entities from ESI", len(ids))
-            resolved_counter = 0
-            for chunk_ids in chunks(ids, 1000):
-                logger.debug(
-                    "Trying to resolve the following IDs from ESI:\n%s", chunk_ids
-                )
-                resolved_counter = self._resolve_entities_from_esi(chunk_ids)
-            return resolved_counter
 
-    def _resolve_entities_from_esi(self, ids: list, depth: int = 1):
+        ids = self._exclude_invalid_ids(ids)
+        if not ids:
+            return 0
+
+        if max_workers is None:
+            max_workers = EVEUNIVERSE_ESI_MAX_WORKERS
+
+        logger.info("Updating %d entities from ESI", len(ids))
+        id_chunks = list(chunks(ids, self.ESI_CHUNK_SIZE))
         resolved_counter = 0
-        try:
-            items = esi.client.Universe.post_universe_names(ids=ids).results()
-        except HTTPNotFound:
-            # if API fails to resolve all IDs, we divide and conquer,
-            # trying to resolve each half of the ids seperately
-            if len(ids) > 1 and depth < self.MAX_DEPTH:
-                resolved_counter += self._resolve_entities_from_esi(ids[::2], depth + 1)
-                resolved_counter += self._resolve_entities_from_esi(
-                    ids[1::2], depth + 1
-                )
-            else:
-                logger.warning("Failed to resolve invalid IDs: %s", ids)
+        if max_workers <= 1 or len(id_chunks) <= 1:
+            for chunk_ids in id_chunks:
+                resolved_counter += self._resolve_entities_from_esi(chunk_ids)
         else:
-            resolved_counter += len(items)
-            for item in items:
-                try:
-                    self.update_or_create(
-                        id=item["id"],
-                        defaults={"name": item["name"], "category": item["category"]},
-                    )
-                except IntegrityError:
-                    pass
+            esi.client  # make sure the client is initialized before threads access it
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(id_chunks))
+            ) as executor:
+                futures = [
+                    executor.submit(self._fetch_entities_from_esi, chunk_ids)
+                    for chunk_ids in id_chunks
+                ]
+                for future in as_completed(futures):
+                    items, invalid_ids = future.result()
+                    self._update_or_create_from_items(items, invalid_ids)
+                    resolved_counter += len(items)
 
         return resolved_counter
 
+    def _resolve_entities_from_esi(self, ids: list) -> int:
+        items, invalid_ids = self._fetch_entities_from_esi(ids)
+        self._update_or_create_from_items(items, invalid_ids)
+        return len(items)
+
+    def _exclude_invalid_ids(self, ids: List[int]) -> List[int]:
+        """returns the given IDs without the ones known to be invalid"""
+        from .models import EveEntityInvalidId
+
+        invalid_ids = EveEntityInvalidId.objects.db_manager(self.db).filter_invalid_ids(
+            ids
+        )
+        if invalid_ids:
+            logger.info("Skipping %d known invalid IDs", len(invalid_ids))
+        return [id for id in ids if id not in invalid_ids]
+
+    def _fetch_entities_from_esi(self, ids: list) -> Tuple[List[dict], List[int]]:
+        """fetches names and categories for entities from ESI.
+
+        Returns:
+            resolved entities and invalid IDs
+        """
+        logger.debug("Trying to resolve the following IDs from ESI:\n%s", ids)
+        items, invalid_ids = self._fetch_entities_isolating_invalid_ids(ids)
+        if invalid_ids:
+            logger.warning("Failed to resolve invalid IDs: %s", invalid_ids)
+        return items, invalid_ids
+
+    def _fetch_entities_isolating_invalid_ids(
+        self, ids: list, has_invalid_ids: bool = False
+    ) -> Tuple[List[dict], List[int]]:
+        """fetches entities from ESI and isolates invalid IDs by binary splitting.
+
+        ESI rejects the whole request if it contains any invalid ID, so the IDs
+        of a rejected request are split in halves, which are fetched separately.
+        If the first half succeeds the second half must contain an invalid ID
+        and is split right away without a request. This needs
+        about k * log2(n) requests to isolate k invalid IDs among n IDs.
+
+        Args:
+            has_invalid_ids: when True the IDs are known to contain invalid IDs
+        """
+        if not has_invalid_ids:
+            try:
+                return esi.client.Universe.post_universe_names(ids=ids).results(), []
+            except HTTPNotFound:
+                pass
+
+        if len(ids) == 1:
+            return [], list(ids)
+
+        middle = len(ids) // 2
+        items_1, invalid_ids_1 = self._fetch_entities_isolating_invalid_ids(
+            ids[:middle]
+        )
+        items_2, invalid_ids_2 = self._fetch_entities_isolating_invalid_ids(
+            ids[middle:], has_invalid_ids=not invalid_ids_1
+        )
+        return items_1 + items_2, invalid_ids_1 + invalid_ids_2
+
+    def _update_or_create_from_items(
+        self, items: List[dict], invalid_ids: List[int] = None
+    ) -> None:
+        """updates or creates entities from resolved items in bulk
+        and stores invalid IDs.
+
+        The last updated timestamp is renewed for all items, incl. unchanged ones.
+        """
+        from .models import EveEntityInvalidId
+
+        objs = {
+            item["id"]: self.model(
+                id=item["id"], name=item["name"], category=item["category"]
+            )
+            for item in items
+        }
+        changed_objs = _bulk_upsert(
+            self.model.objects.db_manager(self.db),
+            list(objs.values()),
+            ["name", "category"],
+        )
+        if invalid_ids:
+            EveEntityInvalidId.objects.db_manager(self.db).bulk_store(invalid_ids)
+        _invalidate_entity_names(changed_objs)
+
+    async def aupdate_from_esi(self, max_workers: int = None) -> int:
+        """Updates all Eve entity objects in this queryset from ESI.
+        Async version of :meth:`update_from_esi`.
+        """
+        ids = await sync_to_async(list, thread_sensitive=True)(
+            self.values_list("id", flat=True)
+        )
+        if not ids:
+            return 0
+
+        ids = await sync_to_async(self._exclude_invalid_ids, thread_sensitive=True)(ids)
+        if not ids:
+            return 0
+
+        if max_workers is None:
+            max_workers = EVEUNIVERSE_ESI_MAX_WORKERS
+
+        logger.info("Updating %d entities from ESI", len(ids))
+        # make sure the client is initialized before concurrent requests access it
+        await _run_esi_request(getattr, esi, "client")
+        semaphore = asyncio.Semaphore(max(max_workers, 1))
+        update_or_create_from_items = sync_to_async(
+            self._update_or_create_from_items, thread_sensitive=True
+        )
+
+        async def _resolve(chunk_ids: list) -> int:
+            async with semaphore:
+                items, invalid_ids = await _run_esi_request(
+                    self._fetch_entities_from_esi, chunk_ids
+                )
+            await update_or_create_from_items(items, invalid_ids)
+            return len(items)
+
+        counts = await asyncio.gather(
+            *[_resolve(chunk_ids) for chunk_ids in chunks(ids, self.ESI_CHUNK_SIZE)]
+        )
+        return sum(counts)
+
 
 class EveEntityManager(EveUniverseEntityModelManager):
     """Custom manager for EveEntity"""
 
+    # models for resolving entities of a category without ESI
+    _LOCAL_MODEL_NAMES = {
+        "constellation": "EveConstellation",
+        "faction": "EveFaction",
+        "region": "EveRegion",
+        "solar_system": "EveSolarSystem",
+        "station": "EveStation",
+    }
+
     def get_queryset(self) -> models.QuerySet:
         return EveEntityQuerySet(self.model, using=self._db)
 
@@ -729,17 +2515,18 @@ class EveEntityManager(EveUniverseEntityModelManager):
             Returns a None objects if the ID is invalid
         """
         id = int(id)
-        try:
-            obj = self.exclude(name="").get(id=id)
-            created = False
-        except self.model.DoesNotExist:
-            obj, created = self.update_or_create_esi(
-                id=id,
-                include_children=include_children,
-                wait_for_children=wait_for_children,
-            )
+        obj = self.filter(id=id).first()
+        if obj and obj.name:
+            return obj, False
 
-        return obj, created
+        if self._update_or_create_from_local_models([id]):
+            return self.get(id=id), obj is None
+
+        return self.update_or_create_esi(
+            id=id,
+            include_children=include_children,
+            wait_for_children=wait_for_children,
+        )
 
     def update_or_create_esi(
         self,
@@ -760,18 +2547,114 @@ class EveEntityManager(EveUniverseEntityModelManager):
             A tuple consisting of the requested object and a created flag
             When the ID is invalid the returned object will be None
 
+        IDs known to be invalid are not fetched again from ESI until they time out.
+
         Exceptions:
             Raises all HTTP codes of ESI endpoint /universe/names except 404
         """
         id = int(id)
+        if self._is_known_invalid_id(id):
+            return None, False
+
+        item = self._fetch_entity_from_esi(id)
+        return self._update_or_create_from_item(id, item)
+
+    async def aget_or_create_esi(
+        self,
+        *,
+        id: int,
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+    ) -> Tuple[Optional[models.Model], bool]:
+        """gets or creates an EvEntity object. Async version of
+        :meth:`get_or_create_esi`.
+
+        Args:
+            id: Eve Online ID of object
+
+        Returns:
+            A tuple consisting of the requested EveEntity object and a created flag
+            Returns a None objects if the ID is invalid
+        """
+        id = int(id)
+        obj = await sync_to_async(self.filter(id=id).first, thread_sensitive=True)()
+        if obj and obj.name:
+            return obj, False
+
+        local_ids = await sync_to_async(
+            self._update_or_create_from_local_models, thread_sensitive=True
+        )([id])
+        if local_ids:
+            local_obj = await sync_to_async(self.get, thread_sensitive=True)(id=id)
+            return local_obj, obj is None
+
+        return await self.aupdate_or_create_esi(id=id)
+
+    async def aupdate_or_create_esi(
+        self,
+        *,
+        id: int,
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+    ) -> Tuple[Optional[models.Model], bool]:
+        """updates or creates an EveEntity object by fetching it from ESI.
+        Async version of :meth:`update_or_create_esi`.
+
+        Args:
+            id: Eve Online ID of object
+
+        Returns:
+            A tuple consisting of the requested object and a created flag
+            When the ID is invalid the returned object will be None
+        """
+        id = int(id)
+        if await sync_to_async(self._is_known_invalid_id, thread_sensitive=True)(id):
+            return None, False
+
+        item = await _run_esi_request(
+            self._fetch_entity_from_esi, id, key=f"{self.model._meta.label}_{id}_fetch"
+        )
+        return await sync_to_async(
+            self._update_or_create_from_item, thread_sensitive=True
+        )(id, item)
+
+    def _is_known_invalid_id(self, id: int) -> bool:
+        """returns True if the ID is known to be invalid, else False"""
+        from .models import EveEntityInvalidId
+
+        if EveEntityInvalidId.objects.db_manager(self.db).filter_invalid_ids([id]):
+            logger.info("%s: Skipping ID known to be invalid", id)
+            return True
+
+        return False
+
+    def _fetch_entity_from_esi(self, id: int) -> Optional[dict]:
+        """fetches name and category of an entity from ESI.
+        Returns None if the ID is not valid.
+        """
         logger.info("%s: Trying to resolve ID to EveEntity with ESI", id)
         try:
             result = esi.client.Universe.post_universe_names(ids=[id]).results()
         except HTTPNotFound:
             logger.info("%s: ID is not valid", id)
+            return None
+
+        return result[0]
+
+    def _update_or_create_from_item(
+        self, id: int, item: Optional[dict]
+    ) -> Tuple[Optional[models.Model], bool]:
+        """updates or creates an entity from a resolved item
+        or stores its ID as invalid if there is no item.
+        """
+        if not item:
+            from .models import EveEntityInvalidId
+
+            EveEntityInvalidId.objects.db_manager(self.db).bulk_store([id])
             return None, False
 
-        item = result[0]
         return self.update_or_create(
             id=item.get("id"),
             defaults={"name": item.get("name"), "category": item.get("category")},
@@ -793,19 +2676,175 @@ class EveEntityManager(EveUniverseEntityModelManager):
             new_ids = ids.difference(existing_ids)
 
         if new_ids:
-            objects = [self.model(id=id) for id in new_ids]
-            self.bulk_create(
-                objects,
-                batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE,
-                ignore_conflicts=True,
-            )
-            to_update_qs = self.filter(id__in=new_ids) | self.filter(
-                id__in=ids.difference(new_ids), name=""
+            unresolved_ids = new_ids | set(
+                self.filter(id__in=ids.difference(new_ids), name="").values_list(
+                    "id", flat=True
+                )
             )
-            return to_update_qs.update_from_esi()
+            local_ids = self._update_or_create_from_local_models(unresolved_ids)
+            esi_ids = unresolved_ids.difference(local_ids)
+            if esi_ids:
+                self._bulk_create_unresolved(esi_ids.intersection(new_ids))
+                return len(local_ids) + self.filter(id__in=esi_ids).update_from_esi()
+
+            return len(local_ids)
 
         return 0
 
+    def sync_from_universe_models(self, model_names: Iterable[str] = None) -> int:
+        """updates or creates entities from all stored Eve objects of models
+        with a corresponding entity category, e.g. solar systems and types.
+        This does not call ESI.
+
+        Args:
+            model_names: names of the models to sync from, defaults to all models
+                with an entity category
+
+        Returns:
+            Count of updated or created entities
+        """
+        from .models import EveUniverseBaseModel, EveUniverseEntityModel
+
+        if model_names is None:
+            Models = [
+                Model
+                for Model in EveUniverseBaseModel.all_models()
+                if issubclass(Model, EveUniverseEntityModel)
+                and Model.eve_entity_category()
+            ]
+        else:
+            Models = [self.model.get_model_class(name) for name in model_names]
+
+        count = 0
+        for Model in Models:
+            category = Model.eve_entity_category()
+            if not category:
+                raise ValueError(f"{Model.__name__} has no entity category")
+
+            rows = list(Model.objects.values_list("id", "name"))
+            for chunk_rows in chunks(rows, EVEUNIVERSE_BULK_METHODS_BATCH_SIZE):
+                count += self._upsert_from_names(category, chunk_rows)
+
+        return count
+
+    def sync_from_universe_objs(self, objs: Iterable[models.Model]) -> int:
+        """updates or creates entities from the given Eve objects,
+        e.g. solar systems or types. This does not call ESI.
+
+        Returns:
+            Count of updated or created entities
+        """
+        rows_by_category = defaultdict(list)
+        for obj in objs:
+            category = obj.eve_entity_category()
+            if category:
+                rows_by_category[category].append((obj.id, obj.name))
+
+        return sum(
+            self._upsert_from_names(category, rows)
+            for category, rows in rows_by_category.items()
+        )
+
+    def _upsert_from_names(self, category: str, rows: Iterable[Tuple[int, str]]) -> int:
+        """updates or creates entities of one category from pairs of ID and name"""
+        objs = [
+            self.model(id=id, name=name, category=category) for id, name in rows if name
+        ]
+        changed_objs = _bulk_upsert(self, objs, ["name", "category"])
+        _invalidate_entity_names(changed_objs)
+        return len(objs)
+
+    def _update_or_create_from_local_models(self, ids: Iterable[int]) -> Set[int]:
+        """updates or creates entities for IDs, which can be resolved without ESI
+        from locally stored Eve objects, e.g. solar systems.
+        Categories are derived from the ID ranges.
+
+        Returns:
+            IDs of the updated or created entities
+        """
+        ids_by_category = defaultdict(list)
+        for id in ids:
+            category = self.model.category_for_id(id)
+            if category in self._LOCAL_MODEL_NAMES:
+                ids_by_category[category].append(id)
+
+        objs = list()
+        for category, category_ids in ids_by_category.items():
+            LocalModel = self.model.get_model_class(self._LOCAL_MODEL_NAMES[category])
+            for chunk_ids in chunks(category_ids, EVEUNIVERSE_BULK_METHODS_BATCH_SIZE):
+                objs += [
+                    self.model(id=id, name=name, category=category)
+                    for id, name in LocalModel.objects.filter(
+                        id__in=chunk_ids
+                    ).values_list("id", "name")
+                    if name
+                ]
+
+        if objs:
+            logger.info("Resolved %d entities from local models", len(objs))
+            changed_objs = _bulk_upsert(self, objs, ["name", "category"])
+            _invalidate_entity_names(changed_objs)
+
+        return {obj.id for obj in objs}
+
+    def bulk_update_or_create_esi(
+        self,
+        *,
+        ids: List[int],
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+        max_workers: int = None,
+    ) -> models.QuerySet:
+        """updates or creates multiple entities by resolving them from ESI (blocking).
+
+        Args:
+            ids: List of valid EveEntity IDs
+            include_children: (no effect)
+            wait_for_children: (no effect)
+            enabled_sections: (no effect)
+            max_workers: (no effect)
+
+        Returns:
+            Queryset with all requested entities
+        """
+        ids = set(map(int, ids))
+        self._bulk_create_unresolved(ids)
+        self.filter(id__in=ids).update_from_esi()
+        return self.filter(id__in=ids)
+
+    async def abulk_update_or_create_esi(
+        self,
+        *,
+        ids: List[int],
+        include_children: bool = False,
+        wait_for_children: bool = True,
+        enabled_sections: Iterable[str] = None,
+        max_workers: int = None,
+    ) -> List[models.Model]:
+        """updates or creates multiple entities by resolving them from ESI.
+        Async version of :meth:`bulk_update_or_create_esi`.
+
+        Args:
+            ids: List of valid EveEntity IDs
+
+        Returns:
+            List with all requested entities
+        """
+        ids = set(map(int, ids))
+        await sync_to_async(self._bulk_create_unresolved, thread_sensitive=True)(ids)
+        await self.filter(id__in=ids).aupdate_from_esi()
+        return await sync_to_async(list, thread_sensitive=True)(self.filter(id__in=ids))
+
+    def _bulk_create_unresolved(self, ids: Iterable[int]) -> None:
+        """creates entities without name for all given IDs that do not yet exist"""
+        objects = [self.model(id=id) for id in ids]
+        self.bulk_create(
+            objects,
+            batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
     def update_or_create_all_esi(
         self,
         *,
@@ -835,12 +2874,21 @@ class EveEntityManager(EveUniverseEntityModelManager):
         """return the name for the given Eve entity ID
         or an empty string if ID is not valid
         """
-        if id is not None:
-            obj, _ = self.get_or_create_esi(id=int(id))
-            if obj:
-                return obj.name
+        if id is None:
+            return ""
 
-        return ""
+        id = int(id)
+        cached = _entity_names_cache.get_many([id])
+        if cached:
+            return cached[id][0]
+
+        obj, _ = self.get_or_create_esi(id=id)
+        if not obj:
+            return ""
+
+        if obj.name:
+            _entity_names_cache.set_many({id: (obj.name, obj.category)})
+        return obj.name
 
     def bulk_resolve_names(self, ids: Iterable[int]) -> EveEntityNameResolver:
         """returns a map of IDs to names in a resolver object for given IDs
@@ -853,13 +2901,98 @@ class EveEntityManager(EveUniverseEntityModelManager):
             of IDs
         """
         ids = set(map(int, ids))
-        self.bulk_create_esi(ids)
-        return EveEntityNameResolver(
-            {
-                row[0]: row[1]
-                for row in self.filter(id__in=ids).values_list("id", "name")
-            }
+        names = {
+            id: name for id, (name, _) in _entity_names_cache.get_many(ids).items()
+        }
+        missing_ids = ids.difference(names.keys())
+        if missing_ids:
+            rows = [
+                row
+                for row in self.filter(id__in=missing_ids).values_list(
+                    "id", "name", "category"
+                )
+                if row[1]
+            ]
+            unresolved_ids = missing_ids.difference(row[0] for row in rows)
+            if unresolved_ids:
+                self.bulk_create_esi(unresolved_ids)
+                rows += self.filter(id__in=unresolved_ids).values_list(
+                    "id", "name", "category"
+                )
+            names.update(self._names_from_rows(rows))
+
+        return EveEntityNameResolver(names)
+
+    async def aresolve_name(self, id: int) -> str:
+        """return the name for the given Eve entity ID
+        or an empty string if ID is not valid. Async version of :meth:`resolve_name`.
+        """
+        if id is None:
+            return ""
+
+        id = int(id)
+        cached = _entity_names_cache.get_many([id])
+        if cached:
+            return cached[id][0]
+
+        obj, _ = await self.aget_or_create_esi(id=id)
+        if not obj:
+            return ""
+
+        if obj.name:
+            _entity_names_cache.set_many({id: (obj.name, obj.category)})
+        return obj.name
+
+    async def abulk_resolve_names(self, ids: Iterable[int]) -> EveEntityNameResolver:
+        """returns a map of IDs to names in a resolver object for given IDs.
+        Async version of :meth:`bulk_resolve_names`.
+
+        Args:
+            ids: List of valid EveEntity IDs
+
+        Returns:
+            EveEntityNameResolver object helpful for quick resolving a large amount
+            of IDs
+        """
+        ids = set(map(int, ids))
+        names = {
+            id: name for id, (name, _) in _entity_names_cache.get_many(ids).items()
+        }
+        missing_ids = ids.difference(names.keys())
+        if missing_ids:
+            rows = [
+                row
+                for row in await sync_to_async(list, thread_sensitive=True)(
+                    self.filter(id__in=missing_ids).values_list(
+                        "id", "name", "category"
+                    )
+                )
+                if row[1]
+            ]
+            unresolved_ids = missing_ids.difference(row[0] for row in rows)
+            if unresolved_ids:
+                await self.abulk_update_or_create_esi(ids=unresolved_ids)
+                rows += await sync_to_async(list, thread_sensitive=True)(
+                    self.filter(id__in=unresolved_ids).values_list(
+                        "id", "name", "category"
+                    )
+                )
+            names.update(self._names_from_rows(rows))
+
+        return EveEntityNameResolver(names)
+
+    @staticmethod
+    def _names_from_rows(
+        rows: Iterable[Tuple[int, str, Optional[str]]]
+    ) -> Dict[int, str]:
+        """returns names by ID from rows of ID, name and category
+        and adds resolved names to the name cache
+        """
+        rows = list(rows)
+        _entity_names_cache.set_many(
+            {id: (name, category) for id, name, category in rows if name}
         )
+        return {id: name for id, name, _ in rows}
 
 
 class EveMarketPriceManager(models.Manager):
@@ -872,7 +3005,7 @@ class EveMarketPriceManager(models.Manager):
         Returns:
             Count of updated types
         """
-        from .models import EveType
+        from .models import EveMarketPriceHistory, EveType
 
         if minutes_until_stale is None:
             minutes_until_stale = self.model.DEFAULT_MINUTES_UNTIL_STALE
@@ -883,40 +3016,149 @@ class EveMarketPriceManager(models.Manager):
             return 0
 
         entries_2 = {int(x["type_id"]): x for x in entries if "type_id" in x}
-        with transaction.atomic():
-            existing_types_ids = set(EveType.objects.values_list("id", flat=True))
-            relevant_prices_ids = set(entries_2.keys()).intersection(existing_types_ids)
-            deadline = now() - dt.timedelta(minutes=minutes_until_stale)
-            current_prices_ids = set(
-                self.filter(updated_at__gt=deadline).values_list(
-                    "eve_type_id", flat=True
-                )
-            )
-            need_updating_ids = relevant_prices_ids.difference(current_prices_ids)
-            if not need_updating_ids:
-                logger.info("Market prices are up to date")
-                return 0
+        existing_types_ids = set(EveType.objects.values_list("id", flat=True))
+        relevant_prices_ids = set(entries_2.keys()).intersection(existing_types_ids)
+        deadline = now() - dt.timedelta(minutes=minutes_until_stale)
+        current_prices_ids = set(
+            self.filter(updated_at__gt=deadline).values_list("eve_type_id", flat=True)
+        )
+        need_updating_ids = relevant_prices_ids.difference(current_prices_ids)
+        if not need_updating_ids:
+            logger.info("Market prices are up to date")
+            return 0
 
-            logger.info(
-                "Updating market prices for %s types...", len(need_updating_ids)
+        logger.info("Updating market prices for %s types...", len(need_updating_ids))
+        updated_at = now()
+        market_prices = [
+            self.model(
+                eve_type_id=type_id,
+                adjusted_price=entry.get("adjusted_price"),
+                average_price=entry.get("average_price"),
+                updated_at=updated_at,
             )
-            self.filter(eve_type_id__in=need_updating_ids).delete()
-            market_prices = [
-                self.model(
-                    eve_type=get_or_create_esi_or_none("type_id", entry, EveType),
-                    adjusted_price=entry.get("adjusted_price"),
-                    average_price=entry.get("average_price"),
+            for type_id, entry in entries_2.items()
+            if type_id in need_updating_ids
+        ]
+        for chunk in chunks(market_prices, EVEUNIVERSE_BULK_METHODS_BATCH_SIZE):
+            with transaction.atomic():
+                _bulk_upsert(
+                    self, chunk, ["adjusted_price", "average_price", "updated_at"]
                 )
-                for type_id, entry in entries_2.items()
-                if type_id in need_updating_ids
-            ]
-            self.bulk_create(
-                market_prices, batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE
-            )
-            logger.info(
-                "Completed updating market prices for %s types.", len(need_updating_ids)
+        EveMarketPriceHistory.objects.bulk_store(market_prices)
+
+        logger.info(
+            "Completed updating market prices for %s types.", len(need_updating_ids)
+        )
+        return len(market_prices)
+
+
+class EveMarketPriceHistoryManager(models.Manager):
+    PRICE_FIELDS = ("adjusted_price", "average_price")
+
+    def bulk_store(self, market_prices: Iterable[models.Model]) -> None:
+        """adds the given market prices to the history of the current day.
+        Prices of types, which already have a price for the current day are ignored.
+        """
+        today = now().date()
+        objs = [
+            self.model(
+                eve_type_id=market_price.eve_type_id,
+                date=today,
+                adjusted_price=market_price.adjusted_price,
+                average_price=market_price.average_price,
             )
-            return len(market_prices)
+            for market_price in market_prices
+        ]
+        self.bulk_create(
+            objs, batch_size=EVEUNIVERSE_BULK_METHODS_BATCH_SIZE, ignore_conflicts=True
+        )
+
+    def moving_averages(
+        self,
+        type_ids: Iterable[int],
+        days: int = 30,
+        field: str = "average_price",
+        until: dt.date = None,
+    ) -> Dict[int, Optional[float]]:
+        """Calculates the average prices of many types over the last days
+        with a single query.
+
+        Args:
+            type_ids: IDs of types to calculate averages for
+            days: number of days incl. the last day to average over
+            field: price to use, i.e. "average_price" or "adjusted_price"
+            until: last day to include, defaults to today
+
+        Returns:
+            Average price by type ID. The average is None if a type has no prices.
+        """
+        type_ids = set(map(int, type_ids))
+        averages = {
+            row["eve_type_id"]: row["price"]
+            for row in self._window(type_ids, days, field, until)
+            .values("eve_type_id")
+            .annotate(price=models.Avg(field))
+            .order_by()
+        }
+        return {type_id: averages.get(type_id) for type_id in type_ids}
+
+    def percent_changes(
+        self,
+        type_ids: Iterable[int],
+        days: int = 30,
+        field: str = "average_price",
+        until: dt.date = None,
+    ) -> Dict[int, Optional[float]]:
+        """Calculates the change of prices of many types in percent between
+        the first and last price within the last days with a single query.
+
+        Args:
+            type_ids: IDs of types to calculate changes for
+            days: number of days incl. the last day
+            field: price to use, i.e. "average_price" or "adjusted_price"
+            until: last day to include, defaults to today
+
+        Returns:
+            Change in percent by type ID. The change is None if a type has
+            less than two prices or the first price is zero.
+        """
+        type_ids = set(map(int, type_ids))
+        first_and_last = dict()
+        for type_id, price in (
+            self._window(type_ids, days, field, until)
+            .order_by("eve_type_id", "date")
+            .values_list("eve_type_id", field)
+        ):
+            if type_id not in first_and_last:
+                first_and_last[type_id] = [price, None]
+            else:
+                first_and_last[type_id][1] = price
+
+        changes = dict()
+        for type_id in type_ids:
+            first, last = first_and_last.get(type_id, (None, None))
+            if first and last is not None:
+                changes[type_id] = (last - first) / first * 100
+            else:
+                changes[type_id] = None
+
+        return changes
+
+    def _window(
+        self, type_ids: Set[int], days: int, field: str, until: Optional[dt.date]
+    ) -> models.QuerySet:
+        """returns a queryset with the prices of the given types within a period"""
+        if field not in self.PRICE_FIELDS:
+            raise ValueError(f"Invalid field: {field}")
+
+        if until is None:
+            until = now().date()
+
+        return self.filter(
+            eve_type_id__in=type_ids,
+            date__gt=until - dt.timedelta(days=days),
+            date__lte=until,
+        ).exclude(**{f"{field}__isnull": True})
 
 
 class EveTypeMaterialManager(models.Manager):
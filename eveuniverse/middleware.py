@@ -0,0 +1,64 @@
+import json
+from typing import Callable, Optional
+
+from django.utils.html import escape
+
+from .helpers import EveEntityNameCollector
+
+
+class EveEntityNamesMiddleware:
+    """Resolves the names of all Eve entities rendered with the template tag
+    ``eve_entity_name`` during a request with a single bulk query
+    and fills them into text responses, e.g. HTML, JSON or plain text.
+
+    Names are escaped as needed for the content type of the response.
+    Streaming responses and responses with binary content are not changed.
+    """
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with EveEntityNameCollector() as collector:
+            response = self.get_response(request)
+
+        if collector.ids and not response.streaming:
+            escape_function = self._escape_function(response.get("Content-Type", ""))
+            if escape_function is not None:
+                charset = response.charset
+                content = collector.resolve(
+                    response.content.decode(charset), escape_function=escape_function
+                )
+                response.content = content.encode(charset)
+                if response.has_header("Content-Length"):
+                    response["Content-Length"] = str(len(response.content))
+
+        return response
+
+    @staticmethod
+    def _escape_function(content_type: str) -> Optional[Callable[[str], str]]:
+        """returns the function for escaping names in content of the given type
+        or None if the content is not text.
+        """
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type in {"text/html", "application/xhtml+xml"} or media_type.endswith(
+            "xml"
+        ):
+            return escape
+
+        if (
+            media_type in {"application/json", "application/javascript"}
+            or media_type.endswith("+json")
+            or media_type == "text/javascript"
+        ):
+            return _escape_json_string
+
+        if media_type.startswith("text/"):
+            return str
+
+        return None
+
+
+def _escape_json_string(value: str) -> str:
+    """escapes a value for use inside a JSON string"""
+    return json.dumps(value)[1:-1]
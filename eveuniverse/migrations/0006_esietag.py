@@ -0,0 +1,37 @@
+# Generated by Django 3.1.14 on 2026-10-17 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eveuniverse", "0005_type_materials_and_sections"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EsiEtag",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model_name", models.CharField(max_length=50)),
+                ("object_id", models.PositiveIntegerField()),
+                ("etag", models.CharField(max_length=255)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="esietag",
+            constraint=models.UniqueConstraint(
+                fields=("model_name", "object_id"), name="fpk_esietag"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 3.1.14 on 2026-10-17 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eveuniverse", "0006_esietag"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EveEntityInvalidId",
+            fields=[
+                ("id", models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.1.14 on 2026-10-17 06:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eveuniverse", "0007_eveentityinvalidid"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EveMarketPriceHistory",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(db_index=True)),
+                ("adjusted_price", models.FloatField(default=None, null=True)),
+                ("average_price", models.FloatField(default=None, null=True)),
+                (
+                    "eve_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="market_price_history",
+                        to="eveuniverse.evetype",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="evemarketpricehistory",
+            constraint=models.UniqueConstraint(
+                fields=("eve_type", "date"), name="fpk_evemarketpricehistory"
+            ),
+        ),
+    ]
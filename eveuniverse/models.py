@@ -4,12 +4,13 @@ import logging
 import math
 import sys
 from collections import namedtuple
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from bitfield import BitField
 from bravado.exception import HTTPNotFound
 
 from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 
 from . import __title__, constants
@@ -27,18 +28,24 @@ from .app_settings import (
     EVEUNIVERSE_USE_EVESKINSERVER,
 )
 from .core import eveimageserver, eveskinserver, fuzzwork
+from .core.jumpgraph import ROUTE_FLAG_SHORTEST
 from .managers import (
+    EsiEtagManager,
     EveAsteroidBeltManager,
+    EveEntityInvalidIdManager,
     EveEntityManager,
+    EveMarketPriceHistoryManager,
     EveMarketPriceManager,
     EveMoonManager,
     EvePlanetManager,
+    EveSolarSystemManager,
     EveStargateManager,
     EveStationManager,
     EveTypeManager,
     EveTypeMaterialManager,
     EveUniverseBaseModelManager,
     EveUniverseEntityModelManager,
+    _entity_names_cache,
 )
 from .providers import esi
 from .utils import LoggerAddTag
@@ -62,6 +69,10 @@ EsiMapping = namedtuple(
     ],
 )
 
+# compiled ESI mappings and extractors per model and set of disabled fields
+_ESI_MAPPINGS_CACHE = dict()
+_ESI_EXTRACTORS_CACHE = dict()
+
 
 class _SectionBase(str, enum.Enum):
     """Base class for all Sections"""
@@ -153,11 +164,58 @@ class EveUniverseBaseModel(models.Model):
 
     @classmethod
     def _esi_mapping(cls, enabled_sections: Set[str] = None) -> dict:
+        """returns the ESI mapping for this model and the given sections.
+
+        Mappings are compiled once per process and model and then cached.
+        Do not modify the returned mapping.
+        """
+        key = cls._esi_mapping_key(enabled_sections)
+        try:
+            return _ESI_MAPPINGS_CACHE[key]
+        except KeyError:
+            mapping = cls._compile_esi_mapping(disabled_fields=key[1])
+            _ESI_MAPPINGS_CACHE[key] = mapping
+            return mapping
+
+    @classmethod
+    def _esi_extractor(
+        cls, enabled_sections: Set[str] = None
+    ) -> Callable[[dict], dict]:
+        """returns a precompiled function for extracting field values
+        from an ESI data object for this model and the given sections.
+
+        The function returns the ESI values of all non-pk fields by field name.
+        Fields without value in the ESI data object are omitted.
+        """
+        key = cls._esi_mapping_key(enabled_sections)
+        try:
+            return _ESI_EXTRACTORS_CACHE[key]
+        except KeyError:
+            extractor = cls._compile_esi_extractor(cls._esi_mapping(enabled_sections))
+            _ESI_EXTRACTORS_CACHE[key] = extractor
+            return extractor
+
+    @classmethod
+    def _esi_mapping_key(cls, enabled_sections: Set[str] = None) -> tuple:
+        """returns the cache key for the ESI mapping of this model.
+
+        The mapping of a model only varies with its disabled fields,
+        which also reflect the global settings for sections.
+        """
+        return cls, frozenset(cls._disabled_fields(enabled_sections))
+
+    @classmethod
+    def _reset_esi_mapping_cache(cls) -> None:
+        """removes all compiled ESI mappings and extractors for all models"""
+        _ESI_MAPPINGS_CACHE.clear()
+        _ESI_EXTRACTORS_CACHE.clear()
+
+    @classmethod
+    def _compile_esi_mapping(cls, disabled_fields: Set[str]) -> dict:
         field_mappings = cls._eve_universe_meta_attr("field_mappings")
         functional_pk = cls._eve_universe_meta_attr("functional_pk")
         parent_fk = cls._eve_universe_meta_attr("parent_fk")
         dont_create_related = cls._eve_universe_meta_attr("dont_create_related")
-        disabled_fields = cls._disabled_fields(enabled_sections)
         mapping = dict()
         for field in [
             field
@@ -210,6 +268,35 @@ class EveUniverseBaseModel(models.Model):
 
         return mapping
 
+    @staticmethod
+    def _compile_esi_extractor(esi_mapping: dict) -> Callable[[dict], dict]:
+        plain_fields = [
+            (field_name, mapping.esi_name)
+            for field_name, mapping in esi_mapping.items()
+            if not mapping.is_pk and not isinstance(mapping.esi_name, tuple)
+        ]
+        nested_fields = [
+            (field_name, mapping.esi_name[0], mapping.esi_name[1])
+            for field_name, mapping in esi_mapping.items()
+            if not mapping.is_pk and isinstance(mapping.esi_name, tuple)
+        ]
+
+        def extractor(eve_data_obj: dict) -> dict:
+            values = dict()
+            for field_name, esi_name in plain_fields:
+                esi_value = eve_data_obj.get(esi_name)
+                if esi_value is not None:
+                    values[field_name] = esi_value
+
+            for field_name, esi_name_1, esi_name_2 in nested_fields:
+                esi_value = (eve_data_obj.get(esi_name_1) or dict()).get(esi_name_2)
+                if esi_value is not None:
+                    values[field_name] = esi_value
+
+            return values
+
+        return extractor
+
     @classmethod
     def _disabled_fields(cls, enabled_sections: Set[str] = None) -> set:
         """returns name of fields that must not be loaded from ESI"""
@@ -362,6 +449,40 @@ class EveUniverseInlineModel(EveUniverseBaseModel):
         abstract = True
 
 
+class EsiEtag(models.Model):
+    """ETag of the last ESI response for an Eve universe object"""
+
+    model_name = models.CharField(max_length=50)
+    object_id = models.PositiveIntegerField()
+    etag = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EsiEtagManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model_name", "object_id"],
+                name="fpk_esietag",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model_name}:{self.object_id}"
+
+
+class EveEntityInvalidId(models.Model):
+    """ID, which ESI failed to resolve to an Eve entity"""
+
+    id = models.PositiveIntegerField(primary_key=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EveEntityInvalidIdManager()
+
+    def __str__(self) -> str:
+        return str(self.id)
+
+
 class EveEntity(EveUniverseEntityModel):
     """An Eve object from one of the categories supported by ESI's
     `/universe/names/` endpoint:
@@ -373,10 +494,10 @@ class EveEntity(EveUniverseEntityModel):
     """
 
     # NPC IDs
-    NPC_CORPORATION_ID_BEGIN = 1_000_000
-    NPC_CORPORATION_ID_END = 2_000_000
-    NPC_CHARACTER_ID_BEGIN = 3_000_000
-    NPC_CHARACTER_ID_END = 4_000_000
+    NPC_CORPORATION_ID_BEGIN = constants.EVE_NPC_CORPORATION_ID_MIN
+    NPC_CORPORATION_ID_END = constants.EVE_NPC_CORPORATION_ID_MAX
+    NPC_CHARACTER_ID_BEGIN = constants.EVE_NPC_CHARACTER_ID_MIN
+    NPC_CHARACTER_ID_END = constants.EVE_NPC_CHARACTER_ID_MAX
 
     # categories
     CATEGORY_ALLIANCE = "alliance"
@@ -401,6 +522,45 @@ class EveEntity(EveUniverseEntityModel):
         (CATEGORY_STATION, "station"),
     )
 
+    # categories of ID ranges, which are used exclusively by one category
+    ID_RANGE_CATEGORIES = (
+        (
+            constants.EVE_FACTION_ID_MIN,
+            constants.EVE_FACTION_ID_MAX,
+            CATEGORY_FACTION,
+        ),
+        (
+            constants.EVE_NPC_CORPORATION_ID_MIN,
+            constants.EVE_NPC_CORPORATION_ID_MAX,
+            CATEGORY_CORPORATION,
+        ),
+        (
+            constants.EVE_NPC_CHARACTER_ID_MIN,
+            constants.EVE_NPC_CHARACTER_ID_MAX,
+            CATEGORY_CHARACTER,
+        ),
+        (
+            constants.EVE_REGION_ID_MIN,
+            constants.EVE_REGION_ID_MAX,
+            CATEGORY_REGION,
+        ),
+        (
+            constants.EVE_CONSTELLATION_ID_MIN,
+            constants.EVE_CONSTELLATION_ID_MAX,
+            CATEGORY_CONSTELLATION,
+        ),
+        (
+            constants.EVE_SOLAR_SYSTEM_ID_MIN,
+            constants.EVE_SOLAR_SYSTEM_ID_MAX,
+            CATEGORY_SOLAR_SYSTEM,
+        ),
+        (
+            constants.EVE_STATION_ID_MIN,
+            constants.EVE_STATION_ID_MAX,
+            CATEGORY_STATION,
+        ),
+    )
+
     category = models.CharField(
         max_length=16, choices=CATEGORY_CHOICES, default=None, null=True
     )
@@ -422,6 +582,27 @@ class EveEntity(EveUniverseEntityModel):
         else:
             return f"ID:{self.id}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._loaded_names = (obj.__dict__.get("name"), obj.__dict__.get("category"))
+        return obj
+
+    def save(self, *args, **kwargs) -> None:
+        """saves this entity and invalidates its cached name
+        when the name or category of an existing entity has changed
+        """
+        super().save(*args, **kwargs)
+        names = (self.name, self.category)
+        loaded_names = getattr(self, "_loaded_names", None)
+        if (
+            not kwargs.get("force_insert")
+            and loaded_names != names
+            and (not loaded_names or loaded_names[0])
+        ):
+            _entity_names_cache.invalidate([self.id])
+        self._loaded_names = names
+
     @property
     def is_alliance(self) -> bool:
         """returns True if entity is an alliance, else False"""
@@ -486,6 +667,17 @@ class EveEntity(EveUniverseEntityModel):
 
         return False
 
+    @classmethod
+    def category_for_id(cls, id: int) -> Optional[str]:
+        """returns the category of an Eve ID derived from its ID range
+        or None if the category can not be derived from the ID alone
+        """
+        for begin, end, category in cls.ID_RANGE_CATEGORIES:
+            if begin <= id < end:
+                return category
+
+        return None
+
     def is_category(self, category: str) -> bool:
         """returns True if this entity has the given category, else False"""
         return category in self._CATEGORIES and self.category == category
@@ -931,6 +1123,33 @@ class EveMarketPrice(models.Model):
         )
 
 
+class EveMarketPriceHistory(models.Model):
+    """Daily history of the market prices of an Eve Online type
+
+    Stores the first market price of each type fetched from ESI per day.
+    """
+
+    eve_type = models.ForeignKey(
+        "EveType", on_delete=models.CASCADE, related_name="market_price_history"
+    )
+    date = models.DateField(db_index=True)
+    adjusted_price = models.FloatField(default=None, null=True)
+    average_price = models.FloatField(default=None, null=True)
+
+    objects = EveMarketPriceHistoryManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["eve_type", "date"],
+                name="fpk_evemarketpricehistory",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.eve_type_id}:{self.date}: {self.average_price}"
+
+
 class EveMoon(EveUniverseEntityModel):
     """A moon in Eve Online"""
 
@@ -1086,6 +1305,8 @@ class EveSolarSystem(EveUniverseEntityModel):
         ),  # no index, because MySQL does not support it for bitwise operations
     )
 
+    objects = EveSolarSystemManager()
+
     class EveUniverseMeta:
         esi_pk = "system_id"
         esi_path_list = "Universe.get_universe_systems"
@@ -1123,7 +1344,11 @@ class EveSolarSystem(EveUniverseEntityModel):
     @property
     def is_w_space(self) -> bool:
         """returns True if this solar system is in wormhole space, else False"""
-        return 31000000 <= self.id < 32000000
+        return (
+            constants.EVE_SOLAR_SYSTEM_ID_W_SPACE_MIN
+            <= self.id
+            < constants.EVE_SOLAR_SYSTEM_ID_W_SPACE_MAX
+        )
 
     @classmethod
     def eve_entity_category(cls) -> str:
@@ -1148,39 +1373,64 @@ class EveSolarSystem(EveUniverseEntityModel):
             )
 
     def route_to(
-        self, destination: "EveSolarSystem"
+        self, destination: "EveSolarSystem", flag: str = ROUTE_FLAG_SHORTEST
     ) -> Optional[List["EveSolarSystem"]]:
         """Calculates the shortest route between the current and the given solar system
 
         Args:
             destination: Other solar system to use in calculation
+            flag: Route preference, i.e. one of "shortest", "secure" or "insecure"
 
         Returns:
             List of solar system objects incl. origin and destination or None if no route can be found (e.g. if one system is in WH space)
         """
-        path_ids = self._calc_route_esi(self.id, destination.id)
+        path_ids = self._calc_route(self.id, destination.id, flag)
         if path_ids is not None:
-            return [
-                EveSolarSystem.objects.get_or_create_esi(id=solar_system_id)
-                for solar_system_id in path_ids
-            ]
+            solar_systems = EveSolarSystem.objects.bulk_get_or_create_esi(
+                ids=path_ids
+            ).in_bulk()
+            return [solar_systems[solar_system_id] for solar_system_id in path_ids]
         else:
             return None
 
-    def jumps_to(self, destination: "EveSolarSystem") -> Optional[int]:
+    def jumps_to(
+        self, destination: "EveSolarSystem", flag: str = ROUTE_FLAG_SHORTEST
+    ) -> Optional[int]:
         """Calculates the shortest route between the current and the given solar system
 
         Args:
             destination: Other solar system to use in calculation
+            flag: Route preference, i.e. one of "shortest", "secure" or "insecure"
 
         Returns:
             Number of total jumps or None if no route can be found (e.g. if one system is in WH space)
         """
-        path_ids = self._calc_route_esi(self.id, destination.id)
+        path_ids = self._calc_route(self.id, destination.id, flag)
         return len(path_ids) - 1 if path_ids is not None else None
 
     @staticmethod
-    def _calc_route_esi(origin_id: int, destination_id: int) -> Optional[List[int]]:
+    def _calc_route(
+        origin_id: int, destination_id: int, flag: str = ROUTE_FLAG_SHORTEST
+    ) -> Optional[List[int]]:
+        """returns the route between two given solar systems.
+
+        Route is calculated locally from the stored stargates when they are
+        complete for both systems, else by ESI
+        """
+        jump_graph = EveSolarSystem.objects.jump_graph()
+        if (
+            jump_graph.is_complete
+            and origin_id in jump_graph
+            and destination_id in jump_graph
+        ):
+            return jump_graph.route(origin_id, destination_id, flag)
+
+        return EveSolarSystem._calc_route_esi(origin_id, destination_id, flag)
+
+    @staticmethod
+    def _calc_route_esi(
+        origin_id: int, destination_id: int, flag: str = ROUTE_FLAG_SHORTEST
+    ) -> Optional[List[int]]:
         """returns the shortest route between two given solar systems.
 
         Route is calculated by ESI
@@ -1194,7 +1444,7 @@ class EveSolarSystem(EveUniverseEntityModel):
 
         try:
             return esi.client.Routes.get_route_origin_destination(
-                origin=origin_id, destination=destination_id
+                origin=origin_id, destination=destination_id, flag=flag
             ).results()
         except HTTPNotFound:
             return None
@@ -1202,12 +1452,48 @@ class EveSolarSystem(EveUniverseEntityModel):
     def nearest_celestial(self, x: int, y: int, z: int) -> Optional[NearestCelestial]:
         """Return nearest celestial to given coordinates as eveuniverse object.
 
+        Will use the stored celestials if all kinds of celestials of this solar system
+        have been loaded, i.e. planets, moons, asteroid belts, stargates and stations,
+        else fetch the nearest celestial from fuzzwork.
+
         Will return None if none is found.
         """
-        item = fuzzwork.nearest_celestial(x, y, z, solar_system_id=self.id)
+        celestial_index = EveSolarSystem.objects.celestial_index(self.id)
+        if celestial_index is not None:
+            try:
+                return self._nearest_celestial_local(celestial_index, x, y, z)
+            except ObjectDoesNotExist:
+                logger.info(
+                    "%s: Celestial index is outdated. Using fuzzwork instead.", self
+                )
+                EveSolarSystem.objects._clear_celestial_indexes([self])
+
+        celestials = dict()
+
+        def celestial_position(item: fuzzwork.EveItem) -> Optional[tuple]:
+            celestials[item.id] = self._celestial_from_fuzzwork_item(item)
+            if not celestials[item.id]:
+                return None
+            obj = celestials[item.id].eve_object
+            return obj.position_x, obj.position_y, obj.position_z
+
+        item = fuzzwork.nearest_celestial(
+            x, y, z, solar_system_id=self.id, celestial_position=celestial_position
+        )
         if not item:
             return None
 
+        if item.id not in celestials:
+            celestials[item.id] = self._celestial_from_fuzzwork_item(item)
+        if not celestials[item.id]:
+            return None
+
+        return celestials[item.id]._replace(distance=item.distance)
+
+    @classmethod
+    def _celestial_from_fuzzwork_item(
+        cls, item: fuzzwork.EveItem
+    ) -> Optional[NearestCelestial]:
         eve_type, _ = EveType.objects.get_or_create_esi(id=item.type_id)
         if eve_type.eve_group_id == constants.EVE_GROUP_ID_ASTEROID_BELT:
             MyClass = EveAsteroidBelt
@@ -1223,10 +1509,24 @@ class EveSolarSystem(EveUniverseEntityModel):
             return None
 
         obj, _ = MyClass.objects.get_or_create_esi(id=item.id)
-        return self.NearestCelestial(
+        return cls.NearestCelestial(
             eve_type=eve_type, eve_object=obj, distance=item.distance
         )
 
+    def _nearest_celestial_local(
+        self, celestial_index, x: int, y: int, z: int
+    ) -> Optional[NearestCelestial]:
+        result = celestial_index.nearest((x, y, z))
+        if not result:
+            return None
+
+        (model_name, id, type_id), distance = result
+        obj = self.get_model_class(model_name).objects.get(id=id)
+        eve_type, _ = EveType.objects.get_or_create_esi(id=type_id)
+        return self.NearestCelestial(
+            eve_type=eve_type, eve_object=obj, distance=distance
+        )
+
     @classmethod
     def _children(cls, enabled_sections: Iterable[str] = None) -> dict:
         enabled_sections = cls._enabled_sections_union(enabled_sections)
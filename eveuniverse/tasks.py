@@ -1,3 +1,4 @@
+import datetime as dt
 import logging
 from typing import Iterable, List
 
@@ -18,9 +19,14 @@ from .app_settings import (
     EVEUNIVERSE_TASKS_TIME_LIMIT,
 )
 from .constants import EVE_CATEGORY_ID_SHIP, EVE_CATEGORY_ID_STRUCTURE
-from .models import EveEntity, EveMarketPrice, EveUniverseEntityModel
+from .models import (
+    EveEntity,
+    EveMarketPrice,
+    EveUniverseBaseModel,
+    EveUniverseEntityModel,
+)
 from .providers import esi
-from .utils import LoggerAddTag
+from .utils import LoggerAddTag, chunks
 
 logger = LoggerAddTag(logging.getLogger(__name__), __title__)
 # logging.getLogger("esi").setLevel(logging.INFO)
@@ -82,6 +88,90 @@ def update_or_create_eve_object(
     )
 
 
+@shared_task(**TASK_ESI_KWARGS)
+def update_or_create_eve_objects(
+    model_name: str,
+    ids: List[int],
+    include_children=False,
+    wait_for_children=True,
+    enabled_sections: List[str] = None,
+) -> None:
+    """Task for updating or creating several eve objects of the same model from ESI"""
+    logger.info("Updating/Creating %d %s objects", len(ids), model_name)
+    ModelClass = EveUniverseEntityModel.get_model_class(model_name)
+    ModelClass.objects.bulk_update_or_create_esi(
+        ids=ids,
+        include_children=include_children,
+        wait_for_children=wait_for_children,
+        enabled_sections=enabled_sections,
+    )
+
+
+@shared_task(**TASK_DEFAULT_KWARGS)
+def refresh_stale_esi(
+    older_than_minutes: int = 1440,
+    model_names: List[str] = None,
+    batch_size: int = 100,
+    batch_delay: int = 10,
+) -> None:
+    """Refreshes all eve objects from ESI, which have not been updated
+    for the given time.
+
+    Stale objects are refreshed in batches, which are started with a delay
+    to each other in order to limit the load on ESI.
+
+    Args:
+    - older_than_minutes: Objects not updated since this many minutes are stale
+    - model_names: Names of models to refresh. Will refresh all models if not specified
+    - batch_size: Max number of objects refreshed per batch
+    - batch_delay: Seconds between the starts of two consecutive batches
+    """
+    older_than = dt.timedelta(minutes=older_than_minutes)
+    if model_names:
+        model_classes = [
+            EveUniverseEntityModel.get_model_class(model_name)
+            for model_name in model_names
+        ]
+    else:
+        model_classes = [
+            ModelClass
+            for ModelClass in EveUniverseBaseModel.all_models()
+            if issubclass(ModelClass, EveUniverseEntityModel)
+            and ModelClass._eve_universe_meta_attr("esi_path_object")
+        ]
+    batch_count = 0
+    object_count = 0
+    for ModelClass in model_classes:
+        ids = list(
+            ModelClass.objects.filter_stale(older_than)
+            .order_by("last_updated")
+            .values_list("id", flat=True)
+        )
+        if not ids:
+            continue
+        logger.info(
+            "Refreshing %d stale %s objects in batches of %d",
+            len(ids),
+            ModelClass.__name__,
+            batch_size,
+        )
+        for chunk_ids in chunks(ids, batch_size):
+            update_or_create_eve_objects.apply_async(
+                kwargs={"model_name": ModelClass.__name__, "ids": chunk_ids},
+                countdown=batch_count * batch_delay,
+            )
+            batch_count += 1
+        object_count += len(ids)
+
+    logger.info(
+        "Started refreshing %d stale objects in %d batches. "
+        "Last batch will start in %d seconds.",
+        object_count,
+        batch_count,
+        max(batch_count - 1, 0) * batch_delay,
+    )
+
+
 @shared_task(**TASK_ESI_KWARGS)
 def update_or_create_inline_object(
     parent_obj_id: int,
@@ -112,6 +202,35 @@ def update_or_create_inline_object(
     )
 
 
+@shared_task(**TASK_ESI_KWARGS)
+def update_or_create_inline_objects(
+    parent_obj_id: int,
+    parent_fk: str,
+    eve_data_objs: List[dict],
+    other_pk_info: dict,
+    parent2_model_name: str,
+    inline_model_name: str,
+    parent_model_name: str,
+) -> None:
+    """Task for updating or creating all inline objects of a parent object from ESI"""
+    logger.info(
+        "Updating/Creating %d inline objects %s for %s with ID %s",
+        len(eve_data_objs),
+        inline_model_name,
+        parent_model_name,
+        parent_obj_id,
+    )
+    ModelClass = EveUniverseEntityModel.get_model_class(parent_model_name)
+    ModelClass.objects._sync_inline_objects(
+        parent_obj_id=parent_obj_id,
+        parent_fk=parent_fk,
+        eve_data_objs=eve_data_objs,
+        other_pk_info=other_pk_info,
+        parent2_model_name=parent2_model_name,
+        inline_model_name=inline_model_name,
+    )
+
+
 # EveEntity objects
 
 
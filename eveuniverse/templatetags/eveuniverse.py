@@ -0,0 +1,25 @@
+from django import template
+
+from ..helpers import EveEntityNameCollector
+from ..models import EveEntity
+
+register = template.Library()
+
+
+@register.simple_tag
+def eve_entity_name(entity) -> str:
+    """renders the name of an Eve entity given by ID or object.
+
+    Names are resolved in bulk at the end of the request when
+    ``EveEntityNamesMiddleware`` is active. Pass IDs, e.g. ``character_id``,
+    instead of related objects to avoid loading each object separately.
+    """
+    if entity is None or entity == "":
+        return ""
+
+    id = entity.id if isinstance(entity, EveEntity) else int(entity)
+    collector = EveEntityNameCollector.current()
+    if collector is not None:
+        return collector.placeholder(id)
+
+    return EveEntity.objects.resolve_name(id)
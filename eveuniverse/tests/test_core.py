@@ -1,3 +1,6 @@
+import math
+import random
+import unittest
 from unittest.mock import Mock, patch
 
 import requests_mock
@@ -7,9 +10,16 @@ from django.core.cache import cache
 from django.test import TestCase
 
 from ..core import esitools, eveimageserver, eveskinserver, fuzzwork
+from ..core.coordinates import CoordinateIndex, KDTree
+from ..core.jumpgraph import JumpGraph
 from ..utils import NoSocketsTestCase
 from .testdata.esi import EsiClientStub
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 @patch("eveuniverse.core.esitools.esi")
 class TestIsEsiOnline(NoSocketsTestCase):
@@ -269,3 +279,455 @@ class TestFuzzworkNearestCelestial(TestCase):
         result = fuzzwork.nearest_celestial(x=1, y=2, z=3, solar_system_id=30002682)
         # then
         self.assertIsNone(result)
+
+    def test_should_cache_when_nothing_found(self, requests_mocker):
+        # given
+        item = {"itemName": None, "typeid": None, "itemid": None, "distance": None}
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1&y=2&z=3&solarsystemid=30002682",
+            json=item,
+        )
+        fuzzwork.nearest_celestial(x=1, y=2, z=3, solar_system_id=30002682)
+        # when
+        result = fuzzwork.nearest_celestial(x=1, y=2, z=3, solar_system_id=30002682)
+        # then
+        self.assertIsNone(result)
+        self.assertEqual(requests_mocker.call_count, 1)
+
+    def test_should_return_item_from_cache_for_nearby_position(self, requests_mocker):
+        # given
+        item = {
+            "itemName": "Colelie VI - Asteroid Belt 1",
+            "typeid": 15,
+            "itemid": 40170698,
+            "distance": 200000.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1000&y=2000&z=3000&solarsystemid=99",
+            json=item,
+        )
+        fuzzwork.nearest_celestial(
+            x=1000,
+            y=2000,
+            z=3000,
+            solar_system_id=99,
+            celestial_position=lambda item: (1000, 2000, 203000),
+        )
+        # when
+        result = fuzzwork.nearest_celestial(x=1500, y=2500, z=3500, solar_system_id=99)
+        # then
+        self.assertEqual(result.id, 40170698)
+        self.assertAlmostEqual(
+            result.distance, math.sqrt(500**2 + 500**2 + 199500**2)
+        )
+        self.assertEqual(requests_mocker.call_count, 1)
+
+    def test_should_not_use_cache_for_nearby_position_without_celestial_position(
+        self, requests_mocker
+    ):
+        # given
+        item = {
+            "itemName": "Colelie VI - Asteroid Belt 1",
+            "typeid": 15,
+            "itemid": 40170698,
+            "distance": 200000.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1000&y=2000&z=3000&solarsystemid=99",
+            json=item,
+        )
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1500&y=2500&z=3500&solarsystemid=99",
+            json={**item, "distance": 199500.0},
+        )
+        fuzzwork.nearest_celestial(x=1000, y=2000, z=3000, solar_system_id=99)
+        # when
+        result = fuzzwork.nearest_celestial(x=1500, y=2500, z=3500, solar_system_id=99)
+        # then
+        self.assertEqual(result.id, 40170698)
+        self.assertEqual(result.distance, 199500.0)
+        self.assertEqual(requests_mocker.call_count, 2)
+
+    def test_should_keep_cached_item_when_fetching_other_position_in_same_cell(
+        self, requests_mocker
+    ):
+        # given
+        item_1 = {
+            "itemName": "Colelie VI - Asteroid Belt 1",
+            "typeid": 15,
+            "itemid": 40170698,
+            "distance": 2000.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1000&y=2000&z=3000&solarsystemid=99",
+            json=item_1,
+        )
+        item_2 = {
+            "itemName": "Colelie VI",
+            "typeid": 13,
+            "itemid": 40170697,
+            "distance": 1500.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=6000&y=2000&z=3000&solarsystemid=99",
+            json=item_2,
+        )
+        fuzzwork.nearest_celestial(x=1000, y=2000, z=3000, solar_system_id=99)
+        fuzzwork.nearest_celestial(x=6000, y=2000, z=3000, solar_system_id=99)
+        # when
+        result_1 = fuzzwork.nearest_celestial(
+            x=1000, y=2000, z=3000, solar_system_id=99
+        )
+        result_2 = fuzzwork.nearest_celestial(
+            x=6000, y=2000, z=3000, solar_system_id=99
+        )
+        # then
+        self.assertEqual(result_1.id, 40170698)
+        self.assertEqual(result_2.id, 40170697)
+        self.assertEqual(requests_mocker.call_count, 2)
+
+    def test_should_not_use_cache_when_position_too_far_away(self, requests_mocker):
+        # given
+        item_1 = {
+            "itemName": "Colelie VI - Asteroid Belt 1",
+            "typeid": 15,
+            "itemid": 40170698,
+            "distance": 2000.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1000&y=2000&z=3000&solarsystemid=99",
+            json=item_1,
+        )
+        item_2 = {
+            "itemName": "Colelie VI",
+            "typeid": 13,
+            "itemid": 40170697,
+            "distance": 1500.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=6000&y=2000&z=3000&solarsystemid=99",
+            json=item_2,
+        )
+        fuzzwork.nearest_celestial(x=1000, y=2000, z=3000, solar_system_id=99)
+        # when
+        result = fuzzwork.nearest_celestial(x=6000, y=2000, z=3000, solar_system_id=99)
+        # then
+        self.assertEqual(result.id, 40170697)
+        self.assertEqual(requests_mocker.call_count, 2)
+
+    def test_should_return_items_for_many_points(self, requests_mocker):
+        # given
+        item_1 = {
+            "itemName": "Colelie VI - Asteroid Belt 1",
+            "typeid": 15,
+            "itemid": 40170698,
+            "distance": 200000.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1050&y=2050&z=3050&solarsystemid=99",
+            json=item_1,
+        )
+        item_2 = {"itemName": None, "typeid": None, "itemid": None, "distance": None}
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1000&y=2000&z=3000&solarsystemid=98",
+            json=item_2,
+        )
+        points = [
+            (1000, 2000, 3000, 99),
+            (1000, 2000, 3000, 98),
+            (1100, 2100, 3100, 99),
+        ]
+        # when
+        result = fuzzwork.nearest_celestials(
+            points, celestial_position=lambda item: (1050, 2050, 203050)
+        )
+        # then
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0].id, 40170698)
+        self.assertIsNone(result[1])
+        self.assertEqual(result[2].id, 40170698)
+        self.assertEqual(requests_mocker.call_count, 2)
+
+    def test_should_request_points_in_same_grid_cell_once(self, requests_mocker):
+        # given
+        item = {
+            "itemName": "Colelie VI - Asteroid Belt 1",
+            "typeid": 15,
+            "itemid": 40170698,
+            "distance": 200000.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1100&y=2100&z=3100&solarsystemid=99",
+            json=item,
+        )
+        points = [
+            (1000, 2000, 3000, 99),
+            (1100, 2100, 3100, 99),
+            (1200, 2200, 3200, 99),
+        ]
+        # when
+        result = fuzzwork.nearest_celestials(
+            points, celestial_position=lambda item: (1100, 2100, 203100)
+        )
+        # then
+        self.assertEqual([obj.id for obj in result], [40170698] * 3)
+        self.assertAlmostEqual(result[1].distance, 200000.0)
+        self.assertEqual(requests_mocker.call_count, 1)
+
+    def test_should_request_points_too_far_from_center_individually(
+        self, requests_mocker
+    ):
+        # given
+        item_1 = {
+            "itemName": "Colelie VI - Asteroid Belt 1",
+            "typeid": 15,
+            "itemid": 40170698,
+            "distance": 20.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1010&y=2000&z=3000&solarsystemid=99",
+            json=item_1,
+        )
+        item_2 = {
+            "itemName": "Colelie VI",
+            "typeid": 13,
+            "itemid": 40170697,
+            "distance": 10.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1000&y=2000&z=3000&solarsystemid=99",
+            json=item_2,
+        )
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1020&y=2000&z=3000&solarsystemid=99",
+            json=item_2,
+        )
+        points = [(1000, 2000, 3000, 99), (1020, 2000, 3000, 99)]
+        # when
+        result = fuzzwork.nearest_celestials(points)
+        # then
+        self.assertEqual([obj.id for obj in result], [40170697, 40170697])
+        self.assertEqual(requests_mocker.call_count, 3)
+
+    def test_should_cache_points_requested_individually(self, requests_mocker):
+        # given
+        item_1 = {
+            "itemName": "Colelie VI - Asteroid Belt 1",
+            "typeid": 15,
+            "itemid": 40170698,
+            "distance": 20.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1010&y=2000&z=3000&solarsystemid=99",
+            json=item_1,
+        )
+        item_2 = {
+            "itemName": "Colelie VI",
+            "typeid": 13,
+            "itemid": 40170697,
+            "distance": 10.0,
+        }
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1000&y=2000&z=3000&solarsystemid=99",
+            json=item_2,
+        )
+        requests_mocker.register_uri(
+            "GET",
+            url="https://www.fuzzwork.co.uk/api/nearestCelestial.php?x=1020&y=2000&z=3000&solarsystemid=99",
+            json=item_2,
+        )
+        points = [(1000, 2000, 3000, 99), (1020, 2000, 3000, 99)]
+        fuzzwork.nearest_celestials(points)
+        # when
+        result = fuzzwork.nearest_celestials(points)
+        # then
+        self.assertEqual([obj.id for obj in result], [40170697, 40170697])
+        self.assertEqual(requests_mocker.call_count, 3)
+
+
+class TestJumpGraph(TestCase):
+    @staticmethod
+    def _create_graph(gates: list) -> JumpGraph:
+        edges = [(a, b) for a, b in gates] + [(b, a) for a, b in gates]
+        security_statuses = {1: 1.0, 2: 0.9, 3: 0.5, 4: 0.7, 5: 0.4, 6: 0.1, 9: -0.5}
+        return JumpGraph(edges, security_statuses)
+
+    def setUp(self) -> None:
+        self.graph = self._create_graph(
+            [(1, 5), (5, 4), (1, 2), (2, 3), (3, 4), (1, 6), (6, 3), (9, 10)]
+        )
+
+    def test_should_find_shortest_route(self):
+        self.assertListEqual(self.graph.route(1, 4), [1, 5, 4])
+        self.assertEqual(self.graph.jumps(1, 4), 2)
+
+    def test_should_find_secure_route(self):
+        self.assertListEqual(self.graph.route(1, 4, flag="secure"), [1, 2, 3, 4])
+        self.assertEqual(self.graph.jumps(1, 4, flag="secure"), 3)
+
+    def test_should_find_insecure_route(self):
+        self.assertListEqual(self.graph.route(1, 3), [1, 2, 3])
+        self.assertListEqual(self.graph.route(1, 3, flag="insecure"), [1, 6, 3])
+
+    def test_should_return_route_to_same_system(self):
+        self.assertListEqual(self.graph.route(1, 1), [1])
+        self.assertEqual(self.graph.jumps(1, 1), 0)
+
+    def test_should_return_none_when_no_route_exists(self):
+        self.assertIsNone(self.graph.route(1, 9))
+        self.assertIsNone(self.graph.route(1, 9, flag="secure"))
+        self.assertIsNone(self.graph.jumps(1, 9))
+
+    def test_should_return_none_for_unknown_systems(self):
+        self.assertIsNone(self.graph.route(1, 99))
+        self.assertNotIn(99, self.graph)
+        self.assertIn(1, self.graph)
+        self.assertEqual(len(self.graph), 8)
+
+    def test_should_raise_error_for_invalid_flag(self):
+        with self.assertRaises(ValueError):
+            self.graph.route(1, 4, flag="invalid")
+
+    def test_should_calculate_jumps_from_origin(self):
+        self.assertDictEqual(
+            self.graph.jumps_from(1), {1: 0, 2: 1, 5: 1, 6: 1, 3: 2, 4: 2}
+        )
+
+    def test_should_calculate_jumps_from_origin_within_limit(self):
+        self.assertDictEqual(
+            self.graph.jumps_from(1, max_jumps=1), {1: 0, 2: 1, 5: 1, 6: 1}
+        )
+        self.assertDictEqual(self.graph.jumps_from(1, max_jumps=0), {1: 0})
+        self.assertDictEqual(self.graph.jumps_from(99), {})
+
+    def test_should_calculate_jumps_matrix(self):
+        self.assertDictEqual(
+            self.graph.jumps_matrix([1, 9], [1, 4, 10, 99]),
+            {
+                1: {1: 0, 4: 2, 10: None, 99: None},
+                9: {1: None, 4: None, 10: 1, 99: None},
+            },
+        )
+
+    def test_should_report_completeness(self):
+        self.assertTrue(self.graph.is_complete)
+        self.assertFalse(JumpGraph([(1, 2)]).is_complete)
+        self.assertFalse(JumpGraph([(1, 2), (2, 1), (2, None)]).is_complete)
+
+
+class TestCoordinateIndex(TestCase):
+    """Tests the pure Python implementation"""
+
+    numpy = None
+
+    def setUp(self) -> None:
+        patcher = patch("eveuniverse.core.coordinates.np", self.numpy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.index = CoordinateIndex(
+            {1: (0, 0, 0), 2: (3, 4, 0), 3: (0, 0, 1), 4: (10, 0, 0)}
+        )
+
+    def test_should_return_position(self):
+        self.assertEqual(self.index.position(2), (3.0, 4.0, 0.0))
+        self.assertIn(2, self.index)
+        self.assertNotIn(5, self.index)
+        self.assertEqual(len(self.index), 4)
+
+    def test_should_find_points_within_radius(self):
+        self.assertListEqual(
+            self.index.within((0, 0, 0), 5), [(1, 0.0), (3, 1.0), (2, 5.0)]
+        )
+        self.assertListEqual(self.index.within((100, 0, 0), 5), [])
+
+    def test_should_find_nearest_points(self):
+        self.assertListEqual(
+            self.index.nearest((9, 0, 0), 2), [(4, 1.0), (2, 7.211102550927978)]
+        )
+        self.assertEqual(len(self.index.nearest((9, 0, 0), 10)), 4)
+        self.assertListEqual(self.index.nearest((9, 0, 0), 0), [])
+
+    def test_should_calculate_distance_matrix(self):
+        self.assertDictEqual(
+            self.index.distance_matrix([1, 2, 5], [1, 4]),
+            {1: {1: 0.0, 4: 10.0}, 2: {1: 5.0, 4: 8.06225774829855}},
+        )
+
+
+@unittest.skipIf(numpy is None, "numpy not installed")
+class TestCoordinateIndexNumpy(TestCoordinateIndex):
+    """Tests the numpy implementation"""
+
+    numpy = numpy
+
+    def test_should_return_same_results_as_pure_python(self):
+        # given
+        rng = random.Random(42)
+        points = {
+            id: tuple(rng.uniform(-1e12, 1e12) for _ in range(3)) for id in range(200)
+        }
+        origin = (1e10, -2e10, 3e10)
+        numpy_index = CoordinateIndex(points)
+        with patch("eveuniverse.core.coordinates.np", None):
+            python_index = CoordinateIndex(points)
+            expected_within = python_index.within(origin, 8e11)
+            expected_nearest = python_index.nearest(origin, 10)
+            expected_matrix = python_index.distance_matrix(range(20), range(10, 30))
+        # when
+        within = numpy_index.within(origin, 8e11)
+        nearest = numpy_index.nearest(origin, 10)
+        matrix = numpy_index.distance_matrix(range(20), range(10, 30))
+        # then
+        self.assertListEqual(
+            [id for id, _ in within], [id for id, _ in expected_within]
+        )
+        for (_, distance), (_, expected) in zip(within, expected_within):
+            self.assertAlmostEqual(distance, expected, delta=1)
+        self.assertListEqual(
+            [id for id, _ in nearest], [id for id, _ in expected_nearest]
+        )
+        for id_a, distances in expected_matrix.items():
+            for id_b, expected in distances.items():
+                self.assertAlmostEqual(matrix[id_a][id_b], expected, delta=1)
+
+
+class TestKDTree(TestCase):
+    def test_should_find_nearest_point(self):
+        points = {
+            (x, y, z): (x * 10, y * 10, z * 10)
+            for x in range(-3, 4)
+            for y in range(-3, 4)
+            for z in range(-3, 4)
+        }
+        tree = KDTree(points)
+        self.assertEqual(len(tree), 343)
+        for point, expected in [
+            ((1, 1, 1), (0, 0, 0)),
+            ((14, -6, 26), (1, -1, 3)),
+            ((100, 100, 100), (3, 3, 3)),
+        ]:
+            key, distance = tree.nearest(point)
+            self.assertEqual(key, expected)
+            self.assertAlmostEqual(
+                distance,
+                math.sqrt(sum((a - b * 10) ** 2 for a, b in zip(point, expected))),
+            )
+
+    def test_should_return_none_when_empty(self):
+        self.assertIsNone(KDTree({}).nearest((1, 2, 3)))
@@ -1,4 +1,12 @@
-from ..helpers import EveEntityNameResolver, meters_to_au, meters_to_ly
+from ..helpers import (
+    EveEntityNameCollector,
+    EveEntityNameResolver,
+    ly_to_meters,
+    meters_to_au,
+    meters_to_ly,
+)
+from ..managers import _entity_names_cache
+from ..models import EveEntity
 from ..utils import NoSocketsTestCase
 
 
@@ -9,6 +17,11 @@ class TestHelpers(NoSocketsTestCase):
         with self.assertRaises(ValueError):
             meters_to_ly("invalid")
 
+    def test_ly_to_meters(self):
+        self.assertEqual(ly_to_meters(1), 9_460_730_472_580_800)
+        self.assertEqual(ly_to_meters(0), 0)
+        self.assertIsNone(ly_to_meters(None))
+
     def test_meters_to_au(self):
         self.assertEqual(meters_to_au(149_597_870_691), 1)
         self.assertEqual(meters_to_au(0), 0)
@@ -21,3 +34,32 @@ class TestEveEntityNameResolver(NoSocketsTestCase):
         resolver = EveEntityNameResolver({1: "alpha", 2: "bravo", 3: "charlie"})
         self.assertEqual(resolver.to_name(2), "bravo")
         self.assertEqual(resolver.to_name(4), "")
+
+
+class TestEveEntityNameCollector(NoSocketsTestCase):
+    def setUp(self) -> None:
+        _entity_names_cache.clear()
+        EveEntity.objects.all().delete()
+        EveEntity.objects.create(id=1001, name="Bruce Wayne")
+        EveEntity.objects.create(id=1002, name="<Peter Parker>")
+
+    def test_should_replace_placeholders_with_names(self):
+        # given
+        with EveEntityNameCollector() as collector:
+            content = f"{collector.placeholder(1001)} & {collector.placeholder(1002)}"
+        # when
+        with self.assertNumQueries(1):
+            result = collector.resolve(content)
+        # then
+        self.assertEqual(result, "Bruce Wayne & &lt;Peter Parker&gt;")
+
+    def test_should_not_escape_names_when_requested(self):
+        with EveEntityNameCollector() as collector:
+            content = collector.placeholder(1002)
+        self.assertEqual(collector.resolve(content, autoescape=False), "<Peter Parker>")
+
+    def test_should_only_be_active_within_context(self):
+        self.assertIsNone(EveEntityNameCollector.current())
+        with EveEntityNameCollector() as collector:
+            self.assertIs(EveEntityNameCollector.current(), collector)
+        self.assertIsNone(EveEntityNameCollector.current())
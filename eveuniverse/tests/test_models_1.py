@@ -1,13 +1,23 @@
+import asyncio
 import datetime as dt
+import threading
+import time
 import unittest
 from unittest.mock import Mock, patch
 
+from asgiref.sync import async_to_sync
 from bravado.exception import HTTPNotFound
 
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 
+from ..core.jumpgraph import JumpGraph
 from ..helpers import meters_to_ly
 from ..models import (
+    EsiEtag,
     EveAncestry,
     EveAsteroidBelt,
     EveBloodline,
@@ -22,6 +32,7 @@ from ..models import (
     EveGroup,
     EveMarketGroup,
     EveMarketPrice,
+    EveMarketPriceHistory,
     EveMoon,
     EvePlanet,
     EveRace,
@@ -195,6 +206,22 @@ class TestEveCategory(NoSocketsTestCase):
         self.assertEqual(obj.name, "Ship")
         self.assertTrue(obj.published)
 
+    @patch(MANAGERS_PATH + ".EVEUNIVERSE_TASKS_CHUNK_SIZE", 1)
+    @patch("eveuniverse.tasks.update_or_create_eve_objects")
+    def test_should_load_children_in_chunked_tasks(self, mock_task, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        # when
+        EveCategory.objects.update_or_create_esi(
+            id=6, include_children=True, wait_for_children=False
+        )
+        # then
+        self.assertEqual(mock_task.delay.call_count, 2)
+        self.assertListEqual(
+            [call[0] for call in mock_task.delay.call_args_list],
+            [("EveGroup", [25]), ("EveGroup", [26])],
+        )
+
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_GRAPHICS", False)
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", False)
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_MARKET_GROUPS", False)
@@ -236,6 +263,480 @@ class TestBulkGetOrCreateEsi(NoSocketsTestCase):
         result = EveCategory.objects.bulk_get_or_create_esi(ids=[2, 3])
         self.assertEqual({x.id for x in result}, {2, 3})
 
+    def test_can_filter_stale_objects(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.bulk_get_or_create_esi(ids=[2, 3])
+        EveCategory.objects.filter(id=2).update(
+            last_updated=now() - dt.timedelta(hours=2)
+        )
+
+        result = EveCategory.objects.filter_stale(dt.timedelta(hours=1))
+        self.assertEqual({x.id for x in result}, {2})
+
+    def test_can_load_list_only_objects_with_one_request(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        with patch.object(
+            EveRace.objects, "_fetch_from_esi", wraps=EveRace.objects._fetch_from_esi
+        ) as spy:
+            result = EveRace.objects.bulk_update_or_create_esi(ids=[1, 8])
+        self.assertEqual({x.id for x in result}, {1, 8})
+        self.assertEqual(spy.call_count, 1)
+
+    def test_can_load_all_from_esi_serially(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        result = EveCategory.objects.bulk_get_or_create_esi(ids=[2, 3], max_workers=1)
+        self.assertEqual({x.id for x in result}, {2, 3})
+
+    def test_should_raise_exception_when_one_request_fails(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        with self.assertRaises(KeyError):
+            EveCategory.objects.bulk_get_or_create_esi(ids=[2, 3, 99])
+
+    def test_should_update_existing_objects(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.create(id=2, name="Dummy", published=False)
+
+        result = EveCategory.objects.bulk_update_or_create_esi(ids=[2, 3])
+        self.assertEqual({x.id for x in result}, {2, 3})
+        self.assertEqual(EveCategory.objects.get(id=2).name, "Celestial")
+
+    def test_should_write_new_objects_in_one_statement(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        with CaptureQueriesContext(connection) as context:
+            EveCategory.objects.bulk_update_or_create_esi(ids=[2, 3])
+        inserts = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "eveuniverse_evecategory"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(set(EveCategory.objects.values_list("id", flat=True)), {2, 3})
+
+    def test_should_link_stargates_created_in_same_batch(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        EveStargate.objects.bulk_get_or_create_esi(ids=[50016284, 50016283])
+        akidagi = EveStargate.objects.get(id=50016284)
+        enaluri = EveStargate.objects.get(id=50016283)
+        self.assertEqual(enaluri.destination_eve_stargate, akidagi)
+        self.assertEqual(akidagi.destination_eve_stargate, enaluri)
+
+
+@patch(MANAGERS_PATH + ".esi")
+class TestAsyncEsiMethods(TestCase):  # event loops need sockets
+    def test_can_get_or_create_object(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        obj, created = async_to_sync(EveCategory.objects.aget_or_create_esi)(id=6)
+        self.assertTrue(created)
+        self.assertEqual(obj.name, "Ship")
+
+        obj, created = async_to_sync(EveCategory.objects.aget_or_create_esi)(id=6)
+        self.assertFalse(created)
+        self.assertEqual(obj.id, 6)
+
+    def test_can_update_object(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.create(id=6, name="Dummy", published=False)
+
+        obj, created = async_to_sync(EveCategory.objects.aupdate_or_create_esi)(id=6)
+        self.assertFalse(created)
+        self.assertEqual(obj.name, "Ship")
+
+    def test_should_raise_exception_when_object_not_found(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        with self.assertRaises(HTTPNotFound):
+            async_to_sync(EveAncestry.objects.aupdate_or_create_esi)(id=1)
+
+    def test_can_get_or_create_objects_in_bulk(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.get_or_create_esi(id=2)
+
+        result = async_to_sync(EveCategory.objects.abulk_get_or_create_esi)(
+            ids=[2, 3], max_workers=2
+        )
+        self.assertEqual({obj.id for obj in result}, {2, 3})
+        self.assertTrue(EveCategory.objects.filter(id=3).exists())
+
+    def test_should_request_esi_in_dedicated_threads(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        fetch = EveCategory.objects._fetch_eve_data_obj_with_etag
+        thread_names = []
+
+        def record_thread(**kwargs):
+            thread_names.append(threading.current_thread().name)
+            return fetch(**kwargs)
+
+        with patch.object(
+            EveCategory.objects,
+            "_fetch_eve_data_obj_with_etag",
+            side_effect=record_thread,
+        ):
+            async_to_sync(EveCategory.objects.abulk_get_or_create_esi)(ids=[2, 3])
+
+        self.assertEqual(len(thread_names), 2)
+        for name in thread_names:
+            self.assertTrue(name.startswith("eveuniverse_esi"))
+
+    def test_should_coalesce_concurrent_requests_for_same_object(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        fetch = EveCategory.objects._fetch_eve_data_obj_with_etag
+
+        def slow_fetch(**kwargs):
+            time.sleep(0.2)
+            return fetch(**kwargs)
+
+        async def update_twice():
+            return await asyncio.gather(
+                EveCategory.objects.aupdate_or_create_esi(id=6),
+                EveCategory.objects.aupdate_or_create_esi(id=6),
+            )
+
+        with patch.object(
+            EveCategory.objects, "_fetch_eve_data_obj_with_etag", side_effect=slow_fetch
+        ) as spy:
+            results = async_to_sync(update_twice)()
+
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual([obj.name for obj, _ in results], ["Ship", "Ship"])
+
+
+@patch(MANAGERS_PATH + ".esi")
+class TestUpdateOrCreateEsiCoalescing(NoSocketsTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_should_return_object_from_db_when_result_was_shared(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.create(id=6, name="Ship", published=True)
+        with patch(MANAGERS_PATH + "._esi_single_flight") as mock_single_flight:
+            mock_single_flight.do.return_value = ((Mock(), True), True)
+            # when
+            obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertFalse(created)
+        self.assertEqual(obj, EveCategory.objects.get(id=6))
+
+    def test_should_fetch_object_when_shared_result_is_not_yet_visible(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        with patch(MANAGERS_PATH + "._esi_single_flight") as mock_single_flight:
+            mock_single_flight.do.return_value = ((Mock(), True), True)
+            # when
+            obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertTrue(created)
+        self.assertEqual(obj.name, "Ship")
+
+    def test_should_not_coalesce_calls_with_different_children_flags(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        with patch(MANAGERS_PATH + "._esi_single_flight") as mock_single_flight:
+            mock_single_flight.do.return_value = ((Mock(), True), False)
+            # when
+            EveCategory.objects.update_or_create_esi(id=6)
+            EveCategory.objects.update_or_create_esi(id=6, include_children=True)
+            EveCategory.objects.update_or_create_esi(id=6, wait_for_children=False)
+        # then
+        keys = {call[0][0] for call in mock_single_flight.do.call_args_list}
+        self.assertEqual(len(keys), 3)
+
+    @patch(MANAGERS_PATH + ".EVEUNIVERSE_SINGLE_FLIGHT_USE_CACHE_LOCK", True)
+    def test_should_release_cache_lock_after_fetching(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        # when
+        obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertTrue(created)
+        self.assertEqual(obj.name, "Ship")
+        self.assertIsNone(
+            cache.get(
+                "EVEUNIVERSE_UPDATE_OR_CREATE_ESI_LOCK_eveuniverse.EveCategory_6__0_1"
+            )
+        )
+
+    @patch(MANAGERS_PATH + ".EVEUNIVERSE_SINGLE_FLIGHT_LOCK_TIMEOUT", 0)
+    @patch(MANAGERS_PATH + ".EVEUNIVERSE_SINGLE_FLIGHT_USE_CACHE_LOCK", True)
+    def test_should_use_object_fetched_by_other_process(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.create(id=6, name="Dummy", published=True)
+        cache.add(
+            "EVEUNIVERSE_UPDATE_OR_CREATE_ESI_LOCK_eveuniverse.EveCategory_6__0_1", 1
+        )
+        # when
+        obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertFalse(created)
+        self.assertEqual(obj.name, "Dummy")
+
+    @patch(MANAGERS_PATH + ".EVEUNIVERSE_SINGLE_FLIGHT_LOCK_TIMEOUT", 0)
+    @patch(MANAGERS_PATH + ".EVEUNIVERSE_SINGLE_FLIGHT_USE_CACHE_LOCK", True)
+    def test_should_fetch_object_when_other_process_failed(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        cache.add(
+            "EVEUNIVERSE_UPDATE_OR_CREATE_ESI_LOCK_eveuniverse.EveCategory_6__0_1", 1
+        )
+        # when
+        obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertTrue(created)
+        self.assertEqual(obj.name, "Ship")
+
+
+@patch(MANAGERS_PATH + ".EVEUNIVERSE_USE_ESI_ETAGS", True)
+@patch(MANAGERS_PATH + ".esi")
+class TestEsiEtags(NoSocketsTestCase):
+    def test_should_store_etag_when_creating_object(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        # when
+        EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertTrue(
+            EsiEtag.objects.filter(model_name="EveCategory", object_id=6).exists()
+        )
+
+    def test_should_only_renew_timestamp_when_object_not_changed(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.update_or_create_esi(id=6)
+        last_updated = now() - dt.timedelta(days=1)
+        EveCategory.objects.filter(id=6).update(name="xxx", last_updated=last_updated)
+        # when
+        obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertFalse(created)
+        self.assertEqual(obj.name, "xxx")
+        self.assertGreater(obj.last_updated, last_updated)
+
+    def test_should_update_object_when_etag_has_changed(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.update_or_create_esi(id=6)
+        EveCategory.objects.filter(id=6).update(name="xxx")
+        EsiEtag.objects.filter(model_name="EveCategory", object_id=6).update(
+            etag="outdated"
+        )
+        # when
+        obj, _ = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertEqual(obj.name, "Ship")
+
+    def test_should_fetch_full_object_when_it_does_not_exist(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.update_or_create_esi(id=6)
+        EveCategory.objects.all().delete()
+        # when
+        obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertTrue(created)
+        self.assertEqual(obj.name, "Ship")
+
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", False)
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_MARKET_GROUPS", False)
+    def test_should_fetch_full_object_when_sections_are_missing(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveType.objects.update_or_create_esi(id=603)
+        # when
+        obj, _ = EveType.objects.update_or_create_esi(
+            id=603, enabled_sections=[EveType.Section.DOGMAS]
+        )
+        # then
+        self.assertTrue(obj.enabled_sections.dogmas)
+        self.assertTrue(obj.dogma_attributes.exists())
+
+    def test_should_only_renew_timestamp_of_unchanged_objects_in_bulk(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.bulk_update_or_create_esi(ids=[2, 3])
+        EveCategory.objects.update(name="xxx")
+        EsiEtag.objects.filter(model_name="EveCategory", object_id=3).delete()
+        # when
+        EveCategory.objects.bulk_update_or_create_esi(ids=[2, 3])
+        # then
+        self.assertEqual(EveCategory.objects.get(id=2).name, "xxx")
+        self.assertEqual(EveCategory.objects.get(id=3).name, "Station")
+
+    def test_should_not_use_etags_for_list_only_endpoints(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        # when
+        EveRace.objects.update_or_create_esi(id=1)
+        # then
+        self.assertFalse(EsiEtag.objects.exists())
+
+    def test_should_not_use_etags_when_disabled(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        with patch(MANAGERS_PATH + ".EVEUNIVERSE_USE_ESI_ETAGS", False):
+            EveCategory.objects.update_or_create_esi(id=6)
+            EveCategory.objects.filter(id=6).update(name="xxx")
+            # when
+            obj, _ = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertEqual(obj.name, "Ship")
+        self.assertFalse(EsiEtag.objects.exists())
+
+
+@patch(MANAGERS_PATH + ".EVEUNIVERSE_WRITE_CHANGES_ONLY", True)
+@patch(MANAGERS_PATH + ".esi")
+class TestWriteChangesOnly(NoSocketsTestCase):
+    def test_should_create_new_object(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        # when
+        obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertTrue(created)
+        self.assertEqual(obj.name, "Ship")
+
+    def test_should_only_renew_last_updated_of_unchanged_object(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.update_or_create_esi(id=6)
+        last_updated = now() - dt.timedelta(days=1)
+        EveCategory.objects.filter(id=6).update(last_updated=last_updated)
+        # when
+        with CaptureQueriesContext(connection) as context:
+            obj, created = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        self.assertFalse(created)
+        self.assertGreater(obj.last_updated, last_updated)
+        update_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if "UPDATE" in query["sql"]
+        ]
+        self.assertEqual(len(update_queries), 1)
+        self.assertIn('"last_updated"', update_queries[0])
+        self.assertNotIn('"name"', update_queries[0])
+        self.assertFalse(
+            EveCategory.objects.filter_stale(dt.timedelta(hours=1)).exists()
+        )
+
+    def test_should_only_write_changed_fields(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.update_or_create_esi(id=6)
+        last_updated = now() - dt.timedelta(days=1)
+        EveCategory.objects.filter(id=6).update(name="xxx", last_updated=last_updated)
+        # when
+        with CaptureQueriesContext(connection) as context:
+            obj, _ = EveCategory.objects.update_or_create_esi(id=6)
+        # then
+        obj.refresh_from_db()
+        self.assertEqual(obj.name, "Ship")
+        self.assertGreater(obj.last_updated, last_updated)
+        update_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if "UPDATE" in query["sql"]
+        ]
+        self.assertEqual(len(update_queries), 1)
+        self.assertIn('"name"', update_queries[0])
+        self.assertNotIn('"published"', update_queries[0])
+
+    def test_should_only_write_changed_objects_in_bulk(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveRace.objects.bulk_update_or_create_esi(ids=[1, 8])
+        last_updated = now() - dt.timedelta(days=1)
+        EveRace.objects.update(last_updated=last_updated)
+        EveRace.objects.filter(id=1).update(name="xxx")
+        # when
+        EveRace.objects.bulk_update_or_create_esi(ids=[1, 8])
+        # then
+        race_1 = EveRace.objects.get(id=1)
+        self.assertEqual(race_1.name, "Caldari")
+        self.assertGreater(race_1.last_updated, last_updated)
+        race_8 = EveRace.objects.get(id=8)
+        self.assertGreater(race_8.last_updated, last_updated)
+        self.assertFalse(EveRace.objects.filter_stale(dt.timedelta(hours=1)).exists())
+
+    def test_should_renew_last_updated_of_unchanged_objects_in_one_query(
+        self, mock_esi
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveRace.objects.bulk_update_or_create_esi(ids=[1, 8])
+        EveRace.objects.update(last_updated=now() - dt.timedelta(days=1))
+        # when
+        with CaptureQueriesContext(connection) as context:
+            EveRace.objects.bulk_update_or_create_esi(ids=[1, 8])
+        # then
+        update_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(update_queries), 1)
+        self.assertNotIn('"name"', update_queries[0])
+        self.assertFalse(EveRace.objects.filter_stale(dt.timedelta(hours=1)).exists())
+
+
+@patch(MANAGERS_PATH + ".esi")
+class TestBulkDefaultsFromEsiObjs(NoSocketsTestCase):
+    def test_should_resolve_existing_parents_with_one_query(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.get_or_create_esi(id=6)
+        eve_data_objs = [
+            {"group_id": 25, "category_id": 6, "name": "Frigate", "published": True},
+            {"group_id": 26, "category_id": 6, "name": "Cruiser", "published": True},
+        ]
+
+        with self.assertNumQueries(1):
+            result = EveGroup.objects._bulk_defaults_from_esi_objs(eve_data_objs)
+
+        category = EveCategory.objects.get(id=6)
+        self.assertListEqual(
+            result,
+            [
+                {"eve_category": category, "name": "Frigate", "published": True},
+                {"eve_category": category, "name": "Cruiser", "published": True},
+            ],
+        )
+
+    def test_should_create_missing_parents(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        eve_data_objs = [
+            {"group_id": 25, "category_id": 6, "name": "Frigate", "published": True},
+            {"group_id": 1404, "category_id": 65, "name": "X", "published": True},
+        ]
+
+        result = EveGroup.objects._bulk_defaults_from_esi_objs(eve_data_objs)
+
+        self.assertEqual(result[0]["eve_category"], EveCategory.objects.get(id=6))
+        self.assertEqual(result[1]["eve_category"], EveCategory.objects.get(id=65))
+
+    def test_should_not_create_parents_when_disabled(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        eve_data_objs = [
+            {
+                "stargate_id": 50016284,
+                "destination": {"stargate_id": 50016283, "system_id": 30045342},
+                "name": "Stargate (Akidagi)",
+                "system_id": 30045339,
+                "type_id": 16,
+            }
+        ]
+
+        result = EveStargate.objects._bulk_defaults_from_esi_objs(eve_data_objs)
+
+        self.assertIsNone(result[0]["destination_eve_stargate"])
+        self.assertIsNone(result[0]["destination_eve_solar_system"])
+        self.assertFalse(EveStargate.objects.filter(id=50016283).exists())
+
 
 @patch(MANAGERS_PATH + ".esi")
 class TestEveConstellation(NoSocketsTestCase):
@@ -475,6 +976,97 @@ class TestEveMarketPriceManager(NoSocketsTestCase):
         self.assertEqual(float(obj.market_price.adjusted_price), 306988.09)
         self.assertEqual(float(obj.market_price.average_price), 306292.67)
 
+    def test_should_update_stale_prices_without_deleting(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        mocked_update_at = now() - dt.timedelta(minutes=65)
+        with patch("django.utils.timezone.now", Mock(return_value=mocked_update_at)):
+            EveMarketPrice.objects.create(
+                eve_type=EveType.objects.get(id=603),
+                adjusted_price=306988.09,
+                average_price=306292.67,
+            )
+        # when
+        with CaptureQueriesContext(connection) as context:
+            result = EveMarketPrice.objects.update_from_esi(minutes_until_stale=60)
+        # then
+        self.assertEqual(result, 1)
+        self.assertFalse(
+            [query for query in context.captured_queries if "DELETE" in query["sql"]]
+        )
+        obj = EveMarketPrice.objects.get(eve_type_id=603)
+        self.assertGreater(obj.updated_at, now() - dt.timedelta(minutes=1))
+
+    def test_should_store_price_history(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        # when
+        EveMarketPrice.objects.update_from_esi()
+        # then
+        obj = EveMarketPriceHistory.objects.get(eve_type_id=603)
+        self.assertEqual(obj.date, now().date())
+        self.assertEqual(obj.adjusted_price, 306988.09)
+        self.assertEqual(obj.average_price, 306292.67)
+
+    def test_should_store_price_history_only_once_per_day(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveMarketPriceHistory.objects.create(
+            eve_type_id=603, date=now().date(), adjusted_price=2, average_price=3
+        )
+        # when
+        EveMarketPrice.objects.update_from_esi()
+        # then
+        obj = EveMarketPriceHistory.objects.get(eve_type_id=603)
+        self.assertEqual(obj.average_price, 3)
+
+
+class TestEveMarketPriceHistoryManager(NoSocketsTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        with patch("eveuniverse.managers.esi") as mock_esi:
+            mock_esi.client = EsiClientStub()
+            EveType.objects.get_or_create_esi(id=603)
+
+    def setUp(self) -> None:
+        self.today = dt.date(2021, 4, 30)
+        for days_ago, price in ((40, 500), (20, 100), (10, 150), (0, 200)):
+            EveMarketPriceHistory.objects.create(
+                eve_type_id=603,
+                date=self.today - dt.timedelta(days=days_ago),
+                adjusted_price=price / 2,
+                average_price=price,
+            )
+
+    def test_should_calculate_moving_averages(self):
+        result = EveMarketPriceHistory.objects.moving_averages(
+            [603, 604], days=30, until=self.today
+        )
+        self.assertDictEqual(result, {603: 150, 604: None})
+
+    def test_should_calculate_moving_averages_for_other_field(self):
+        result = EveMarketPriceHistory.objects.moving_averages(
+            [603], days=15, field="adjusted_price", until=self.today
+        )
+        self.assertDictEqual(result, {603: 87.5})
+
+    def test_should_calculate_percent_changes(self):
+        result = EveMarketPriceHistory.objects.percent_changes(
+            [603, 604], days=30, until=self.today
+        )
+        self.assertDictEqual(result, {603: 100.0, 604: None})
+
+    def test_should_calculate_percent_changes_with_one_price_as_none(self):
+        result = EveMarketPriceHistory.objects.percent_changes(
+            [603], days=5, until=self.today
+        )
+        self.assertDictEqual(result, {603: None})
+
+    def test_should_raise_error_for_invalid_field(self):
+        with self.assertRaises(ValueError):
+            EveMarketPriceHistory.objects.moving_averages([603], field="invalid")
+
 
 @patch(MANAGERS_PATH + ".esi")
 class TestEveMoon(NoSocketsTestCase):
@@ -634,6 +1226,49 @@ class TestEveRace(NoSocketsTestCase):
         self.assertTrue(EveRace.objects.filter(id=1).exists())
         self.assertTrue(EveRace.objects.filter(id=8).exists())
 
+    def test_update_all_from_esi(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        mocked_update_at = now() - dt.timedelta(minutes=65)
+        with patch("django.utils.timezone.now", Mock(return_value=mocked_update_at)):
+            EveRace.objects.create(id=1, name="Dummy", alliance_id=1, description="")
+
+        EveRace.objects.update_or_create_all_esi()
+        obj = EveRace.objects.get(id=1)
+        self.assertEqual(obj.name, "Caldari")
+        self.assertEqual(obj.alliance_id, 500001)
+        self.assertGreater(obj.last_updated, mocked_update_at)
+        self.assertTrue(EveRace.objects.filter(id=8).exists())
+
+    def test_update_all_from_esi_should_only_renew_last_updated_of_unchanged(
+        self, mock_esi
+    ):
+        mock_esi.client = EsiClientStub()
+        EveRace.objects.update_or_create_all_esi()
+        last_updated = now() - dt.timedelta(days=1)
+        EveRace.objects.update(last_updated=last_updated)
+        values_before = list(
+            EveRace.objects.order_by("id").values_list("id", "name", "description")
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            EveRace.objects.update_or_create_all_esi()
+
+        for obj in EveRace.objects.all():
+            self.assertGreater(obj.last_updated, last_updated)
+        self.assertListEqual(
+            list(
+                EveRace.objects.order_by("id").values_list("id", "name", "description")
+            ),
+            values_before,
+        )
+        update_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(update_queries), 1)
+        self.assertNotIn('"name"', update_queries[0])
+
 
 @patch(MANAGERS_PATH + ".esi")
 class TestEveRegion(NoSocketsTestCase):
@@ -653,6 +1288,21 @@ class TestEveRegion(NoSocketsTestCase):
         self.assertTrue(EveRegion.objects.filter(id=10000002).exists())
         self.assertTrue(EveRegion.objects.filter(id=10000069).exists())
 
+    @patch(MANAGERS_PATH + ".EVEUNIVERSE_TASKS_CHUNK_SIZE", 3)
+    @patch("eveuniverse.tasks.update_or_create_eve_objects")
+    def test_create_all_from_esi_in_chunked_tasks(self, mock_task, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        EveRegion.objects.update_or_create_all_esi(wait_for_children=False)
+        self.assertEqual(mock_task.delay.call_count, 2)
+        ids = [
+            id
+            for call in mock_task.delay.call_args_list
+            for id in call[1]["ids"]
+            if call[1]["model_name"] == "EveRegion"
+        ]
+        self.assertSetEqual(set(ids), {10000002, 10000014, 10000069, 11000031})
+
 
 @patch(MANAGERS_PATH + ".esi")
 class TestEveSolarSystem(NoSocketsTestCase):
@@ -729,6 +1379,36 @@ class TestEveSolarSystem(NoSocketsTestCase):
         akidagi, _ = EveSolarSystem.objects.get_or_create_esi(id=30045342)
         self.assertEqual(meters_to_ly(enaluri.distance_to(akidagi)), 1.947802326920925)
 
+    def test_should_find_systems_within_light_years(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        for id in [30000142, 30045339, 30045342, 31000005]:
+            EveSolarSystem.objects.get_or_create_esi(id=id)
+
+        result = EveSolarSystem.objects.within_light_years(30045339, 2)
+        self.assertListEqual(list(result.keys()), [30045339, 30045342])
+        self.assertAlmostEqual(result[30045342], 1.947802326920925)
+        self.assertDictEqual(EveSolarSystem.objects.within_light_years(31000005, 2), {})
+
+    def test_should_find_nearest_systems_by_light_years(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        for id in [30000142, 30045339, 30045342, 31000005]:
+            EveSolarSystem.objects.get_or_create_esi(id=id)
+
+        result = EveSolarSystem.objects.nearest_by_light_years(30045339, 2)
+        self.assertListEqual(list(result.keys()), [30045342, 30000142])
+
+    def test_should_calculate_light_years_matrix(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        akidagi, _ = EveSolarSystem.objects.get_or_create_esi(id=30045342)
+        thera, _ = EveSolarSystem.objects.get_or_create_esi(id=31000005)
+
+        result = EveSolarSystem.objects.light_years_matrix([enaluri, akidagi, thera])
+        self.assertAlmostEqual(result[30045339][30045342], 1.947802326920925)
+        self.assertEqual(result[30045342][30045342], 0)
+        self.assertIsNone(result[30045339][31000005])
+        self.assertIsNone(result[31000005][31000005])
+
     def test_can_identify_highsec_system(self, mock_esi):
         mock_esi.client = EsiClientStub()
 
@@ -797,6 +1477,140 @@ class TestEveSolarSystem(NoSocketsTestCase):
         jita, _ = EveSolarSystem.objects.get_or_create_esi(id=30000142)
         self.assertIsNone(enaluri.jumps_to(jita))
 
+    @patch("eveuniverse.models.esi")
+    def test_can_calculate_route_with_esi(self, mock_esi_2, mock_esi):
+        mock_esi.client = EsiClientStub()
+        mock_esi_2.client.Routes.get_route_origin_destination.side_effect = (
+            self.esi_get_route_origin_destination
+        )
+
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        akidagi, _ = EveSolarSystem.objects.get_or_create_esi(id=30045342)
+        self.assertListEqual(enaluri.route_to(akidagi), [enaluri, akidagi])
+
+    @patch("eveuniverse.models.esi")
+    def test_can_calculate_route_locally(self, mock_esi_2, mock_esi):
+        mock_esi.client = EsiClientStub()
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        akidagi, _ = EveSolarSystem.objects.get_or_create_esi(id=30045342)
+        jump_graph = JumpGraph([(30045339, 30045342), (30045342, 30045339)])
+
+        with patch.object(
+            EveSolarSystem.objects.__class__, "jump_graph", return_value=jump_graph
+        ):
+            self.assertListEqual(enaluri.route_to(akidagi), [enaluri, akidagi])
+            self.assertEqual(enaluri.jumps_to(akidagi, flag="secure"), 1)
+        self.assertFalse(mock_esi_2.client.Routes.get_route_origin_destination.called)
+
+    def test_should_calculate_jumps_matrix(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        jump_graph = JumpGraph(
+            [
+                (30045339, 30045342),
+                (30045342, 30045339),
+                (30045342, 30045344),
+                (30045344, 30045342),
+            ]
+        )
+
+        with patch.object(
+            EveSolarSystem.objects.__class__, "jump_graph", return_value=jump_graph
+        ):
+            self.assertDictEqual(
+                EveSolarSystem.objects.jumps_matrix([enaluri, 30045342]),
+                {
+                    30045339: {30045339: 0, 30045342: 1},
+                    30045342: {30045339: 1, 30045342: 0},
+                },
+            )
+            self.assertDictEqual(
+                EveSolarSystem.objects.jumps_matrix([enaluri], [30045344]),
+                {30045339: {30045344: 2}},
+            )
+
+    def test_should_find_systems_within_jumps(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        jump_graph = JumpGraph(
+            [
+                (30045339, 30045342),
+                (30045342, 30045339),
+                (30045342, 30045344),
+                (30045344, 30045342),
+            ]
+        )
+
+        with patch.object(
+            EveSolarSystem.objects.__class__, "jump_graph", return_value=jump_graph
+        ):
+            self.assertDictEqual(
+                EveSolarSystem.objects.systems_within_jumps(enaluri, 1),
+                {30045339: 0, 30045342: 1},
+            )
+
+    @patch("eveuniverse.models.esi")
+    def test_should_calculate_jumps_matrix_with_esi_when_graph_incomplete(
+        self, mock_esi_2, mock_esi
+    ):
+        mock_esi.client = EsiClientStub()
+        mock_esi_2.client.Routes.get_route_origin_destination.side_effect = (
+            self.esi_get_route_origin_destination
+        )
+        jump_graph = JumpGraph([(30045339, 30045342), (30045342, 30045344)])
+        self.assertFalse(jump_graph.is_complete)
+
+        with patch.object(
+            EveSolarSystem.objects.__class__, "jump_graph", return_value=jump_graph
+        ):
+            self.assertDictEqual(
+                EveSolarSystem.objects.jumps_matrix([30045339], [30045339, 30045342]),
+                {30045339: {30045339: 0, 30045342: 1}},
+            )
+            self.assertDictEqual(
+                EveSolarSystem.objects.jumps_matrix([30045339], [30045344]),
+                {30045339: {30045344: None}},
+            )
+        self.assertTrue(mock_esi_2.client.Routes.get_route_origin_destination.called)
+
+    def test_should_not_find_systems_within_jumps_when_graph_incomplete(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        jump_graph = JumpGraph([(30045339, 30045342), (30045342, 30045344)])
+
+        with patch.object(
+            EveSolarSystem.objects.__class__, "jump_graph", return_value=jump_graph
+        ):
+            with self.assertRaises(ValueError):
+                EveSolarSystem.objects.systems_within_jumps(30045339, 1)
+
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_STARGATES", True)
+    def test_should_build_jump_graph_from_stargates(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveSolarSystem.objects.get_or_create_esi(id=30045339, include_children=True)
+        EveSolarSystem.objects.get_or_create_esi(id=30045342, include_children=True)
+        # when
+        jump_graph = EveSolarSystem.objects.jump_graph()
+        # then
+        self.assertIn(30045339, jump_graph)
+        self.assertEqual(jump_graph.jumps(30045339, 30045342), 1)
+        self.assertFalse(jump_graph.is_complete)
+        self.assertIs(EveSolarSystem.objects.jump_graph(), jump_graph)
+
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_STARGATES", True)
+    def test_should_rebuild_jump_graph_when_stargates_changed(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveSolarSystem.objects.get_or_create_esi(id=30045339, include_children=True)
+        EveSolarSystem.objects.get_or_create_esi(id=30045342, include_children=True)
+        jump_graph = EveSolarSystem.objects.jump_graph()
+        # when
+        EveStargate.objects.filter(eve_solar_system_id=30045339).delete()
+        # then
+        new_jump_graph = EveSolarSystem.objects.jump_graph()
+        self.assertIsNot(new_jump_graph, jump_graph)
+        self.assertIsNone(new_jump_graph.jumps(30045339, 30045342))
+
     """
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_STARGATES", True)
     @patch(MODELS_PATH + ".cache")
@@ -1,13 +1,20 @@
+import datetime as dt
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
+from asgiref.sync import async_to_sync
+
+from django.core.cache import cache
+from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils.timezone import now
 
 from ..constants import (
     EVE_CATEGORY_ID_BLUEPRINT,
     EVE_CATEGORY_ID_SKIN,
     EVE_CATEGORY_ID_STRUCTURE,
 )
+from ..managers import EveEntityQuerySet, _entity_names_cache
 from ..models import (
     EsiMapping,
     EveAncestry,
@@ -17,9 +24,12 @@ from ..models import (
     EveDogmaAttribute,
     EveDogmaEffect,
     EveEntity,
+    EveEntityInvalidId,
+    EveFaction,
     EveGraphic,
     EveGroup,
     EveMarketGroup,
+    EveRace,
     EveRegion,
     EveType,
     EveTypeDogmaEffect,
@@ -89,6 +99,58 @@ class TestEveType(NoSocketsTestCase):
         ).first()
         self.assertTrue(dogma_effect_2.is_default)
 
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", True)
+    def test_should_update_changed_dogmas_from_esi(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        eve_type, _ = EveType.objects.get_or_create_esi(id=603)
+        eve_type.dogma_attributes.filter(eve_dogma_attribute_id=588).update(value=99)
+        eve_type.dogma_effects.filter(eve_dogma_effect_id=1817).update(is_default=False)
+        # when
+        EveType.objects.update_or_create_esi(id=603)
+        # then
+        self.assertEqual(
+            eve_type.dogma_attributes.get(eve_dogma_attribute_id=588).value, 5
+        )
+        self.assertTrue(eve_type.dogma_effects.get(eve_dogma_effect_id=1817).is_default)
+
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", True)
+    def test_should_remove_obsolete_dogmas(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        eve_type, _ = EveType.objects.get_or_create_esi(id=603)
+        obsolete_attribute, _ = EveDogmaAttribute.objects.get_or_create_esi(id=271)
+        eve_type.dogma_attributes.create(
+            eve_dogma_attribute=obsolete_attribute, value=1
+        )
+        # when
+        EveType.objects.update_or_create_esi(id=603)
+        # then
+        self.assertSetEqual(
+            set(
+                eve_type.dogma_attributes.values_list(
+                    "eve_dogma_attribute_id", flat=True
+                )
+            ),
+            {588, 129},
+        )
+
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", True)
+    def test_should_not_write_unchanged_dogmas(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveType.objects.get_or_create_esi(id=603)
+        # when
+        with patch(
+            MANAGERS_PATH + ".models.QuerySet.bulk_update"
+        ) as mock_bulk_update, patch(
+            MANAGERS_PATH + ".models.QuerySet.bulk_create"
+        ) as mock_bulk_create:
+            EveType.objects.update_or_create_esi(id=603)
+        # then
+        self.assertFalse(mock_bulk_update.called)
+        self.assertFalse(mock_bulk_create.called)
+
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_MARKET_GROUPS", True)
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", False)
     def test_when_disabled_can_create_type_from_esi_excluding_dogmas(self, mock_esi):
@@ -198,6 +260,60 @@ class TestEveType(NoSocketsTestCase):
             {1816, 1817},
         )
 
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", True)
+    @patch("eveuniverse.tasks.update_or_create_inline_objects")
+    def test_should_start_one_task_per_inline_model(self, mock_task, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        # when
+        EveType.objects.update_or_create_esi(id=603, wait_for_children=False)
+        # then
+        self.assertEqual(mock_task.delay.call_count, 2)
+        inline_model_names = {
+            call[1]["inline_model_name"] for call in mock_task.delay.call_args_list
+        }
+        self.assertSetEqual(
+            inline_model_names, {"EveTypeDogmaAttribute", "EveTypeDogmaEffect"}
+        )
+
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", True)
+    @patch("eveuniverse.tasks.update_or_create_inline_objects")
+    def test_should_not_start_task_when_there_are_no_inline_objects(
+        self, mock_task, mock_esi
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        with patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", False):
+            eve_type, _ = EveType.objects.update_or_create_esi(id=603)
+        # when
+        EveType.objects._update_or_create_inline_objects(
+            parent_eve_data_obj={"type_id": 603},
+            parent_obj=eve_type,
+            inline_objects=EveType._inline_objects([EveType.Section.DOGMAS]),
+            wait_for_children=False,
+            enabled_sections=[EveType.Section.DOGMAS],
+        )
+        # then
+        self.assertFalse(mock_task.delay.called)
+
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", True)
+    def test_should_only_check_for_existing_inline_objects_when_there_are_none(
+        self, mock_esi
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        with patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", False):
+            eve_type, _ = EveType.objects.update_or_create_esi(id=603)
+        # when
+        with self.assertNumQueries(2):
+            EveType.objects._update_or_create_inline_objects(
+                parent_eve_data_obj={"type_id": 603},
+                parent_obj=eve_type,
+                inline_objects=EveType._inline_objects([EveType.Section.DOGMAS]),
+                wait_for_children=True,
+                enabled_sections=[EveType.Section.DOGMAS],
+            )
+
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_MARKET_GROUPS", False)
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_DOGMAS", False)
     def test_can_create_render_url(self, mock_esi):
@@ -637,6 +753,53 @@ class TestEsiMapping(NoSocketsTestCase):
             },
         )
 
+    def test_should_reuse_compiled_mapping(self):
+        mapping_1 = EveConstellation._esi_mapping()
+        mapping_2 = EveConstellation._esi_mapping()
+        self.assertIs(mapping_1, mapping_2)
+
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_GRAPHICS", False)
+    @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_MARKET_GROUPS", False)
+    def test_should_compile_mapping_for_each_set_of_sections(self):
+        mapping_1 = EveType._esi_mapping()
+        mapping_2 = EveType._esi_mapping([EveType.Section.GRAPHICS])
+        self.assertNotIn("eve_graphic", mapping_1)
+        self.assertIn("eve_graphic", mapping_2)
+
+    def test_should_reflect_changed_global_sections(self):
+        with patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_GRAPHICS", False):
+            mapping_1 = EveType._esi_mapping()
+        with patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_GRAPHICS", True):
+            mapping_2 = EveType._esi_mapping()
+        self.assertNotIn("eve_graphic", mapping_1)
+        self.assertIn("eve_graphic", mapping_2)
+
+    def test_extractor_should_return_values_of_non_pk_fields(self):
+        extractor = EveConstellation._esi_extractor()
+        values = extractor(
+            {
+                "constellation_id": 20000785,
+                "name": "Ishaga",
+                "position": {"x": 1, "y": 2, "z": 3},
+                "region_id": 10000069,
+            }
+        )
+        self.assertDictEqual(
+            values,
+            {
+                "name": "Ishaga",
+                "eve_region": 10000069,
+                "position_x": 1,
+                "position_y": 2,
+                "position_z": 3,
+            },
+        )
+
+    def test_extractor_should_omit_missing_values(self):
+        extractor = EveConstellation._esi_extractor()
+        values = extractor({"constellation_id": 20000785, "name": "Ishaga"})
+        self.assertDictEqual(values, {"name": "Ishaga"})
+
 
 @patch(MANAGERS_PATH + ".esi")
 class TestEveEntityQuerySet(NoSocketsTestCase):
@@ -695,11 +858,99 @@ class TestEveEntityQuerySet(NoSocketsTestCase):
         self.assertEqual(self.e3.name, "Wayne Technologies")
         self.assertEqual(self.e3.category, EveEntity.CATEGORY_CORPORATION)
 
+    def test_should_renew_last_updated_of_unchanged_entities(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.filter(id=1001).update(
+            name="Bruce Wayne",
+            category=EveEntity.CATEGORY_CHARACTER,
+            last_updated=now() - dt.timedelta(days=1),
+        )
+        entities = EveEntity.objects.filter(id=1001)
+
+        result = entities.update_from_esi()
+        self.assertEqual(result, 1)
+        self.e1.refresh_from_db()
+        self.assertEqual(self.e1.name, "Bruce Wayne")
+        self.assertFalse(
+            EveEntity.objects.filter_stale(dt.timedelta(hours=1))
+            .filter(id=1001)
+            .exists()
+        )
+
+    def test_should_update_many_in_parallel_chunks(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        entities = EveEntity.objects.filter(id__in=[1001, 1002, 2001])
+
+        with patch.object(EveEntityQuerySet, "ESI_CHUNK_SIZE", 1):
+            result = entities.update_from_esi(max_workers=3)
+
+        self.assertEqual(result, 3)
+        self.e1.refresh_from_db()
+        self.assertEqual(self.e1.name, "Bruce Wayne")
+        self.e3.refresh_from_db()
+        self.assertEqual(self.e3.name, "Wayne Technologies")
+        self.assertEqual(self.e3.category, EveEntity.CATEGORY_CORPORATION)
+
+    def test_should_count_resolved_entities_of_all_chunks(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        entities = EveEntity.objects.filter(id__in=[1001, 1002, 2001])
+
+        with patch.object(EveEntityQuerySet, "ESI_CHUNK_SIZE", 2):
+            result = entities.update_from_esi(max_workers=1)
+
+        self.assertEqual(result, 3)
+        self.e2.refresh_from_db()
+        self.assertEqual(self.e2.name, "Peter Parker")
+
+    def test_should_store_invalid_ids(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.create(id=9999)
+        entities = EveEntity.objects.filter(id__in=[1001, 1002, 2001, 9999])
+
+        entities.update_from_esi()
+
+        self.assertSetEqual(
+            set(EveEntityInvalidId.objects.values_list("id", flat=True)), {9999}
+        )
+
+    def test_should_not_call_esi_again_for_known_invalid_ids(self, mock_esi):
+        mock_esi.client = Mock(wraps=EsiClientStub())
+        EveEntity.objects.create(id=9999)
+        entities = EveEntity.objects.filter(id=9999)
+        entities.update_from_esi()
+        mock_esi.client.Universe.post_universe_names.reset_mock()
+
+        result = entities.update_from_esi()
+
+        self.assertEqual(result, 0)
+        self.assertFalse(mock_esi.client.Universe.post_universe_names.called)
+
+    def test_should_call_esi_again_for_timed_out_invalid_ids(self, mock_esi):
+        mock_esi.client = Mock(wraps=EsiClientStub())
+        EveEntity.objects.create(id=9999)
+        EveEntityInvalidId.objects.bulk_store([9999])
+        EveEntityInvalidId.objects.update(updated_at=now() - dt.timedelta(days=30))
+
+        EveEntity.objects.filter(id=9999).update_from_esi()
+
+        self.assertTrue(mock_esi.client.Universe.post_universe_names.called)
+
+    def test_should_isolate_invalid_ids_with_few_requests(self, mock_esi):
+        mock_esi.client = Mock(wraps=EsiClientStub())
+        EveEntity.objects.create(id=9999)
+        entities = EveEntity.objects.filter(id__in=[1001, 1002, 2001, 9999])
+
+        result = entities.update_from_esi()
+
+        self.assertEqual(result, 3)
+        self.assertLessEqual(mock_esi.client.Universe.post_universe_names.call_count, 3)
+
 
 @patch(MANAGERS_PATH + ".esi")
 class TestEveEntity(NoSocketsTestCase):
     def setUp(self):
         EveEntity.objects.all().delete()
+        _entity_names_cache.clear()
 
     def test_repr(self, mock_esi):
         mock_esi.client = EsiClientStub()
@@ -745,6 +996,23 @@ class TestEveEntity(NoSocketsTestCase):
         self.assertIsNone(obj)
         self.assertFalse(created)
 
+    def test_should_call_esi_only_once_for_invalid_id(self, mock_esi):
+        mock_esi.client = Mock(wraps=EsiClientStub())
+
+        self.assertEqual(EveEntity.objects.resolve_name(9999), "")
+        self.assertEqual(EveEntity.objects.resolve_name(9999), "")
+        self.assertEqual(mock_esi.client.Universe.post_universe_names.call_count, 1)
+        self.assertTrue(EveEntityInvalidId.objects.filter(id=9999).exists())
+
+    def test_should_not_call_esi_for_known_invalid_id(self, mock_esi):
+        mock_esi.client = Mock(wraps=EsiClientStub())
+        EveEntityInvalidId.objects.bulk_store([9999])
+
+        obj, created = EveEntity.objects.update_or_create_esi(id=9999)
+        self.assertIsNone(obj)
+        self.assertFalse(created)
+        self.assertFalse(mock_esi.client.Universe.post_universe_names.called)
+
     def test_get_or_create_esi_4(self, mock_esi):
         """when object already exists and has not yet been resolved, fetch it from ESI"""
         mock_esi.client = EsiClientStub()
@@ -836,6 +1104,110 @@ class TestEveEntity(NoSocketsTestCase):
         self.assertEqual(resolver.to_name(2001), "Wayne Technologies")
         self.assertEqual(resolver.to_name(3001), "Wayne Enterprises")
 
+    def test_should_resolve_name_from_cache(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.resolve_name(1001)
+
+        with self.assertNumQueries(0):
+            name = EveEntity.objects.resolve_name(1001)
+
+        self.assertEqual(name, "Bruce Wayne")
+
+    def test_should_bulk_resolve_names_from_cache(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.bulk_resolve_names([1001, 2001])
+
+        with self.assertNumQueries(0):
+            resolver = EveEntity.objects.bulk_resolve_names([1001, 2001])
+
+        self.assertEqual(resolver.to_name(1001), "Bruce Wayne")
+        self.assertEqual(resolver.to_name(2001), "Wayne Technologies")
+
+    def test_should_invalidate_cached_names_when_generation_changes(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.resolve_name(1001)
+        EveEntity.objects.filter(id=1001).update(name="Batman")
+        cache.incr(_entity_names_cache.GENERATION_KEY)  # bumped by other process
+
+        with patch.object(_entity_names_cache, "GENERATION_CHECK_INTERVAL", 0):
+            name = EveEntity.objects.resolve_name(1001)
+
+        self.assertEqual(name, "Batman")
+
+    def test_should_invalidate_cached_name_when_entity_is_renamed_from_esi(
+        self, mock_esi
+    ):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.create(id=1001, name="Batman", category="character")
+        EveEntity.objects.resolve_name(1001)
+
+        EveEntity.objects.update_or_create_esi(id=1001)
+
+        self.assertEqual(EveEntity.objects.resolve_name(1001), "Bruce Wayne")
+
+    def test_should_invalidate_cached_names_when_entities_are_renamed_in_bulk(
+        self, mock_esi
+    ):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.create(id=1001, name="Batman", category="character")
+        EveEntity.objects.resolve_name(1001)
+
+        EveEntity.objects.filter(id=1001).update_from_esi()
+
+        self.assertEqual(EveEntity.objects.resolve_name(1001), "Bruce Wayne")
+
+    def test_should_invalidate_cached_name_when_entity_is_saved(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.resolve_name(1001)
+        obj = EveEntity.objects.get(id=1001)
+        obj.name = "Batman"
+
+        obj.save()
+
+        self.assertEqual(EveEntity.objects.resolve_name(1001), "Batman")
+
+    def test_should_not_invalidate_cached_names_when_entities_are_created(
+        self, mock_esi
+    ):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.resolve_name(1001)
+        generation = cache.get(_entity_names_cache.GENERATION_KEY)
+
+        EveEntity.objects.update_or_create_esi(id=1002)
+        EveEntity.objects.filter(id=2001).update_from_esi()
+        EveEntity.objects.bulk_create_esi([3001])
+
+        self.assertEqual(cache.get(_entity_names_cache.GENERATION_KEY), generation)
+        with self.assertNumQueries(0):
+            EveEntity.objects.resolve_name(1001)
+
+    def test_should_not_invalidate_cached_name_when_entity_is_unchanged(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.resolve_name(1001)
+        generation = cache.get(_entity_names_cache.GENERATION_KEY)
+
+        EveEntity.objects.update_or_create_esi(id=1001)
+        EveEntity.objects.get(id=1001).save()
+
+        self.assertEqual(cache.get(_entity_names_cache.GENERATION_KEY), generation)
+
+    def test_should_only_evict_ids_invalidated_by_other_process(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.resolve_name(1001)
+        EveEntity.objects.resolve_name(2001)
+        EveEntity.objects.filter(id=1001).update(name="Batman")
+        EveEntity.objects.filter(id=2001).update(name="Batcave")
+        generation = cache.get(_entity_names_cache.GENERATION_KEY, 0) + 1
+        cache.set(_entity_names_cache.GENERATION_KEY, generation)  # other process
+        cache.set(_entity_names_cache._invalidated_ids_key(generation), [1001])
+
+        with patch.object(_entity_names_cache, "GENERATION_CHECK_INTERVAL", 0):
+            name_1 = EveEntity.objects.resolve_name(1001)
+            name_2 = EveEntity.objects.resolve_name(2001)
+
+        self.assertEqual(name_1, "Batman")
+        self.assertEqual(name_2, "Wayne Technologies")
+
     def test_is_alliance(self, mock_esi):
         """when entity is an alliance, then return True, else False"""
         mock_esi.client = EsiClientStub()
@@ -1061,6 +1433,113 @@ class TestEveEntity(NoSocketsTestCase):
         obj = EveEntity(id=666)
         self.assertFalse(obj.is_station)
 
+    def test_should_derive_category_from_id(self, mock_esi):
+        self.assertEqual(EveEntity.category_for_id(500001), EveEntity.CATEGORY_FACTION)
+        self.assertEqual(
+            EveEntity.category_for_id(1000274), EveEntity.CATEGORY_CORPORATION
+        )
+        self.assertEqual(
+            EveEntity.category_for_id(3019583), EveEntity.CATEGORY_CHARACTER
+        )
+        self.assertEqual(EveEntity.category_for_id(10000002), EveEntity.CATEGORY_REGION)
+        self.assertEqual(
+            EveEntity.category_for_id(20000020), EveEntity.CATEGORY_CONSTELLATION
+        )
+        self.assertEqual(
+            EveEntity.category_for_id(30000142), EveEntity.CATEGORY_SOLAR_SYSTEM
+        )
+        self.assertEqual(
+            EveEntity.category_for_id(31000005), EveEntity.CATEGORY_SOLAR_SYSTEM
+        )
+        self.assertEqual(
+            EveEntity.category_for_id(60003760), EveEntity.CATEGORY_STATION
+        )
+        self.assertIsNone(EveEntity.category_for_id(1001))
+        self.assertIsNone(EveEntity.category_for_id(99000001))
+
+    def test_should_resolve_locally_stored_objects_without_esi(self, mock_esi):
+        # given
+        mock_esi.client = Mock(wraps=EsiClientStub())
+        EveRegion.objects.create(id=10000002, name="The Forge")
+        # when
+        result = EveEntity.objects.bulk_create_esi([10000002, 1001])
+        # then
+        self.assertEqual(result, 2)
+        self.assertEqual(EveEntity.objects.get(id=10000002).name, "The Forge")
+        self.assertEqual(
+            EveEntity.objects.get(id=10000002).category, EveEntity.CATEGORY_REGION
+        )
+        self.assertEqual(EveEntity.objects.get(id=1001).name, "Bruce Wayne")
+        _, kwargs = mock_esi.client.Universe.post_universe_names.call_args
+        self.assertEqual(list(kwargs["ids"]), [1001])
+
+    def test_should_get_locally_stored_object_without_esi(self, mock_esi):
+        # given
+        mock_esi.client = Mock(wraps=EsiClientStub())
+        EveRegion.objects.create(id=10000002, name="The Forge")
+        # when
+        obj, created = EveEntity.objects.get_or_create_esi(id=10000002)
+        # then
+        self.assertTrue(created)
+        self.assertEqual(obj.name, "The Forge")
+        self.assertTrue(obj.is_region)
+        self.assertFalse(mock_esi.client.Universe.post_universe_names.called)
+
+    def test_should_sync_from_universe_models(self, mock_esi):
+        # given
+        mock_esi.client = Mock()
+        region = EveRegion.objects.create(id=10000002, name="The Forge")
+        EveConstellation.objects.create(id=20000020, name="Kimotoro", eve_region=region)
+        # when
+        result = EveEntity.objects.sync_from_universe_models()
+        # then
+        self.assertEqual(result, 2)
+        self.assertEqual(EveEntity.objects.get(id=10000002).name, "The Forge")
+        obj = EveEntity.objects.get(id=20000020)
+        self.assertEqual(obj.name, "Kimotoro")
+        self.assertEqual(obj.category, EveEntity.CATEGORY_CONSTELLATION)
+        self.assertFalse(mock_esi.client.mock_calls)
+
+    def test_should_sync_from_selected_universe_models(self, mock_esi):
+        # given
+        region = EveRegion.objects.create(id=10000002, name="The Forge")
+        EveConstellation.objects.create(id=20000020, name="Kimotoro", eve_region=region)
+        # when
+        result = EveEntity.objects.sync_from_universe_models(["EveRegion"])
+        # then
+        self.assertEqual(result, 1)
+        self.assertSetEqual(
+            set(EveEntity.objects.values_list("id", flat=True)), {10000002}
+        )
+
+    def test_should_not_sync_from_models_without_category(self, mock_esi):
+        with self.assertRaises(ValueError):
+            EveEntity.objects.sync_from_universe_models(["EveUnit"])
+
+    @patch(MANAGERS_PATH + ".EVEUNIVERSE_SYNC_EVE_ENTITIES", True)
+    def test_should_sync_when_objects_are_loaded_from_esi(self, mock_esi):
+        # given
+        mock_esi.client = EsiClientStub()
+        # when
+        EveRegion.objects.update_or_create_esi(id=10000002)
+        EveRace.objects.bulk_update_or_create_esi(ids=[1])
+        EveFaction.objects.bulk_update_or_create_esi(ids=[500001])
+        # then
+        obj = EveEntity.objects.get(id=10000002)
+        self.assertEqual(obj.name, "The Forge")
+        self.assertEqual(obj.category, EveEntity.CATEGORY_REGION)
+        self.assertEqual(
+            EveEntity.objects.get(id=500001).category, EveEntity.CATEGORY_FACTION
+        )
+        self.assertFalse(EveEntity.objects.filter(id=1).exists())
+
+    def test_should_not_sync_when_objects_are_loaded_from_esi_by_default(
+        self, mock_esi
+    ):
+        mock_esi.client = EsiClientStub()
+        EveRegion.objects.update_or_create_esi(id=10000002)
+        self.assertFalse(EveEntity.objects.filter(id=10000002).exists())
+
     def test_is_npc_1(self, mock_esi):
         """when entity is NPC character, then return True"""
         mock_esi.client = EsiClientStub()
@@ -1148,3 +1627,63 @@ class TestEveEntityBulkCreateEsi(NoSocketsTestCase):
         self.assertEqual(obj.id, 2001)
         self.assertEqual(obj.name, "Wayne Technologies")
         self.assertEqual(obj.category, EveEntity.CATEGORY_CORPORATION)
+
+    def test_can_get_or_create_entities_in_bulk(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        EveEntity.objects.create(
+            id=1001, name="Bruce Wayne", category=EveEntity.CATEGORY_CHARACTER
+        )
+        result = EveEntity.objects.bulk_get_or_create_esi(ids=[1001, 2001])
+        self.assertEqual({obj.id for obj in result}, {1001, 2001})
+        obj = EveEntity.objects.get(id=2001)
+        self.assertEqual(obj.name, "Wayne Technologies")
+
+
+@patch(MANAGERS_PATH + ".esi")
+class TestEveEntityAsync(TestCase):  # event loops need sockets
+    def setUp(self):
+        EveEntity.objects.all().delete()
+        _entity_names_cache.clear()
+
+    def test_can_get_or_create_entity(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        obj, created = async_to_sync(EveEntity.objects.aget_or_create_esi)(id=1001)
+        self.assertTrue(created)
+        self.assertEqual(obj.name, "Bruce Wayne")
+        self.assertEqual(obj.category, EveEntity.CATEGORY_CHARACTER)
+
+    def test_should_return_none_for_invalid_id(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        obj, created = async_to_sync(EveEntity.objects.aupdate_or_create_esi)(id=9999)
+        self.assertIsNone(obj)
+        self.assertFalse(created)
+        self.assertTrue(EveEntityInvalidId.objects.filter(id=9999).exists())
+
+    def test_should_not_call_esi_for_known_invalid_id(self, mock_esi):
+        mock_esi.client = Mock(wraps=EsiClientStub())
+        EveEntityInvalidId.objects.bulk_store([9999])
+
+        obj, _ = async_to_sync(EveEntity.objects.aget_or_create_esi)(id=9999)
+        self.assertIsNone(obj)
+        self.assertFalse(mock_esi.client.Universe.post_universe_names.called)
+
+    def test_can_resolve_names_in_bulk(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveEntity.objects.create(
+            id=1001, name="Bruce Wayne", category=EveEntity.CATEGORY_CHARACTER
+        )
+
+        resolver = async_to_sync(EveEntity.objects.abulk_resolve_names)(
+            ids=[1001, 2001]
+        )
+        self.assertEqual(resolver.to_name(1001), "Bruce Wayne")
+        self.assertEqual(resolver.to_name(2001), "Wayne Technologies")
+
+    def test_can_resolve_name(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+
+        name = async_to_sync(EveEntity.objects.aresolve_name)(1001)
+        self.assertEqual(name, "Bruce Wayne")
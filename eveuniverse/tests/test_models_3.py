@@ -3,6 +3,7 @@ from unittest.mock import patch
 import requests_mock
 
 from ..core import fuzzwork
+from ..managers import _celestial_indexes
 from ..models import (
     EveAsteroidBelt,
     EveMoon,
@@ -739,8 +740,8 @@ class TestEveSolarSystemBulkWithSection(NoSocketsTestCase):
         )
 
     @patch(
-        MODELS_PATH + ".EveSolarSystem.objects.update_or_create_esi",
-        wraps=EveSolarSystem.objects.update_or_create_esi,
+        MODELS_PATH + ".EveSolarSystem.objects._fetch_eve_data_obj",
+        wraps=EveSolarSystem.objects._fetch_eve_data_obj,
     )
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_PLANETS", False)
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_STARGATES", False)
@@ -774,8 +775,8 @@ class TestEveSolarSystemBulkWithSection(NoSocketsTestCase):
         self.assertEqual(spy_manager.call_count, 3)
 
     @patch(
-        MODELS_PATH + ".EveSolarSystem.objects.update_or_create_esi",
-        wraps=EveSolarSystem.objects.update_or_create_esi,
+        MODELS_PATH + ".EveSolarSystem.objects._fetch_eve_data_obj",
+        wraps=EveSolarSystem.objects._fetch_eve_data_obj,
     )
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_PLANETS", False)
     @patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_STARGATES", False)
@@ -994,6 +995,33 @@ class TestEveSolarSystemNearestCelestial(NoSocketsTestCase):
         )
         self.assertEqual(result.distance, 1000)
 
+    def test_should_provide_position_of_celestial_to_fuzzwork(
+        self, mock_esi, mock_fuzzwork
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        item = fuzzwork.EveItem(
+            id=50016284, name="Stargate (Akidagi)", type_id=16, distance=1000
+        )
+        positions = list()
+
+        def my_nearest_celestial(*args, celestial_position, **kwargs):
+            positions.append(celestial_position(item))
+            return item
+
+        mock_fuzzwork.nearest_celestial.side_effect = my_nearest_celestial
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        # when
+        result = enaluri.nearest_celestial(x=-1, y=-2, z=3)
+        # then
+        stargate = EveStargate.objects.get(id=50016284)
+        self.assertEqual(
+            positions,
+            [(stargate.position_x, stargate.position_y, stargate.position_z)],
+        )
+        self.assertEqual(result.eve_object, stargate)
+        self.assertEqual(result.distance, 1000)
+
     def test_should_return_none_if_unknown_type(self, mock_esi, mock_fuzzwork):
         # given
         mock_esi.client = EsiClientStub()
@@ -1015,3 +1043,157 @@ class TestEveSolarSystemNearestCelestial(NoSocketsTestCase):
         result = enaluri.nearest_celestial(x=-1, y=-2, z=3)
         # then
         self.assertIsNone(result)
+
+
+@patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_ASTEROID_BELTS", True)
+@patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_MOONS", True)
+@patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_PLANETS", True)
+@patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_STARGATES", True)
+@patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_STATIONS", True)
+@patch(MODELS_PATH + ".fuzzwork")
+@patch(MANAGERS_PATH + ".esi")
+class TestEveSolarSystemNearestCelestialLocal(NoSocketsTestCase):
+    def setUp(self) -> None:
+        _celestial_indexes.clear()
+
+    def test_should_return_moon(self, mock_esi, mock_fuzzwork):
+        # given
+        mock_esi.client = EsiClientStub()
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(
+            id=30045339, include_children=True
+        )
+        # when
+        result = enaluri.nearest_celestial(
+            x=-211160238164, y=-41134078174, z=216642196394
+        )
+        # then
+        self.assertEqual(result.eve_type, EveType.objects.get(id=14))
+        self.assertEqual(result.eve_object, EveMoon.objects.get(id=40349472))
+        self.assertAlmostEqual(result.distance, 1000, delta=1)
+        self.assertFalse(mock_fuzzwork.nearest_celestial.called)
+
+    def test_should_return_stargate(self, mock_esi, mock_fuzzwork):
+        # given
+        mock_esi.client = EsiClientStub()
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(
+            id=30045339, include_children=True
+        )
+        # when
+        result = enaluri.nearest_celestial(x=4845263708160, y=97343692800, z=0)
+        # then
+        self.assertEqual(result.eve_type, EveType.objects.get(id=16))
+        self.assertEqual(result.eve_object, EveStargate.objects.get(id=50016284))
+        self.assertFalse(mock_fuzzwork.nearest_celestial.called)
+
+    def test_should_use_fuzzwork_when_planets_not_loaded(self, mock_esi, mock_fuzzwork):
+        # given
+        mock_esi.client = EsiClientStub()
+        mock_fuzzwork.nearest_celestial.return_value = None
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        # when
+        result = enaluri.nearest_celestial(x=-1, y=-2, z=3)
+        # then
+        self.assertIsNone(result)
+        self.assertTrue(mock_fuzzwork.nearest_celestial.called)
+
+    def test_should_use_fuzzwork_when_moons_not_loaded(self, mock_esi, mock_fuzzwork):
+        # given
+        mock_esi.client = EsiClientStub()
+        mock_fuzzwork.nearest_celestial.return_value = None
+        with patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_MOONS", False):
+            enaluri, _ = EveSolarSystem.objects.get_or_create_esi(
+                id=30045339, include_children=True
+            )
+        self.assertTrue(EvePlanet.objects.filter(eve_solar_system=enaluri).exists())
+        self.assertFalse(EveMoon.objects.exists())
+        # when
+        result = enaluri.nearest_celestial(
+            x=-211160238164, y=-41134078174, z=216642196394
+        )
+        # then
+        self.assertIsNone(result)
+        self.assertTrue(mock_fuzzwork.nearest_celestial.called)
+
+    def test_should_use_fuzzwork_when_stations_not_loaded(
+        self, mock_esi, mock_fuzzwork
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        mock_fuzzwork.nearest_celestial.return_value = None
+        with patch(MODELS_PATH + ".EVEUNIVERSE_LOAD_STATIONS", False):
+            enaluri, _ = EveSolarSystem.objects.get_or_create_esi(
+                id=30045339, include_children=True
+            )
+        # when
+        enaluri.nearest_celestial(x=-1, y=-2, z=3)
+        # then
+        self.assertTrue(mock_fuzzwork.nearest_celestial.called)
+
+    def test_should_cache_celestial_index(self, mock_esi, mock_fuzzwork):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveSolarSystem.objects.get_or_create_esi(id=30045339, include_children=True)
+        celestial_index = EveSolarSystem.objects.celestial_index(30045339)
+        # when
+        result = EveSolarSystem.objects.celestial_index(30045339)
+        # then
+        self.assertIs(result, celestial_index)
+        self.assertEqual(len(result), 10)
+
+    def test_should_cache_when_not_all_celestials_are_loaded(
+        self, mock_esi, mock_fuzzwork
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        EveSolarSystem.objects.celestial_index(30045339)
+        # when
+        with self.assertNumQueries(0):
+            result = EveSolarSystem.objects.celestial_index(30045339)
+        # then
+        self.assertIsNone(result)
+
+    def test_should_clear_celestial_index_when_children_are_loaded(
+        self, mock_esi, mock_fuzzwork
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveSolarSystem.objects.get_or_create_esi(id=30045339)
+        self.assertIsNone(EveSolarSystem.objects.celestial_index(30045339))
+        # when
+        EveSolarSystem.objects.update_or_create_esi(id=30045339, include_children=True)
+        # then
+        self.assertEqual(len(EveSolarSystem.objects.celestial_index(30045339)), 10)
+
+    def test_should_clear_celestial_index_when_moon_is_updated(
+        self, mock_esi, mock_fuzzwork
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        EveSolarSystem.objects.get_or_create_esi(id=30045339, include_children=True)
+        celestial_index = EveSolarSystem.objects.celestial_index(30045339)
+        # when
+        EveMoon.objects.update_or_create_esi(id=40349472)
+        # then
+        self.assertIsNot(
+            EveSolarSystem.objects.celestial_index(30045339), celestial_index
+        )
+
+    def test_should_use_fuzzwork_when_celestial_index_is_outdated(
+        self, mock_esi, mock_fuzzwork
+    ):
+        # given
+        mock_esi.client = EsiClientStub()
+        mock_fuzzwork.nearest_celestial.return_value = None
+        enaluri, _ = EveSolarSystem.objects.get_or_create_esi(
+            id=30045339, include_children=True
+        )
+        EveSolarSystem.objects.celestial_index(30045339)
+        EveMoon.objects.filter(id=40349472).delete()
+        # when
+        result = enaluri.nearest_celestial(
+            x=-211160238164, y=-41134078174, z=216642196394
+        )
+        # then
+        self.assertIsNone(result)
+        self.assertTrue(mock_fuzzwork.nearest_celestial.called)
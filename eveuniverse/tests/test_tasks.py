@@ -1,7 +1,9 @@
+import datetime as dt
 from unittest.mock import patch
 
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils.timezone import now
 
 from ..models import (
     EveCategory,
@@ -18,9 +20,12 @@ from ..tasks import (
     load_map,
     load_ship_types,
     load_structure_types,
+    refresh_stale_esi,
     update_market_prices,
     update_or_create_eve_object,
+    update_or_create_eve_objects,
     update_or_create_inline_object,
+    update_or_create_inline_objects,
     update_unresolved_eve_entities,
 )
 from ..utils import NoSocketsTestCase
@@ -54,6 +59,16 @@ class TestTasks(NoSocketsTestCase):
         obj.refresh_from_db()
         self.assertNotEqual(obj.name, "Dummy")
 
+    @patch("eveuniverse.managers.esi")
+    def test_update_or_create_eve_objects(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        EveCategory.objects.bulk_get_or_create_esi(ids=[2, 3])
+        EveCategory.objects.update(name="Dummy")
+
+        update_or_create_eve_objects("EveCategory", [2, 3])
+
+        self.assertFalse(EveCategory.objects.filter(name="Dummy").exists())
+
     @patch("eveuniverse.managers.esi")
     def test_update_or_create_inline_object(self, mock_esi):
         mock_esi.client = EsiClientStub()
@@ -77,6 +92,34 @@ class TestTasks(NoSocketsTestCase):
         ).first()
         self.assertEqual(dogma_attribute_1.value, 5)
 
+    @patch("eveuniverse.managers.esi")
+    def test_update_or_create_inline_objects(self, mock_esi):
+        mock_esi.client = EsiClientStub()
+        eve_type, _ = EveType.objects.update_or_create_esi(id=603)
+
+        update_or_create_inline_objects(
+            parent_obj_id=eve_type.id,
+            parent_fk="eve_type",
+            eve_data_objs=[
+                {"attribute_id": 588, "value": 5},
+                {"attribute_id": 129, "value": 12},
+            ],
+            other_pk_info={
+                "esi_name": "attribute_id",
+                "is_fk": True,
+                "name": "eve_dogma_attribute",
+            },
+            parent2_model_name="EveDogmaAttribute",
+            inline_model_name="EveTypeDogmaAttribute",
+            parent_model_name=type(eve_type).__name__,
+        )
+        self.assertDictEqual(
+            dict(
+                eve_type.dogma_attributes.values_list("eve_dogma_attribute_id", "value")
+            ),
+            {588: 5, 129: 12},
+        )
+
     @patch(MODULE_PATH + ".EveEntity.objects.bulk_create_esi")
     def test_create_eve_entities(self, mock_bulk_create_esi):
         create_eve_entities([1, 2, 3])
@@ -136,3 +179,46 @@ class TestLoadData(TestCase):
 
         for id in [35825]:
             self.assertTrue(EveType.objects.filter(id=id).exists())
+
+
+@patch(MODULE_PATH + ".update_or_create_eve_objects")
+@patch("eveuniverse.managers.esi")
+class TestRefreshStaleEsi(NoSocketsTestCase):
+    def setUp(self) -> None:
+        with patch("eveuniverse.managers.esi") as mock_esi:
+            mock_esi.client = EsiClientStub()
+            EveCategory.objects.bulk_get_or_create_esi(ids=[2, 3, 4])
+            EveRegion.objects.get_or_create_esi(id=10000002)
+        EveCategory.objects.filter(id__in=[2, 3]).update(
+            last_updated=now() - dt.timedelta(days=2)
+        )
+
+    def test_should_refresh_stale_objects_only(self, mock_esi, mock_task):
+        # when
+        refresh_stale_esi(older_than_minutes=60)
+        # then
+        self.assertEqual(mock_task.apply_async.call_count, 1)
+        _, kwargs = mock_task.apply_async.call_args
+        self.assertEqual(kwargs["kwargs"]["model_name"], "EveCategory")
+        self.assertEqual(set(kwargs["kwargs"]["ids"]), {2, 3})
+
+    def test_should_start_batches_with_delay(self, mock_esi, mock_task):
+        # when
+        refresh_stale_esi(older_than_minutes=60, batch_size=1, batch_delay=5)
+        # then
+        countdowns = [
+            kwargs["countdown"] for _, kwargs in mock_task.apply_async.call_args_list
+        ]
+        self.assertEqual(countdowns, [0, 5])
+
+    def test_should_refresh_given_models_only(self, mock_esi, mock_task):
+        # given
+        EveRegion.objects.update(last_updated=now() - dt.timedelta(days=2))
+        # when
+        refresh_stale_esi(older_than_minutes=60, model_names=["EveRegion"])
+        # then
+        self.assertEqual(mock_task.apply_async.call_count, 1)
+        _, kwargs = mock_task.apply_async.call_args
+        self.assertEqual(
+            kwargs["kwargs"], {"model_name": "EveRegion", "ids": [10000002]}
+        )
@@ -0,0 +1,127 @@
+import json
+
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.template import Context, Engine
+from django.test import RequestFactory
+
+from ..helpers import EveEntityNameCollector
+from ..managers import _entity_names_cache
+from ..middleware import EveEntityNamesMiddleware
+from ..models import EveEntity
+from ..utils import NoSocketsTestCase
+
+ENGINE = Engine(libraries={"eveuniverse": "eveuniverse.templatetags.eveuniverse"})
+TEMPLATE = ENGINE.from_string(
+    "{% load eveuniverse %}"
+    "{% for id in ids %}{% eve_entity_name id %};{% endfor %}"
+    "{% eve_entity_name entity %}"
+)
+
+
+class TestEveEntityNameTag(NoSocketsTestCase):
+    def setUp(self) -> None:
+        _entity_names_cache.clear()
+        EveEntity.objects.all().delete()
+        self.entity = EveEntity.objects.create(id=1001, name="Bruce Wayne")
+        EveEntity.objects.create(id=1002, name="Peter Parker")
+        EveEntity.objects.create(id=2001, name="Wayne Technologies")
+
+    def test_should_render_names_directly(self):
+        # when
+        result = TEMPLATE.render(Context({"ids": [1002, 2001], "entity": self.entity}))
+        # then
+        self.assertEqual(result, "Peter Parker;Wayne Technologies;Bruce Wayne")
+
+    def test_should_resolve_names_with_one_query_when_collecting(self):
+        # given
+        context = Context({"ids": [1002, 2001], "entity": self.entity})
+        # when
+        with self.assertNumQueries(1):
+            with EveEntityNameCollector() as collector:
+                content = TEMPLATE.render(context)
+            result = collector.resolve(content)
+        # then
+        self.assertEqual(result, "Peter Parker;Wayne Technologies;Bruce Wayne")
+
+
+class TestEveEntityNamesMiddleware(NoSocketsTestCase):
+    def setUp(self) -> None:
+        _entity_names_cache.clear()
+        EveEntity.objects.all().delete()
+        EveEntity.objects.create(id=1001, name="Bruce Wayne")
+        EveEntity.objects.create(id=1002, name="Peter Parker")
+        self.factory = RequestFactory()
+
+    def test_should_fill_names_into_html_responses(self):
+        # given
+        def view(request):
+            return HttpResponse(
+                ENGINE.from_string(
+                    "{% load eveuniverse %}{% eve_entity_name 1001 %}"
+                ).render(Context())
+            )
+
+        middleware = EveEntityNamesMiddleware(view)
+        # when
+        with self.assertNumQueries(1):
+            response = middleware(self.factory.get("/"))
+        # then
+        self.assertEqual(response.content.decode("utf-8"), "Bruce Wayne")
+
+    def test_should_fill_names_into_text_responses(self):
+        # given
+        EveEntity.objects.filter(id=1001).update(name="<Bruce Wayne>")
+
+        def view(request):
+            content = EveEntityNameCollector.current().placeholder(1001)
+            return HttpResponse(content, content_type="text/plain")
+
+        middleware = EveEntityNamesMiddleware(view)
+        # when
+        response = middleware(self.factory.get("/"))
+        # then
+        self.assertEqual(response.content.decode("utf-8"), "<Bruce Wayne>")
+
+    def test_should_fill_names_into_json_responses(self):
+        # given
+        EveEntity.objects.filter(id=1001).update(name='Bruce "Batman" Wayne\\')
+
+        def view(request):
+            collector = EveEntityNameCollector.current()
+            return JsonResponse(
+                {"names": [collector.placeholder(1001), collector.placeholder(1002)]}
+            )
+
+        middleware = EveEntityNamesMiddleware(view)
+        # when
+        response = middleware(self.factory.get("/"))
+        # then
+        self.assertEqual(
+            json.loads(response.content),
+            {"names": ['Bruce "Batman" Wayne\\', "Peter Parker"]},
+        )
+
+    def test_should_not_change_streaming_responses(self):
+        # given
+        def view(request):
+            content = EveEntityNameCollector.current().placeholder(1001)
+            return FileResponse(iter([content.encode("utf-8")]))
+
+        middleware = EveEntityNamesMiddleware(view)
+        # when
+        response = middleware(self.factory.get("/"))
+        # then
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(content.startswith("__eveentity_"))
+
+    def test_should_not_change_binary_responses(self):
+        # given
+        def view(request):
+            content = EveEntityNameCollector.current().placeholder(1001)
+            return HttpResponse(content, content_type="application/octet-stream")
+
+        middleware = EveEntityNamesMiddleware(view)
+        # when
+        response = middleware(self.factory.get("/"))
+        # then
+        self.assertTrue(response.content.decode("utf-8").startswith("__eveentity_"))
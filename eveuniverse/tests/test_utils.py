@@ -1,3 +1,4 @@
+import threading
 from datetime import timedelta
 from unittest.mock import Mock, patch
 
@@ -8,7 +9,9 @@ from django.utils import translation
 from django.utils.html import mark_safe
 
 from ..utils import (
+    LRUCache,
     NoSocketsTestCase,
+    SingleFlight,
     SocketAccessError,
     add_bs_label_html,
     add_no_wrap_html,
@@ -72,6 +75,160 @@ class TestChunks(TestCase):
         self.assertListEqual(a1, [[1, 2], [3, 4], [5, 6]])
 
 
+class TestLRUCache(TestCase):
+    def test_should_return_stored_item(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("b", 2), 2)
+
+    def test_should_evict_least_recently_used_item(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+    @patch(MODULE_PATH + ".time.monotonic")
+    def test_should_expire_items_after_timeout(self, mock_monotonic):
+        cache = LRUCache(maxsize=2, timeout=10)
+        mock_monotonic.return_value = 100
+        cache.set("a", 1)
+        mock_monotonic.return_value = 105
+        self.assertEqual(cache.get("a"), 1)
+        mock_monotonic.return_value = 111
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_should_delete_item(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+        cache.delete("c")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+    def test_should_clear_all_items(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.clear()
+        self.assertIsNone(cache.get("a"))
+
+
+class TestSingleFlight(TestCase):
+    def test_should_execute_concurrent_calls_for_same_key_only_once(self):
+        # given
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "done"
+
+        results = []
+
+        def call():
+            results.append(single_flight.do("key", func))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=call) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        # when
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+        # then
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([result for result, _ in results], ["done"] * 4)
+        self.assertEqual([is_shared for _, is_shared in results].count(True), 3)
+
+    def test_should_share_exception_with_waiting_callers(self):
+        # given
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def func():
+            started.set()
+            release.wait()
+            raise RuntimeError("failed")
+
+        errors = []
+
+        def call():
+            try:
+                single_flight.do("key", func)
+            except RuntimeError as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        threads[0].start()
+        started.wait()
+        threads[1].start()
+        # when
+        release.set()
+        for thread in threads:
+            thread.join()
+        # then
+        self.assertEqual(len(errors), 2)
+
+    def test_should_execute_nested_calls_for_same_key_directly(self):
+        # given
+        single_flight = SingleFlight()
+        # when
+        result, is_shared = single_flight.do(
+            "key", lambda: single_flight.do("key", lambda: "inner")[0]
+        )
+        # then
+        self.assertEqual(result, "inner")
+        self.assertFalse(is_shared)
+
+    def test_should_execute_directly_when_waiting_times_out(self):
+        # given
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def func():
+            started.set()
+            release.wait()
+            return "leader"
+
+        leader = threading.Thread(target=lambda: single_flight.do("key", func))
+        leader.start()
+        started.wait()
+        # when
+        result, is_shared = single_flight.do("key", lambda: "follower", timeout=0.01)
+        release.set()
+        leader.join()
+        # then
+        self.assertEqual(result, "follower")
+        self.assertFalse(is_shared)
+
+    def test_should_execute_again_once_call_is_finished(self):
+        # given
+        single_flight = SingleFlight()
+        func = Mock(return_value="done")
+        # when
+        single_flight.do("key", func)
+        single_flight.do("key", func)
+        # then
+        self.assertEqual(func.call_count, 2)
+
+
 class TestCleanSetting(TestCase):
     @patch(MODULE_PATH + ".settings")
     def test_default_if_not_set(self, mock_settings):
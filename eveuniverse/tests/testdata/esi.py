@@ -1,10 +1,11 @@
+import hashlib
 import inspect
 import json
 import os
 from collections import namedtuple
 from unittest.mock import Mock
 
-from bravado.exception import HTTPNotFound
+from bravado.exception import HTTPNotFound, HTTPNotModified
 
 from eveuniverse import models as eveuniverse_models
 
@@ -27,12 +28,21 @@ class BravadoOperationStub:
         def __init__(self, headers):
             self.headers = headers
 
-    def __init__(self, data, headers: dict = None, also_return_response: bool = False):
+    def __init__(
+        self,
+        data,
+        headers: dict = None,
+        also_return_response: bool = False,
+        exception: Exception = None,
+    ):
         self._data = data
         self._headers = headers if headers else {"x-pages": 1}
+        self._exception = exception
         self.request_config = BravadoOperationStub.RequestConfig(also_return_response)
 
     def result(self, **kwargs):
+        if self._exception:
+            raise self._exception
         if self.request_config.also_return_response:
             return [self._data, self.ResponseStub(self._headers)]
         else:
@@ -49,6 +59,7 @@ class EsiRoute:
         self._primary_key = primary_key
 
     def call(self, **kwargs):
+        request_options = kwargs.pop("_request_options", dict())
         pk_value = None
         try:
             if self._primary_key:
@@ -81,7 +92,20 @@ class EsiRoute:
                 f"{self._primary_key} = {pk_value}"
             ) from None
 
-        return BravadoOperationStub(result)
+        etag = (
+            '"%s"'
+            % hashlib.md5(
+                json.dumps(result, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        )
+        if request_options.get("headers", dict()).get("If-None-Match") == etag:
+            exception = HTTPNotModified(Mock(**{"status_code": 304}))
+        else:
+            exception = None
+
+        return BravadoOperationStub(
+            result, headers={"x-pages": 1, "ETag": etag}, exception=exception
+        )
 
 
 class EsiClientStub:
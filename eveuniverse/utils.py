@@ -1,7 +1,11 @@
 import logging
 import os
 import socket
+import threading
+import time
+from collections import OrderedDict
 from datetime import timedelta
+from typing import Any, Callable, Hashable, Tuple
 
 from django.apps import apps
 from django.conf import settings
@@ -138,6 +142,126 @@ def chunks(lst, size):
         yield lst[i : i + size]
 
 
+class SingleFlight:
+    """Coalesces concurrent calls for the same key within a process.
+
+    Only the first caller for a key executes the function. All other callers
+    for the same key wait for it to finish and share its result or exception.
+    Nested calls for a key from the thread currently executing it
+    and calls that waited longer than the timeout are executed directly.
+    """
+
+    class _Call:
+        def __init__(self) -> None:
+            self.thread_id = threading.get_ident()
+            self.done = threading.Event()
+            self.result = None
+            self.exception = None
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls = dict()
+
+    def do(
+        self, key: Hashable, func: Callable[[], Any], timeout: float = None
+    ) -> Tuple[Any, bool]:
+        """executes func for key unless an execution for key is already in flight.
+
+        Args:
+            key: key for coalescing calls
+            func: function to execute
+            timeout: max seconds to wait for a call in flight, waits forever if None
+
+        Returns:
+            A tuple consisting of the result and a flag,
+            which is True when the result was shared from another caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = self._Call()
+                is_leader = True
+            else:
+                is_leader = False
+
+        if not is_leader:
+            if call.thread_id == threading.get_ident():
+                return func(), False
+
+            if not call.done.wait(timeout):
+                return func(), False
+
+            if call.exception is not None:
+                raise call.exception
+
+            return call.result, True
+
+        try:
+            call.result = func()
+        except Exception as ex:
+            call.exception = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+
+class LRUCache:
+    """Thread-safe in-process cache with a max size and an optional timeout.
+
+    When full, the least recently used item is evicted.
+    Items older than the timeout in seconds are treated as missing.
+    """
+
+    def __init__(self, maxsize: int, timeout: float = None) -> None:
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """returns the item for key or default if it is missing or has expired"""
+        with self._lock:
+            try:
+                value, created_at = self._items[key]
+            except KeyError:
+                return default
+
+            if (
+                self.timeout is not None
+                and time.monotonic() - created_at > self.timeout
+            ):
+                del self._items[key]
+                return default
+
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """adds or replaces the item for key"""
+        with self._lock:
+            self._items[key] = (value, time.monotonic())
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """removes the item for key if it exists"""
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """removes all items"""
+        with self._lock:
+            self._items.clear()
+
+
 def clean_setting(
     name: str,
     default_value: object,
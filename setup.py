@@ -42,9 +42,11 @@ setup(
     python_requires="~=3.6",
     install_requires=[
         "django>=2.2",
+        "asgiref>=3.3",
         "celery>=4.0.2",
         "django-esi>=2.0.4,<3",
         "django-bitfield",
         "requests",
     ],
+    extras_require={"numpy": ["numpy"]},
 )